@@ -33,13 +33,32 @@ def create_app(test_config=None):
         pass
     
     db.init_app(app)
-    migrate.init_app(app, db)
+    from app.utils.search import exclude_search_index
+    migrate.init_app(app, db, include_object=exclude_search_index)
     csrf.init_app(app)
     
+    from app.utils.cache import fragment_cache
+    fragment_cache.init_app(app)
+
+    from app.utils import stats
+    stats.init_app(app)
+
+    from app.utils import assets
+    assets.init_app(app)
+
+    from app.utils import instrumentation
+    instrumentation.init_app(app)
+
+    from app.utils import jobs
+    jobs.init_app(app)
+    
     # Import models so Flask-Migrate can detect them
     with app.app_context():
         from app.models import tran  # Import existing models
         from app.models import gtfs  # Import GTFS models
+        from app.models import rollups  # Insight summary tables
+        from app.models import jobs as job_models  # noqa: F401 (background export jobs)
+        from app.utils import rollups as rollup_maintenance  # noqa: F401 (registers flush hooks)
     
     # register blueprints
     from app.routes.main import main as main_bp
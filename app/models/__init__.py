@@ -14,9 +14,15 @@ from .gtfs import (
     GTFSAgency, GTFSStop, GTFSRoute, GTFSCalendar, GTFSCalendarDate,
     GTFSTrip, GTFSStopTime, GTFSShape, GTFSFeedInfo,
     GTFSFareMedia, GTFSRiderCategory, GTFSFareProduct, 
-    GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule
+    GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule, GTFSLoadManifest
 )
 
+# Import insight rollup models
+from .rollups import AgencyRollup, VendorRollup, FunctionalAreaRollup, InsightSummary
+
+# Import background export job records
+from .jobs import ExportJob, TableVersion
+
 __all__ = [
     # Base models
     'Agency', 'FunctionalArea', 'Function', 'Vendor', 'Component',
@@ -26,6 +32,12 @@ __all__ = [
     'GTFSAgency', 'GTFSStop', 'GTFSRoute', 'GTFSCalendar', 'GTFSCalendarDate',
     'GTFSTrip', 'GTFSStopTime', 'GTFSShape', 'GTFSFeedInfo',
     'GTFSFareMedia', 'GTFSRiderCategory', 'GTFSFareProduct', 
-    'GTFSTimeframe', 'GTFSFareLegRule', 'GTFSFareTransferRule'
+    'GTFSTimeframe', 'GTFSFareLegRule', 'GTFSFareTransferRule', 'GTFSLoadManifest',
+
+    # Insight rollups
+    'AgencyRollup', 'VendorRollup', 'FunctionalAreaRollup', 'InsightSummary',
+
+    # Background export jobs
+    'ExportJob', 'TableVersion'
 ]
 
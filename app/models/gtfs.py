@@ -1,10 +1,30 @@
 # app/models/gtfs.py
-from sqlalchemy import String, Integer, Float, Date, Time, Boolean, Text, ForeignKey, DECIMAL
+from sqlalchemy import String, Integer, Float, Date, DateTime, Boolean, Text, ForeignKey, DECIMAL
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
-from datetime import date, time
+from datetime import date, datetime
 from app import db
 
+
+class GTFSTime(TypeDecorator):
+    """GTFS service time as integer seconds since noon minus 12h.
+
+    Times after midnight keep counting (25:10:00 is 90600), so a trip stays
+    on its service day and time windows are plain integer ranges.
+    """
+    impl = Integer
+    cache_ok = True
+
+
+def format_gtfs_time(seconds: Optional[int]) -> Optional[str]:
+    """Render GTFSTime seconds back to GTFS HH:MM:SS"""
+    if seconds is None:
+        return None
+    hours, remainder = divmod(seconds, 3600)
+    return f"{hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}"
+
+
 # GTFS Models with prefix to avoid naming conflicts
 class GTFSAgency(db.Model):
     __tablename__ = "gtfs_agency"
@@ -119,8 +139,8 @@ class GTFSStopTime(db.Model):
     __tablename__ = "gtfs_stop_times"
     
     trip_id: Mapped[str] = mapped_column(String(100), ForeignKey("gtfs_trips.trip_id"), primary_key=True)
-    arrival_time: Mapped[time] = mapped_column(Time, nullable=False)
-    departure_time: Mapped[time] = mapped_column(Time, nullable=False)
+    arrival_time: Mapped[int] = mapped_column(GTFSTime, nullable=False)
+    departure_time: Mapped[int] = mapped_column(GTFSTime, nullable=False)
     stop_id: Mapped[str] = mapped_column(String(50), ForeignKey("gtfs_stops.stop_id"), nullable=False)
     stop_sequence: Mapped[int] = mapped_column(Integer, primary_key=True)
     stop_headsign: Mapped[Optional[str]] = mapped_column(String(255))
@@ -207,8 +227,8 @@ class GTFSTimeframe(db.Model):
     __tablename__ = "gtfs_timeframes"
     
     timeframe_group_id: Mapped[str] = mapped_column(String(50), primary_key=True)
-    start_time: Mapped[time] = mapped_column(Time, primary_key=True)
-    end_time: Mapped[time] = mapped_column(Time, primary_key=True)
+    start_time: Mapped[int] = mapped_column(GTFSTime, primary_key=True)
+    end_time: Mapped[int] = mapped_column(GTFSTime, primary_key=True)
     service_id: Mapped[str] = mapped_column(String(50), ForeignKey("gtfs_calendar.service_id"), nullable=False)
     
     fare_leg_rules_from: Mapped[list["GTFSFareLegRule"]] = relationship(
@@ -264,4 +284,15 @@ class GTFSFareTransferRule(db.Model):
     fare_transfer_type: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Relationships
-    fare_product: Mapped[Optional["GTFSFareProduct"]] = relationship(back_populates="fare_transfer_rules")
\ No newline at end of file
+    fare_product: Mapped[Optional["GTFSFareProduct"]] = relationship(back_populates="fare_transfer_rules")
+
+
+# Loader bookkeeping
+class GTFSLoadManifest(db.Model):
+    """Content hash and row count of each GTFS file as last loaded"""
+    __tablename__ = "gtfs_load_manifest"
+    
+    filename: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    loaded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,41 @@
+# app/models/jobs.py
+"""Background export jobs (see app.utils.jobs)."""
+from datetime import datetime
+from app import db
+
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+    # Random hex id: the job URL is the only handle a client gets
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON)
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)  # queued, running, finished, failed
+    progress = db.Column(db.Integer, default=0, nullable=False)  # percent
+    message = db.Column(db.String(255))
+    # kind + params + data version; equal keys produce identical artifacts
+    cache_key = db.Column(db.String(64), nullable=False, index=True)
+    artifact_path = db.Column(db.String(500))
+    filename = db.Column(db.String(255))
+    mimetype = db.Column(db.String(100))
+    created_by = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def done(self):
+        return self.status in ('finished', 'failed')
+
+    def __repr__(self):
+        return f"<ExportJob(id={self.id}, kind={self.kind}, status={self.status}, progress={self.progress})>"
+
+
+class TableVersion(db.Model):
+    """Commit counter per table read by an export; bumped after each commit touching it"""
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<TableVersion(table_name={self.table_name}, version={self.version})>"
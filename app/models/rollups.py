@@ -0,0 +1,86 @@
+# app/models/rollups.py
+"""Summary tables behind the agency and vendor insight endpoints.
+
+Rows are maintained by app.utils.rollups, never edited directly. Keys are
+plain integers rather than foreign keys so a rollup row can outlive its
+agency/vendor/area for the rest of the flush that deletes it.
+"""
+from datetime import datetime
+from app import db
+
+
+class AgencyRollup(db.Model):
+    __tablename__ = 'agency_rollups'
+    agency_id = db.Column(db.Integer, primary_key=True)
+    configuration_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    # Distinct vendors whose products appear in the agency's configurations
+    vendor_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<AgencyRollup(agency_id={self.agency_id}, configurations={self.configuration_count})>"
+
+
+class VendorRollup(db.Model):
+    __tablename__ = 'vendor_rollups'
+    vendor_id = db.Column(db.Integer, primary_key=True)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    version_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    # Distinct configurations using any of the vendor's products
+    configuration_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    latest_release = db.Column(db.Date, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<VendorRollup(vendor_id={self.vendor_id}, configurations={self.configuration_count})>"
+
+
+class FunctionalAreaRollup(db.Model):
+    __tablename__ = 'functional_area_rollups'
+    functional_area_id = db.Column(db.Integer, primary_key=True)
+    configuration_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    def __repr__(self):
+        return f"<FunctionalAreaRollup(functional_area_id={self.functional_area_id}, configurations={self.configuration_count})>"
+
+
+class InsightSummary(db.Model):
+    """Single row (id=1) answering the agency/vendor stats and insights endpoints.
+
+    Counters are adjusted by deltas on every write; each leader keeps its
+    id and metric so a write can tell whether it may have changed hands.
+    """
+    __tablename__ = 'insight_summary'
+    id = db.Column(db.Integer, primary_key=True)
+    agency_count = db.Column(db.Integer, nullable=False, default=0)
+    configuration_count = db.Column(db.Integer, nullable=False, default=0)
+    # Sum and number of non-zero agency vendor counts (avg_vendors_per_agency)
+    agency_vendor_total = db.Column(db.Integer, nullable=False, default=0)
+    agencies_with_vendors = db.Column(db.Integer, nullable=False, default=0)
+    tech_leader = db.Column(db.String(100))
+    tech_leader_id = db.Column(db.Integer)
+    tech_leader_count = db.Column(db.Integer, nullable=False, default=0)
+    common_area = db.Column(db.String(100))
+    common_area_id = db.Column(db.Integer)
+    common_area_count = db.Column(db.Integer, nullable=False, default=0)
+    vendor_count = db.Column(db.Integer, nullable=False, default=0)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    vendors_with_usage = db.Column(db.Integer, nullable=False, default=0)
+    top_vendor = db.Column(db.String(100))
+    top_vendor_id = db.Column(db.Integer)
+    top_vendor_configurations = db.Column(db.Integer, nullable=False, default=0)
+    most_versions_vendor = db.Column(db.String(100))
+    most_versions_vendor_id = db.Column(db.Integer)
+    most_versions_count = db.Column(db.Integer, nullable=False, default=0)
+    latest_release_vendor = db.Column(db.String(100))
+    latest_release_vendor_id = db.Column(db.Integer)
+    latest_release_date = db.Column(db.Date, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def avg_vendors_per_agency(self) -> float:
+        """Mean distinct vendors over agencies using at least one"""
+        if not self.agencies_with_vendors:
+            return 0
+        return round(self.agency_vendor_total / self.agencies_with_vendors, 1)
+
+    def __repr__(self):
+        return f"<InsightSummary(updated_at={self.updated_at})>"
@@ -3,7 +3,15 @@
 from datetime import datetime
 from app import db
 import enum
-import os
+
+
+def short_name_image_url(short_name, folder, kind):
+    """URL of static/images/<folder>/<short_name>_<kind>.png, or None if there is no such file"""
+    if not short_name:
+        return None
+    from app.utils.assets import asset_url
+    filename = f"{short_name.lower().replace(' ', '_')}_{kind}.png"
+    return asset_url(f'images/{folder}/{filename}')
 
 # Association Tables
 component_integration = db.Table(
@@ -85,25 +93,13 @@ class Agency(db.Model):
     
     @property
     def logo_url(self):
-        """Generate agency logo URL if file exists"""
-        from flask import url_for, current_app
-        if self.short_name:
-            filename = f"{self.short_name.lower().replace(' ', '_')}_logo.png"
-            full_path = os.path.join(current_app.static_folder, 'images', 'agency_logos', filename)
-            if os.path.exists(full_path):
-                return url_for('static', filename=f'images/agency_logos/{filename}')
-        return None
+        """Fingerprinted agency logo URL if the file exists (asset manifest lookup)"""
+        return short_name_image_url(self.short_name, 'agency_logos', 'logo')
     
     @property
     def header_url(self):
-        """Generate agency header URL if file exists"""
-        from flask import url_for, current_app
-        if self.short_name:
-            filename = f"{self.short_name.lower().replace(' ', '_')}_header.png"
-            full_path = os.path.join(current_app.static_folder, 'images', 'agency_headers', filename)
-            if os.path.exists(full_path):
-                return url_for('static', filename=f'images/agency_headers/{filename}')
-        return None
+        """Fingerprinted agency header URL if the file exists (asset manifest lookup)"""
+        return short_name_image_url(self.short_name, 'agency_headers', 'header')
 
 class FunctionalArea(db.Model):
     __tablename__ = 'functional_areas'
@@ -155,25 +151,13 @@ class Vendor(db.Model):
     
     @property
     def logo_url(self):
-        """Generate vendor logo URL if file exists"""
-        from flask import url_for, current_app
-        if self.short_name:
-            filename = f"{self.short_name.lower().replace(' ', '_')}_logo.png"
-            full_path = os.path.join(current_app.static_folder, 'images', 'vendor_logos', filename)
-            if os.path.exists(full_path):
-                return url_for('static', filename=f'images/vendor_logos/{filename}')
-        return None
+        """Fingerprinted vendor logo URL if the file exists (asset manifest lookup)"""
+        return short_name_image_url(self.short_name, 'vendor_logos', 'logo')
     
     @property
     def header_url(self):
-        """Generate vendor header URL if file exists"""
-        from flask import url_for, current_app
-        if self.short_name:
-            filename = f"{self.short_name.lower().replace(' ', '_')}_header.png"
-            full_path = os.path.join(current_app.static_folder, 'images', 'vendor_headers', filename)
-            if os.path.exists(full_path):
-                return url_for('static', filename=f'images/vendor_headers/{filename}')
-        return None
+        """Fingerprinted vendor header URL if the file exists (asset manifest lookup)"""
+        return short_name_image_url(self.short_name, 'vendor_headers', 'header')
 
 class Component(db.Model):
     __tablename__ = 'components'
@@ -344,6 +328,7 @@ class Configuration(db.Model):
         db.UniqueConstraint('agency_id', 'function_id', 'component_id', name='uq_configuration_agency_function_component'),
         db.Index('ix_configuration_agency_function', 'agency_id', 'function_id'),
         db.Index('ix_configuration_component', 'component_id'),
+        db.Index('ix_configuration_created_at_id', 'created_at', 'id'),
     )
 
     def __repr__(self):
@@ -1,8 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app import db
-from app.models.tran import Agency, Configuration, ConfigurationProduct, Product, Vendor, Function, FunctionalArea
+from app.models.tran import Agency, Configuration, Function, FunctionalArea
 from app.forms.forms import AgencyForm
 from sqlalchemy import func
+from app.utils.cache import fragment_cache
+from app.utils.search import search_filter
+from app.utils.rollups import insight_summary, agency_stats_payload, agency_insights_payload
 
 agency_bp = Blueprint('agency', __name__, url_prefix='/agencies')
 
@@ -15,69 +18,28 @@ def index(page=1):
 
 # ---------- API: list (fragment) ----------
 @agency_bp.route('/api/agencies/list')
+@fragment_cache.cached(Agency)
 def api_agencies_list():
     search = (request.args.get('search') or '').strip()
     q = Agency.query
     if search:
-        q = q.filter(Agency.name.ilike(f"%{search}%"))
+        q = search_filter(q, Agency, search)
     agencies = q.order_by(Agency.name.asc()).all()
     return render_template('fragments/agency_list.html', agencies=agencies)
 
 # ---------- API: stats ----------
 @agency_bp.route('/api/agencies/stats')
 def api_agencies_stats():
-    total_agencies = Agency.query.count()
-    active_cfgs = Configuration.query.count()
-    avg_impl = round(active_cfgs / total_agencies, 1) if total_agencies else 0
-    # Vendors per agency via products used in configurations
-    # Count distinct vendor per agency, then average
-    vendor_counts = db.session.query(
-        Configuration.agency_id, func.count(func.distinct(Vendor.id)).label('v_count')
-    ).join(ConfigurationProduct, ConfigurationProduct.configuration_id == Configuration.id)
-    vendor_counts = vendor_counts.join(Product, Product.id == ConfigurationProduct.product_id)
-    vendor_counts = vendor_counts.join(Vendor, Vendor.id == Product.vendor_id)
-    vendor_counts = vendor_counts.group_by(Configuration.agency_id).all()
-    avg_vendors = 0
-    if vendor_counts:
-        avg_vendors = round(sum(vc.v_count for vc in vendor_counts) / len(vendor_counts), 1)
-    return jsonify({
-        'active_implementations': active_cfgs,  # keep legacy key name
-        'avg_implementations_per_agency': avg_impl,
-        'avg_vendors_per_agency': avg_vendors
-    })
+    return jsonify(agency_stats_payload(insight_summary()))
 
 # ---------- API: insights ----------
 @agency_bp.route('/api/agencies/insights')
 def api_agencies_insights():
-    # Tech leader: agency with most configurations
-    tech_leader_row = db.session.query(
-        Agency.name, func.count(Configuration.id).label('cfg_count')
-    ).join(Configuration, Configuration.agency_id == Agency.id)
-    tech_leader_row = tech_leader_row.group_by(Agency.id).order_by(func.count(Configuration.id).desc()).first()
-
-    # Common area: functional area most represented in configurations
-    area_row = db.session.query(
-        FunctionalArea.name, func.count(Configuration.id).label('cfg_count')
-    ).join(Function, Function.functional_area_id == FunctionalArea.id)
-    area_row = area_row.join(Configuration, Configuration.function_id == Function.id)
-    area_row = area_row.group_by(FunctionalArea.id).order_by(func.count(Configuration.id).desc()).first()
-
-    # Top vendor: vendor whose products appear in most configurations
-    top_vendor_row = db.session.query(
-        Vendor.name, func.count(func.distinct(Configuration.id)).label('cfg_use')
-    ).join(Product, Product.vendor_id == Vendor.id)
-    top_vendor_row = top_vendor_row.join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id)
-    top_vendor_row = top_vendor_row.join(Configuration, Configuration.id == ConfigurationProduct.configuration_id)
-    top_vendor_row = top_vendor_row.group_by(Vendor.id).order_by(func.count(func.distinct(Configuration.id)).desc()).first()
-
-    return jsonify({
-        'tech_leader': tech_leader_row.name if tech_leader_row else 'N/A',
-        'common_area': area_row.name if area_row else 'N/A',
-        'top_vendor': top_vendor_row.name if top_vendor_row else 'N/A'
-    })
+    return jsonify(agency_insights_payload(insight_summary()))
 
 # ---------- API: details (fragment) ----------
 @agency_bp.route('/api/agencies/<int:agency_id>/details')
+@fragment_cache.conditional(Agency, Configuration, Function, FunctionalArea)
 def api_agency_details(agency_id):
     agency = Agency.query.get_or_404(agency_id)
     # Compute basic configuration usage summary
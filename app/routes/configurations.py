@@ -9,10 +9,20 @@ from app.models.tran import (
 from app.forms.forms import (
     ConfigurationForm, ConfigurationProductForm, ProductForm, ProductVersionForm
 )
+from app.utils.cache import fragment_cache
+from app.utils.search import search_filter
+from app.utils.pagination import InvalidCursor, keyset_page, page_size
+from sqlalchemy import func
 from datetime import datetime
 
 config_bp = Blueprint('configurations', __name__)
 
+# Rows per page for the keyset-paginated lists (?limit= may ask for up to MAX_PAGE_SIZE)
+CONFIGURATION_PAGE_SIZE = 100
+PRODUCT_PAGE_SIZE = 100
+PICKER_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 250
+
 # --------- Helper / Advisory Stub ---------
 
 def advisory_validate(configuration: Configuration, products):
@@ -22,6 +32,14 @@ def advisory_validate(configuration: Configuration, products):
     # warnings.append({"code": "EOL_VERSION", "message": "One product version near end-of-life."})
     return warnings
 
+def configuration_row_version(config_id):
+    """Latest updated_at across a configuration and its product links (row-level ETag input)"""
+    return (db.session.query(Configuration.updated_at, func.max(ConfigurationProduct.updated_at))
+            .outerjoin(ConfigurationProduct, ConfigurationProduct.configuration_id == Configuration.id)
+            .filter(Configuration.id == config_id)
+            .group_by(Configuration.id, Configuration.updated_at)
+            .first())
+
 # Helper: parse product_ids from args or form (supports repeated params and comma-separated)
 def _parse_product_ids(arg_source) -> list[int]:
     ids: list[int] = []
@@ -83,8 +101,14 @@ def configurations_list():
         q = q.filter(Configuration.function_id == function_id)
     if status:
         q = q.filter(Configuration.status == status)
-    configs = q.order_by(Configuration.created_at.desc()).limit(250).all()
-    return render_template('fragments/configuration_list.html', configurations=configs)
+    cursor = request.args.get('cursor')
+    try:
+        page = keyset_page(q, 'configurations', [Configuration.created_at, Configuration.id], cursor,
+                           page_size(CONFIGURATION_PAGE_SIZE, MAX_PAGE_SIZE), descending=True)
+    except InvalidCursor as e:
+        return jsonify({'error': 'cursor', 'message': str(e)}), 400
+    return render_template('fragments/configuration_list.html', configurations=page.items,
+                           next_url=page.next_url(), cursor=cursor)
 
 @config_bp.route('/api/configurations/<int:config_id>/row')
 @login_required
@@ -94,6 +118,8 @@ def configuration_row(config_id):
 
 @config_bp.route('/api/configurations/<int:config_id>/details')
 @login_required
+@fragment_cache.conditional(Configuration, ConfigurationProduct, Product, Agency, Function,
+                            FunctionalArea, Component, row_version=configuration_row_version)
 def configuration_details(config_id):
     c = Configuration.query.get_or_404(config_id)
     warnings = advisory_validate(c, [cp.product for cp in c.products])
@@ -222,9 +248,16 @@ def products_list():
     if vendor_id:
         q = q.filter(Product.vendor_id == vendor_id)
     if search:
-        q = q.filter(Product.name.ilike(f"%{search}%"))
-    products = q.order_by(Product.name.asc()).limit(250).all()
-    return render_template('fragments/product_list.html', products=products)
+        q = search_filter(q, Product, search)
+    cursor = request.args.get('cursor')
+    try:
+        page = keyset_page(q, 'products', [Product.name, Product.id], cursor,
+                           page_size(PRODUCT_PAGE_SIZE, MAX_PAGE_SIZE))
+    except InvalidCursor as e:
+        return jsonify({'error': 'cursor', 'message': str(e)}), 400
+    # Later pages append to the list already on screen
+    template = 'fragments/product_list_items.html' if cursor else 'fragments/product_list.html'
+    return render_template(template, products=page.items, next_url=page.next_url())
 
 # New: lightweight product picker endpoint for HTMX search suggestions
 @config_bp.route('/api/products/picker')
@@ -237,12 +270,19 @@ def products_picker():
     if vendor_id:
         q = q.filter(Product.vendor_id == vendor_id)
     if search:
-        q = q.filter(Product.name.ilike(f"%{search}%"))
-    products = q.order_by(Product.name.asc()).limit(50).all()
-    return render_template('fragments/product_picker_options.html', products=products, configuration_id=configuration_id)
+        q = search_filter(q, Product, search)
+    cursor = request.args.get('cursor')
+    try:
+        page = keyset_page(q, 'products', [Product.name, Product.id], cursor,
+                           page_size(PICKER_PAGE_SIZE, MAX_PAGE_SIZE))
+    except InvalidCursor as e:
+        return jsonify({'error': 'cursor', 'message': str(e)}), 400
+    return render_template('fragments/product_picker_options.html', products=page.items,
+                           configuration_id=configuration_id, next_url=page.next_url(), cursor=cursor)
 
 @config_bp.route('/api/products/<int:product_id>/details')
 @login_required
+@fragment_cache.conditional(Product, ProductVersion, Vendor)
 def product_details(product_id):
     p = Product.query.get_or_404(product_id)
     versions = ProductVersion.query.filter_by(product_id=product_id).order_by(ProductVersion.release_date.desc().nullslast()).all()
@@ -460,7 +500,7 @@ def option_functions():
     if fa_id:
         qry = qry.filter(Function.functional_area_id == fa_id)
     if q:
-        qry = qry.filter(Function.name.ilike(f"%{q}%"))
+        qry = search_filter(qry, Function, q)
     functions = qry.order_by(Function.name.asc()).limit(200).all()
 
     html = '<option value="">Select a function</option>'
@@ -1,5 +1,5 @@
 # app/routes/main.py
-from flask import Blueprint, render_template, jsonify, request, url_for, redirect, send_file  # added redirect, send_file
+from flask import Blueprint, render_template, jsonify, request, url_for, redirect, send_file, make_response  # added redirect, send_file
 from app import db
 from app.models.tran import (
     Agency, FunctionalArea, Component, Vendor, IntegrationPoint,
@@ -14,12 +14,23 @@ from app.utils.errors import (
     html_error_fragment, html_success_fragment,
     json_form_error_response, json_validation_error_response
 )
+from app.utils.stats import (
+    decorate_functions, sort_functions_by_criticality, dashboard_counts,
+)
+from app.utils.excel import stream_file_response
+from app.utils.exports import EXPORTS
+from app.utils.jobs import (
+    UnknownExport, export_filename, get_job, job_payload, job_progress, submit_export,
+)
+from app.utils.cache import fragment_cache
+from app.utils.search import SEARCHABLE, ranked_search, search_filter
+from app.utils.rollups import insight_summary, agency_stats_payload, agency_insights_payload
 # removed import of AFI utility helpers (create_afi_with_optional_children, component_supports_function, etc.)
 from sqlalchemy import func, case, distinct
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
-import io  # for Excel streaming
+import os
 
 
 main = Blueprint("main", __name__)
@@ -37,151 +48,64 @@ def functional_areas_page():
 def export_functional_areas_excel():
     """Download an Excel export of Functional Areas with their Functions.
 
-    Columns: Functional Area, Function, Criticality, # Components, # Agencies
-    Styling: title row, header styling, borders, auto-width, frozen header, autofilter,
-    conditional fill by criticality. Import of openpyxl is lazy to avoid import errors
-    when the package isn't installed during unrelated operations/tests.
+    Built synchronously by the shared builder (app.utils.exports) and sent back
+    in chunks; the page starts a background export job instead (see /api/exports).
     """
+    spec = EXPORTS['functional_areas']
     try:
-        # Optional filter parity with the page (currently only a search box)
-        search = (request.args.get('search') or '').strip()
+        fileobj = spec.build(spec.clean_params(request.args))
+    except ImportError as ie:
+        # openpyxl is optional
+        return json_error_response(f"Excel export unavailable (dependency): {ie}", 500)
+    except Exception as e:
+        return json_error_response(f"Error generating export: {str(e)}", 500)
+    filename = export_filename(spec)
+    return stream_file_response(fileobj, filename, spec.mimetype)
 
-        q = (FunctionalArea.query
-             .options(joinedload(FunctionalArea.functions))
-             .order_by(FunctionalArea.name.asc()))
-        if search:
-            q = q.filter(FunctionalArea.name.ilike(f"%{search}%"))
-        areas = q.all()
+def _job_response(job, status_code=200):
+    # HTMX swaps in the polling widget; API clients get JSON
+    if request.headers.get('HX-Request'):
+        return render_template('fragments/export_job.html', job=job, progress=job_progress(job)), status_code
+    return jsonify(job_payload(job)), status_code
 
-        # Lazy import for safety in environments without openpyxl preinstalled
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-            from openpyxl.utils import get_column_letter
-        except Exception as ie:
-            return json_error_response(f"Excel export unavailable (dependency): {ie}", 500)
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Functional Areas"
-
-        # Styles
-        title_font = Font(size=14, bold=True)
-        subtitle_font = Font(size=10, color="6B7280")
-        header_font = Font(color="FFFFFF", bold=True)
-        header_fill = PatternFill("solid", fgColor="1F2937")  # slate-800
-        thin = Side(style="thin", color="374151")  # slate-700
-        border = Border(left=thin, right=thin, top=thin, bottom=thin)
-
-        # Title and metadata
-        ws["A1"] = "Functional Areas Export"
-        ws["A1"].font = title_font
-        ws["A2"] = f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}"
-        ws["A2"].font = subtitle_font
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=5)
-
-        # Header row
-        headers = [
-            "Functional Area",
-            "Function",
-            "Criticality",
-            "# Components",
-            "# Agencies",
-        ]
-        ws.append([None])  # row 3 spacer so header lands at row 4 consistently
-        ws.append(headers)  # this becomes row 4
-        header_row_idx = 4
-        for cell in ws[header_row_idx]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(vertical="center")
-            cell.border = border
-
-        # Data rows
-        row = header_row_idx + 1
-        severity_order = {"high": 0, "medium": 1, "low": 2}
-        crit_fills = {
-            "high": PatternFill("solid", fgColor="B91C1C"),    # red-700
-            "medium": PatternFill("solid", fgColor="B45309"),  # amber-700
-            "low": PatternFill("solid", fgColor="065F46"),     # emerald-800
-        }
+@main.post('/api/exports/<kind>')
+def start_export(kind):
+    """Queue a background export (query/form args as for the download route).
 
-        # Precompute agency counts per function using Configuration
-        # Note: simple per-function query to keep it readable; acceptable for moderate sizes
-        for area in areas:
-            # Sort functions by criticality then name for consistency with print view
-            functions = sorted(
-                list(area.functions),
-                key=lambda fx: (
-                    severity_order.get(getattr(getattr(fx, 'criticality', None), 'value', 'medium'), 1),
-                    (fx.name or '').lower(),
-                ),
-            )
-            if not functions:
-                # Emit an area line with em dash if no functions yet
-                ws.cell(row=row, column=1, value=area.name)
-                ws.cell(row=row, column=2, value="—")
-                for c in range(1, len(headers) + 1):
-                    ws.cell(row=row, column=c).border = border
-                row += 1
-                continue
-
-            for f in functions:
-                # Component count via association
-                try:
-                    component_count = len(f.components)
-                except Exception:
-                    component_count = 0
-                # Distinct agencies with configurations for this function
-                agency_count = db.session.query(
-                    func.count(func.distinct(Configuration.agency_id))
-                ).filter(Configuration.function_id == f.id).scalar() or 0
-
-                crit_val = getattr(getattr(f, 'criticality', None), 'value', None)
-                crit_disp = crit_val.title() if crit_val else None
-
-                ws.cell(row=row, column=1, value=area.name)
-                ws.cell(row=row, column=2, value=f.name)
-                crit_cell = ws.cell(row=row, column=3, value=crit_disp)
-                ws.cell(row=row, column=4, value=component_count)
-                ws.cell(row=row, column=5, value=agency_count)
-
-                # Borders and criticality color badges (fill only the crit cell for subtlety)
-                for c in range(1, len(headers) + 1):
-                    ws.cell(row=row, column=c).border = border
-                    if c == 3 and crit_val in crit_fills:
-                        ws.cell(row=row, column=c).fill = crit_fills[crit_val]
-                        ws.cell(row=row, column=c).font = Font(color="FFFFFF", bold=True)
-                        ws.cell(row=row, column=c).alignment = Alignment(horizontal="center")
-
-                row += 1
-
-        # Freeze header and add auto-filter
-        ws.freeze_panes = f"A{header_row_idx + 1}"
-        ws.auto_filter.ref = f"A{header_row_idx}:" + get_column_letter(len(headers)) + f"{row - 1}"
-
-        # Auto-fit columns
-        for col_idx in range(1, len(headers) + 1):
-            letter = get_column_letter(col_idx)
-            max_len = 0
-            for r in range(1, row):
-                v = ws.cell(r, col_idx).value
-                max_len = max(max_len, len(str(v)) if v is not None else 0)
-            ws.column_dimensions[letter].width = min(max_len + 2, 48)
-
-        # Stream workbook to response
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
-        filename = f"functional_areas_{datetime.utcnow().strftime('%Y%m%d_%H%M')}.xlsx"
-        return send_file(
-            buf,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-    except Exception as e:
-        return json_error_response(f"Error generating export: {str(e)}", 500)
+    Returns 202 with the job; an unchanged export that already finished (or is
+    still building) is returned as is, 200.
+    """
+    try:
+        job = submit_export(kind, request.values, created_by=get_updated_by())
+    except UnknownExport:
+        return json_error_response(f"Unknown export: {kind}", 404)
+    except Exception as e:
+        return json_error_response(f"Error starting export: {str(e)}", 500)
+    response = make_response(_job_response(job, 200 if job.done else 202))
+    if not job.done:
+        response.headers['Location'] = url_for('main.job_status', job_id=job.id)
+    return response
+
+@main.get('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Status and progress of an export job (JSON, or the polling fragment for HTMX)"""
+    job = get_job(job_id)
+    if job is None:
+        return json_error_response("Job not found", 404)
+    return _job_response(job)
+
+@main.get('/api/jobs/<job_id>/download')
+def job_download(job_id):
+    """The finished job's file"""
+    job = get_job(job_id)
+    if job is None:
+        return json_error_response("Job not found", 404)
+    if job.status != 'finished':
+        return json_error_response(f"Export is {job.status}", 409)
+    if not job.artifact_path or not os.path.exists(job.artifact_path):
+        return json_error_response("Export file has expired; start the export again", 410)
+    return send_file(job.artifact_path, mimetype=job.mimetype, as_attachment=True,
+                     download_name=job.filename)
 
 @main.get('/docs')
 @login_required
@@ -250,26 +174,10 @@ def functions_print_page():
                  .order_by(FunctionalArea.name.asc())
                  .all())
 
-        # decorate each function with quick counts and sort by criticality then name
-        severity_order = {'high': 0, 'medium': 1, 'low': 2}
+        # decorate every function with counts in one pass, then sort per area by criticality then name
+        decorate_functions(f for area in areas for f in area.functions)
         for area in areas:
-            for f in area.functions:
-                try:
-                    f.component_count = len(f.components)
-                except Exception:
-                    f.component_count = 0
-                # distinct agencies using this function via configurations
-                agency_count = db.session.query(func.count(func.distinct(Configuration.agency_id))) \
-                    .filter(Configuration.function_id == f.id).scalar() or 0
-                f.agency_count = agency_count
-            # sorted list for display
-            area.sorted_functions = sorted(
-                list(area.functions),
-                key=lambda fx: (
-                    severity_order.get(getattr(getattr(fx, 'criticality', None), 'value', 'medium'), 1),
-                    fx.name.lower()
-                )
-            )
+            area.sorted_functions = sort_functions_by_criticality(area.functions)
 
         return render_template(
             'functions_print.html',
@@ -316,38 +224,25 @@ def health_check():
 # ========== Functional Areas API (CRUD + fragments) ==========
 
 @main.route('/api/functional-areas/list')
+@fragment_cache.cached(FunctionalArea)
 def functional_areas_list():
     try:
         search = (request.args.get('search') or '').strip()
         q = FunctionalArea.query
         if search:
-            q = q.filter(FunctionalArea.name.ilike(f"%{search}%"))
+            q = search_filter(q, FunctionalArea, search)
         areas = q.order_by(FunctionalArea.name.asc()).all()
         return render_template('fragments/functional_area_list.html', functional_areas=areas)
     except Exception as e:
         return html_error_fragment(f"Error loading functional areas: {str(e)}")
 
 @main.route('/api/functional-areas/<int:area_id>/details')
+@fragment_cache.conditional(FunctionalArea, Function, Component, Configuration)
 def functional_area_details(area_id):
     try:
         area = FunctionalArea.query.get_or_404(area_id)
-        # decorate functions with counts used in template
-        for f in area.functions:
-            # component count from association
-            try:
-                f.component_count = len(f.components)
-            except Exception:
-                f.component_count = 0
-            # agency count via configurations
-            agency_count = db.session.query(func.count(func.distinct(Configuration.agency_id))) \
-                .filter(Configuration.function_id == f.id).scalar() or 0
-            f.agency_count = agency_count
-        # sort functions by criticality severity then name
-        severity_order = {'high': 0, 'medium': 1, 'low': 2}
-        area.sorted_functions = sorted(
-            list(area.functions),
-            key=lambda fx: (severity_order.get(getattr(getattr(fx, 'criticality', None), 'value', 'medium'), 1), fx.name.lower())
-        )
+        # decorate functions with counts used in template, sorted by criticality severity then name
+        area.sorted_functions = decorate_functions(area.functions)
         return render_template('fragments/functional_area_details.html', functional_area=area)
     except Exception as e:
         return html_error_fragment(f"Error loading functional area details: {str(e)}")
@@ -412,62 +307,116 @@ def functional_area_delete(area_id):
         db.session.rollback()
         return html_error_fragment(f"Error deleting functional area: {str(e)}")
 
+@main.route("/api/search")
+def api_search():
+    """Ranked matches on names and descriptions across agencies, functional areas,
+    functions, components, vendors and products.
+
+    Query args: q (search text), kind (repeatable or comma-separated; default all),
+    limit (default 20, max 100).
+    """
+    try:
+        term = (request.args.get('q') or '').strip()
+        kinds = [k.strip() for arg in request.args.getlist('kind') for k in arg.split(',') if k.strip()]
+        unknown = [k for k in kinds if k not in SEARCHABLE]
+        if unknown:
+            return json_error_response(f"Unknown search kind: {', '.join(unknown)}")
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        hits = ranked_search(term, kinds or None, limit)
+        return jsonify({'query': term, 'results': [hit._asdict() for hit in hits]})
+    except Exception as e:
+        return json_error_response(f"Error searching: {str(e)}", 500)
+
 # Count endpoints for dashboard metrics
-@main.route("/api/count/agencies")
-def count_agencies():
+@main.route("/api/dashboard/summary")
+def dashboard_summary():
+    """All dashboard counts in one response (served from a short-lived cache)"""
     try:
-        count = Agency.query.count()
-        return str(count)
+        return jsonify(dashboard_counts())
     except Exception as e:
+        return json_error_response(f"Error loading dashboard summary: {str(e)}", 500)
+
+def _count_view(name):
+    try:
+        return str(dashboard_counts()[name])
+    except Exception:
         return "0"
 
+@main.route("/api/count/agencies")
+def count_agencies():
+    return _count_view('agencies')
+
 @main.route("/api/count/functional-areas")
 def count_functional_areas():
-    try:
-        count = FunctionalArea.query.count()
-        return str(count)
-    except Exception as e:
-        return "0"
+    return _count_view('functional_areas')
 
 @main.route("/api/count/components")
 def count_components():
-    try:
-        count = Component.query.count()
-        return str(count)
-    except Exception as e:
-        return "0"
+    return _count_view('components')
 
 @main.route("/api/count/integration-points")
 def count_integration_points():
-    try:
-        count = IntegrationPoint.query.count()
-        return str(count)
-    except Exception as e:
-        return "0"
+    return _count_view('integration_points')
 
 @main.route("/api/count/vendors")
 def count_vendors():
-    try:
-        count = Vendor.query.count()
-        return str(count)
-    except Exception as e:
-        return "0"
+    return _count_view('vendors')
 
 @main.route("/api/count/configurations")
 def count_configurations():
-    try:
-        return str(Configuration.query.count())
-    except Exception:
-        return "0"
+    return _count_view('configurations')
 
 @main.route("/api/count/products")
 def count_products():
-    try:
-        return str(Product.query.count())
-    except Exception:
-        return "0"
+    return _count_view('products')
 
 # Components endpoints
+COMPONENT_CARD_NAME_LIMIT = 3
+
+def _component_card_summaries(component_ids):
+    """Top agency/function names and latest configuration for each component.
+
+    Runs three queries however many components there are. Names are ranked
+    alphabetically per component with ROW_NUMBER(); one row beyond the
+    limit is kept so the card can tell whether to show '+more'.
+    """
+    summaries = {cid: {'agencies': [], 'functions': [], 'latest': None} for cid in component_ids}
+    if not component_ids:
+        return summaries
+    for key, model, foreign_key in (('agencies', Agency, Configuration.agency_id),
+                                    ('functions', Function, Configuration.function_id)):
+        pairs = (db.session.query(Configuration.component_id.label('component_id'), model.name.label('name'))
+                 .join(model, model.id == foreign_key)
+                 .filter(Configuration.component_id.in_(component_ids))
+                 .distinct()
+                 .subquery())
+        ranked = db.session.query(
+            pairs.c.component_id, pairs.c.name,
+            func.row_number().over(partition_by=pairs.c.component_id, order_by=pairs.c.name).label('rn')
+        ).subquery()
+        rows = (db.session.query(ranked.c.component_id, ranked.c.name)
+                .filter(ranked.c.rn <= COMPONENT_CARD_NAME_LIMIT + 1)
+                .order_by(ranked.c.component_id, ranked.c.rn))
+        for component_id, name in rows:
+            summaries[component_id][key].append(name)
+
+    latest = db.session.query(
+        Configuration.component_id, Configuration.version_label, Configuration.deployment_date,
+        func.row_number().over(
+            partition_by=Configuration.component_id,
+            order_by=(Configuration.deployment_date.desc().nullslast(), Configuration.updated_at.desc())
+        ).label('rn')
+    ).filter(Configuration.component_id.in_(component_ids)).subquery()
+    for row in db.session.query(latest).filter(latest.c.rn == 1):
+        summaries[row.component_id]['latest'] = row
+    return summaries
+
+def _names_display(names, empty_label):
+    display = ", ".join(names[:COMPONENT_CARD_NAME_LIMIT]) or empty_label
+    if len(names) > COMPONENT_CARD_NAME_LIMIT:
+        display += ' +more'
+    return display
+
 @main.route("/api/components/list")
 def components_list():
     """Get all components with filtering (updated to use Configuration instead of AFI)."""
@@ -494,32 +443,18 @@ def components_list():
                      .join(Configuration, Configuration.component_id == Component.id)
                      .filter(Configuration.status == status))
         if search:
-            name_like = f"%{search}%"
-            query = query.filter(Component.name.ilike(name_like))
+            query = search_filter(query, Component, search)
         query = query.order_by(Component.name.asc())
         components = query.all()
+        summaries = _component_card_summaries([c.id for c in components])
         view_components = []
         for component in components:
-            agencies_using = (db.session.query(Agency.name)
-                              .join(Configuration, Configuration.agency_id == Agency.id)
-                              .filter(Configuration.component_id == component.id)
-                              .distinct().limit(3).all())
-            agencies_display = ", ".join([a.name for a in agencies_using]) or 'No agencies'
-            if len(agencies_using) == 3:
-                agencies_display += ' +more'
-            functions_implemented = (db.session.query(Function.name)
-                                     .join(Configuration, Configuration.function_id == Function.id)
-                                     .filter(Configuration.component_id == component.id)
-                                     .distinct().limit(3).all())
-            functions_display = ", ".join([f.name for f in functions_implemented]) or 'No functions'
-            if len(functions_implemented) == 3:
-                functions_display += ' +more'
+            summary = summaries[component.id]
+            agencies_display = _names_display(summary['agencies'], 'No agencies')
+            functions_display = _names_display(summary['functions'], 'No functions')
             # NEW: latest configuration version label & deployment date (for display on card)
-            latest_cfg = (Configuration.query
-                          .filter(Configuration.component_id == component.id)
-                          .order_by(Configuration.deployment_date.desc().nullslast(), Configuration.updated_at.desc())
-                          .first())
-            version_label = getattr(latest_cfg, 'version_label', None) if latest_cfg else None
+            latest_cfg = summary['latest']
+            version_label = latest_cfg.version_label if latest_cfg else None
             deployment_date_str = ''
             if latest_cfg and latest_cfg.deployment_date:
                 try:
@@ -545,6 +480,7 @@ def components_list():
         return html_error_fragment(f"Error loading components: {str(e)}")
 
 @main.route("/api/components/<int:component_id>/details")
+@fragment_cache.conditional(Component, Configuration, Agency, Function, FunctionalArea, UserRole)
 def component_details(component_id):
     """Updated component details using Configurations."""
     try:
@@ -716,7 +652,42 @@ def component_delete(component_id):
         return json_error_response(f"Error deleting component: {str(e)}")
 
 # -------- VENDORS LIST (repoint to Products & ConfigurationProduct) ----------
+def _vendor_metric_subqueries():
+    """Per-vendor product count, configuration usage and latest release, grouped once each"""
+    product_sub = db.session.query(
+        Product.vendor_id.label('v_id'),
+        func.count(Product.id).label('product_count')
+    ).group_by(Product.vendor_id).subquery()
+    # ConfigurationProduct.configuration_id is a non-null FK, so no join to Configuration is needed
+    usage_sub = db.session.query(
+        Product.vendor_id.label('v_id'),
+        func.count(func.distinct(ConfigurationProduct.configuration_id)).label('usage_count')
+    ).join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
+     .group_by(Product.vendor_id).subquery()
+    release_sub = db.session.query(
+        Product.vendor_id.label('v_id'),
+        func.max(ProductVersion.release_date).label('latest_release')
+    ).join(ProductVersion, ProductVersion.product_id == Product.id) \
+     .group_by(Product.vendor_id).subquery()
+    return product_sub, usage_sub, release_sub
+
+def _vendor_used_by(agency_name, functional_area_name):
+    """EXISTS: one of the vendor's products is in a configuration of the named agency / functional area"""
+    used = db.session.query(ConfigurationProduct.id) \
+        .join(Product, Product.id == ConfigurationProduct.product_id) \
+        .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id) \
+        .filter(Product.vendor_id == Vendor.id)
+    if agency_name:
+        used = used.join(Agency, Agency.id == Configuration.agency_id).filter(Agency.name == agency_name)
+    if functional_area_name:
+        used = used.join(Function, Function.id == Configuration.function_id) \
+            .join(FunctionalArea, FunctionalArea.id == Function.functional_area_id) \
+            .filter(FunctionalArea.name == functional_area_name)
+    return used.exists()
+
 @main.route("/api/vendors/list")
+@fragment_cache.cached(Vendor, Product, ProductVersion, ConfigurationProduct, Configuration,
+                       Agency, Function, FunctionalArea)
 def vendors_list():
     """Vendors list using product & configuration usage metrics."""
     try:
@@ -725,56 +696,26 @@ def vendors_list():
         functional_area_filter = request.args.get('functional_area', '').strip()
         sort_by = request.args.get('sort', 'name')
 
-        product_sub = db.session.query(
-            Product.vendor_id.label('v_id'),
-            func.count(Product.id).label('product_count')
-        ).group_by(Product.vendor_id).subquery()
-
-        usage_sub = db.session.query(
-            Product.vendor_id.label('v_id'),
-            func.count(func.distinct(Configuration.id)).label('usage_count')
-        ).join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-         .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id) \
-         .group_by(Product.vendor_id).subquery()
-
+        product_sub, usage_sub, release_sub = _vendor_metric_subqueries()
+        product_count_col = func.coalesce(product_sub.c.product_count, 0)
         q = db.session.query(
             Vendor,
-            func.coalesce(product_sub.c.product_count, 0).label('product_count'),
+            product_count_col.label('product_count'),
             func.coalesce(usage_sub.c.usage_count, 0).label('usage_count')
         ).outerjoin(product_sub, product_sub.c.v_id == Vendor.id) \
          .outerjoin(usage_sub, usage_sub.c.v_id == Vendor.id)
 
         if agency_filter or functional_area_filter:
-            usage_filter_query = db.session.query(func.distinct(Vendor.id)) \
-                .join(Product, Product.vendor_id == Vendor.id) \
-                .join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-                .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id)
-            if agency_filter:
-                usage_filter_query = usage_filter_query.join(Agency, Agency.id == Configuration.agency_id) \
-                    .filter(Agency.name == agency_filter)
-            if functional_area_filter:
-                usage_filter_query = usage_filter_query.join(Function, Function.id == Configuration.function_id) \
-                    .join(FunctionalArea, FunctionalArea.id == Function.functional_area_id) \
-                    .filter(FunctionalArea.name == functional_area_filter)
-            vendor_ids = [vid[0] for vid in usage_filter_query.all()]
-            if vendor_ids:
-                q = q.filter(Vendor.id.in_(vendor_ids))
-            else:
-                q = q.filter(db.text("1=0"))
+            q = q.filter(_vendor_used_by(agency_filter, functional_area_filter))
 
         if search:
-            q = q.filter(Vendor.name.ilike(f'%{search}%'))
+            q = search_filter(q, Vendor, search)
 
         if sort_by in ('components', 'products'):
-            q = q.order_by(func.coalesce(product_sub.c.product_count, 0).desc(), Vendor.name.asc())
+            q = q.order_by(product_count_col.desc(), Vendor.name.asc())
         elif sort_by == 'recent':
-            pv_sub = db.session.query(
-                Product.vendor_id.label('v_id'),
-                func.max(ProductVersion.release_date).label('latest_release')
-            ).join(ProductVersion, ProductVersion.product_id == Product.id) \
-             .group_by(Product.vendor_id).subquery()
-            q = q.outerjoin(pv_sub, pv_sub.c.v_id == Vendor.id) \
-                 .order_by(pv_sub.c.latest_release.desc().nullslast(), Vendor.name.asc())
+            q = q.outerjoin(release_sub, release_sub.c.v_id == Vendor.id) \
+                 .order_by(release_sub.c.latest_release.desc().nullslast(), Vendor.name.asc())
         else:
             q = q.order_by(Vendor.name.asc())
 
@@ -788,6 +729,8 @@ def vendors_list():
 
 # -------- VENDOR DETAILS (repoint) ----------
 @main.route("/api/vendors/<int:vendor_id>/details")
+@fragment_cache.conditional(Vendor, Product, ProductVersion, ConfigurationProduct, Configuration,
+                            Function, FunctionalArea)
 def vendor_details(vendor_id):
     """Vendor detail using Products + usage via ConfigurationProduct."""
     try:
@@ -873,30 +816,16 @@ def delete_vendor(vendor_id):
 # -------- VENDOR STATS (repoint) ----------
 @main.route("/api/vendors/stats")
 def vendors_stats():
-    """Aggregate vendor statistics using products + configuration usage."""
+    """Aggregate vendor statistics (one-row read from the insight rollups)."""
     try:
-        total_vendors = Vendor.query.count()
-        total_products = Product.query.count()
-        vendors_with_usage = db.session.query(func.count(func.distinct(Vendor.id))) \
-            .join(Product, Product.vendor_id == Vendor.id) \
-            .join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-            .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id).scalar()
-        avg_products_per_vendor = round(total_products / total_vendors, 1) if total_vendors else 0
-        most_used = db.session.query(
-            Vendor.name,
-            func.count(func.distinct(Configuration.id)).label('cfg_use')
-        ).join(Product, Product.vendor_id == Vendor.id) \
-         .join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-         .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id) \
-         .group_by(Vendor.id, Vendor.name) \
-         .order_by(func.count(func.distinct(Configuration.id)).desc()) \
-         .first()
+        summary = insight_summary()
+        total_vendors = summary.vendor_count
         stats = {
             'total_vendors': total_vendors,
-            'vendors_with_usage': vendors_with_usage or 0,
-            'avg_products_per_vendor': avg_products_per_vendor,
-            'most_used_vendor': most_used.name if most_used else 'N/A',
-            'most_used_vendor_cfgs': most_used.cfg_use if most_used else 0
+            'vendors_with_usage': summary.vendors_with_usage,
+            'avg_products_per_vendor': round(summary.product_count / total_vendors, 1) if total_vendors else 0,
+            'most_used_vendor': summary.top_vendor or 'N/A',
+            'most_used_vendor_cfgs': summary.top_vendor_configurations
         }
         return jsonify(stats)
     except Exception as e:
@@ -905,46 +834,23 @@ def vendors_stats():
 # -------- VENDOR PERFORMANCE (new metrics) ----------
 @main.route("/api/vendors/performance")
 def vendor_performance():
-    """Vendor performance metrics based on product versions & usage."""
+    """Vendor performance metrics based on product versions & usage (insight rollups)."""
     try:
-        most_versions = db.session.query(
-            Vendor.name,
-            func.count(ProductVersion.id).label('ver_count')
-        ).join(Product, Product.vendor_id == Vendor.id) \
-         .join(ProductVersion, ProductVersion.product_id == Product.id) \
-         .group_by(Vendor.id, Vendor.name) \
-         .order_by(func.count(ProductVersion.id).desc()) \
-         .first()
-        recent_release = db.session.query(
-            Vendor.name,
-            func.max(ProductVersion.release_date).label('latest_release')
-        ).join(Product, Product.vendor_id == Vendor.id) \
-         .join(ProductVersion, ProductVersion.product_id == Product.id) \
-         .group_by(Vendor.id, Vendor.name) \
-         .order_by(func.max(ProductVersion.release_date).desc().nullslast()) \
-         .first()
-        most_used = db.session.query(
-            Vendor.name,
-            func.count(func.distinct(Configuration.id)).label('cfg_use')
-        ).join(Product, Product.vendor_id == Vendor.id) \
-         .join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-         .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id) \
-         .group_by(Vendor.id, Vendor.name) \
-         .order_by(func.count(func.distinct(Configuration.id)).desc()) \
-         .first()
+        summary = insight_summary()
         return jsonify({
-            'most_versions': most_versions.name if most_versions else 'N/A',
-            'most_versions_count': most_versions.ver_count if most_versions else 0,
-            'most_recent_release_vendor': recent_release.name if recent_release else 'N/A',
-            'most_recent_release_date': recent_release.latest_release.isoformat() if (recent_release and recent_release.latest_release) else None,
-            'most_used_vendor': most_used.name if most_used else 'N/A',
-            'most_used_vendor_cfgs': most_used.cfg_use if most_used else 0
+            'most_versions': summary.most_versions_vendor or 'N/A',
+            'most_versions_count': summary.most_versions_count,
+            'most_recent_release_vendor': summary.latest_release_vendor or 'N/A',
+            'most_recent_release_date': summary.latest_release_date.isoformat() if summary.latest_release_date else None,
+            'most_used_vendor': summary.top_vendor or 'N/A',
+            'most_used_vendor_cfgs': summary.top_vendor_configurations
         })
     except Exception as e:
         return json_error_response(f"Error getting vendor performance: {str(e)}")
 
 # -------- AGENCIES LIST (new endpoint) ----------
 @main.route("/api/agencies/list")
+@fragment_cache.cached(Agency, Configuration)
 def agencies_list_fragment():
     """HTMX fragment: agencies list with synthetic implementation counts from Configurations."""
     try:
@@ -957,7 +863,7 @@ def agencies_list_fragment():
         q = db.session.query(Agency, func.coalesce(cfg_sub.c.cfg_count, 0).label('cfg_count')) \
             .outerjoin(cfg_sub, cfg_sub.c.a_id == Agency.id)
         if search:
-            q = q.filter(Agency.name.ilike(f"%{search}%"))
+            q = search_filter(q, Agency, search)
         agencies = q.order_by(Agency.name.asc()).all()
         # Attach synthetic attribute used by legacy template (function_implementations|length)
         result = []
@@ -970,25 +876,9 @@ def agencies_list_fragment():
 
 @main.route("/api/agencies/stats")
 def agencies_stats():
-    """Aggregate agency stats using Configuration model (keeps legacy key names)."""
+    """Aggregate agency stats from the insight rollups (keeps legacy key names)."""
     try:
-        total_agencies = Agency.query.count()
-        active_cfgs = Configuration.query.count()
-        avg_impl = round(active_cfgs / total_agencies, 1) if total_agencies else 0
-        # Average vendors per agency (vendors whose products appear in that agency's configurations)
-        vendor_counts_rows = db.session.query(
-            Configuration.agency_id,
-            func.count(func.distinct(Vendor.id)).label('v_count')
-        ).join(ConfigurationProduct, ConfigurationProduct.configuration_id == Configuration.id) \
-         .join(Product, Product.id == ConfigurationProduct.product_id) \
-         .join(Vendor, Vendor.id == Product.vendor_id) \
-         .group_by(Configuration.agency_id).all()
-        avg_vendors = round(sum(r.v_count for r in vendor_counts_rows) / len(vendor_counts_rows), 1) if vendor_counts_rows else 0
-        return jsonify({
-            'active_implementations': active_cfgs,
-            'avg_implementations_per_agency': avg_impl,
-            'avg_vendors_per_agency': avg_vendors
-        })
+        return jsonify(agency_stats_payload(insight_summary()))
     except Exception as e:
         return json_error_response(f"Error getting agency stats: {str(e)}")
 
@@ -996,30 +886,12 @@ def agencies_stats():
 def agencies_insights():
     """Insights: tech leader (most configurations), common functional area, top vendor."""
     try:
-        tech_leader = db.session.query(
-            Agency.name, func.count(Configuration.id).label('cfg_count')
-        ).join(Configuration, Configuration.agency_id == Agency.id) \
-         .group_by(Agency.id).order_by(func.count(Configuration.id).desc()).first()
-        common_area = db.session.query(
-            FunctionalArea.name, func.count(Configuration.id).label('cfg_count')
-        ).join(Function, Function.functional_area_id == FunctionalArea.id) \
-         .join(Configuration, Configuration.function_id == Function.id) \
-         .group_by(FunctionalArea.id).order_by(func.count(Configuration.id).desc()).first()
-        top_vendor = db.session.query(
-            Vendor.name, func.count(func.distinct(Configuration.id)).label('cfg_use')
-        ).join(Product, Product.vendor_id == Vendor.id) \
-         .join(ConfigurationProduct, ConfigurationProduct.product_id == Product.id) \
-         .join(Configuration, Configuration.id == ConfigurationProduct.configuration_id) \
-         .group_by(Vendor.id).order_by(func.count(func.distinct(Configuration.id)).desc()).first()
-        return jsonify({
-            'tech_leader': tech_leader.name if tech_leader else 'N/A',
-            'common_area': common_area.name if common_area else 'N/A',
-            'top_vendor': top_vendor.name if top_vendor else 'N/A'
-        })
+        return jsonify(agency_insights_payload(insight_summary()))
     except Exception as e:
         return json_error_response(f"Error getting agency insights: {str(e)}")
 
 @main.route("/api/agencies/<int:agency_id>/details")
+@fragment_cache.conditional(Agency, Configuration)
 def agency_details_fragment(agency_id):
     """HTMX fragment: agency details panel (adapts to legacy template expectations)."""
     try:
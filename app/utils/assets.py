@@ -0,0 +1,156 @@
+# app/utils/assets.py
+"""Manifest of image assets under static/images.
+
+Scanning every static/images/*_logos and *_headers directory once turns
+"does this logo exist, and what is its URL" into a dict lookup instead of
+a stat() per row rendered. Each URL carries a short content hash (?v=...),
+so browsers may cache it for a year: a changed file gets a new URL.
+
+At most every ASSET_MANIFEST_CHECK_INTERVAL seconds (0 disables the
+check) one request stats static/images and the scanned directories, and
+the manifest rescans if any of their mtimes moved: that catches files
+added, removed or renamed. A file edited in place leaves its directory
+alone, so it is only noticed where every file is also stat()ed (watch_files,
+on in debug mode) or after `flask assets-refresh`, which touches the
+directories so every worker rescans.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from flask import current_app, has_app_context, request, url_for
+
+IMAGE_DIR_SUFFIXES = ('_logos', '_headers')
+FINGERPRINT_ARG = 'v'
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+class AssetManifest:
+    """Static path ('images/vendor_logos/x_logo.png') -> content fingerprint"""
+
+    def __init__(self, static_folder: str, check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 watch_files: bool = False):
+        self.static_folder = static_folder
+        self.check_interval = check_interval
+        # Also stat every scanned file on each check (catches in-place edits)
+        self.watch_files = watch_files
+        self._fingerprints: Dict[str, str] = {}
+        self._stats: Dict[str, Tuple[float, int]] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Held by the one request running a check; others keep the current manifest
+        self._check_lock = threading.Lock()
+        self.refresh()
+
+    def _image_dirs(self):
+        images = os.path.join(self.static_folder, 'images')
+        try:
+            entries = list(os.scandir(images))
+        except FileNotFoundError:
+            return []
+        return sorted(e.path for e in entries if e.is_dir() and e.name.endswith(IMAGE_DIR_SUFFIXES))
+
+    def _directories(self):
+        return [os.path.join(self.static_folder, 'images')] + self._image_dirs()
+
+    def _snapshot(self) -> Dict[str, Tuple[float, int]]:
+        # Directory mtimes catch added/removed files, file stats catch in-place edits
+        paths = self._directories()
+        if self.watch_files:
+            paths += [os.path.join(self.static_folder, rel) for rel in self._fingerprints]
+        snapshot = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_mtime, st.st_size)
+        return snapshot
+
+    def refresh(self) -> int:
+        """Rescan the image directories; returns the number of assets found"""
+        fingerprints = {}
+        for directory in self._image_dirs():
+            for entry in os.scandir(directory):
+                if entry.is_file():
+                    rel = os.path.relpath(entry.path, self.static_folder).replace(os.sep, '/')
+                    fingerprints[rel] = file_fingerprint(entry.path)
+        with self._lock:
+            self._fingerprints = fingerprints
+            self._stats = self._snapshot()
+            self._checked_at = time.monotonic()
+        return len(fingerprints)
+
+    def touch(self) -> int:
+        """Bump the scanned directories' mtimes so every process rescans on its next check"""
+        directories = self._directories()
+        for path in directories:
+            os.utime(path)
+        return len(directories)
+
+    def _due(self) -> bool:
+        return self.check_interval > 0 and time.monotonic() - self._checked_at >= self.check_interval
+
+    def _refresh_if_changed(self) -> None:
+        if not self._due() or not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            # Another request may have finished a check while this one waited
+            if not self._due():
+                return
+            if self._snapshot() != self._stats:
+                self.refresh()
+            else:
+                self._checked_at = time.monotonic()
+        finally:
+            self._check_lock.release()
+
+    def fingerprint(self, path: str) -> Optional[str]:
+        self._refresh_if_changed()
+        return self._fingerprints.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return self.fingerprint(path) is not None
+
+
+def init_app(app) -> AssetManifest:
+    """Build the manifest for app and mark fingerprinted static responses immutable"""
+    manifest = AssetManifest(app.static_folder,
+                             app.config.get('ASSET_MANIFEST_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL),
+                             watch_files=app.debug)
+    app.extensions['asset_manifest'] = manifest
+
+    @app.after_request
+    def _cache_fingerprinted_assets(response):
+        if request.endpoint == 'static' and FINGERPRINT_ARG in request.args and response.status_code == 200:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+    return manifest
+
+
+def asset_url(path: str) -> Optional[str]:
+    """Fingerprinted URL for a scanned static asset, or None if it does not exist"""
+    if not has_app_context():
+        return None
+    manifest = current_app.extensions.get('asset_manifest')
+    if manifest is None:
+        return None
+    fingerprint = manifest.fingerprint(path)
+    if fingerprint is None:
+        return None
+    return url_for('static', filename=path, **{FINGERPRINT_ARG: fingerprint})
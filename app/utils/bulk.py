@@ -0,0 +1,269 @@
+# app/utils/bulk.py
+"""Bulk get-or-create for the JSON data loaders.
+
+Looking every record (and every vendor, function, standard or tag it
+references) up with filter_by(name=...).first() and flushing rows one at
+a time makes seeding cost a few round trips per record. BulkLoader does
+the same work in a handful of statements per model:
+
+- the first time a model is used, one query loads its key -> id map
+  (KeyIndex), so existence checks and references resolve in memory;
+- new rows are queued with add(); foreign keys to rows that are queued
+  but not yet inserted are written as Ref(Model, name) placeholders;
+- flush() inserts the queue model by model in foreign-key order with
+  executemany INSERTs (RETURNING the new ids where the dialect allows),
+  then many-to-many links queued with link();
+- the transaction is committed every commit_every inserted rows
+  (default batch_size; None leaves committing to the caller).
+
+Bulk inserts skip the ORM flush, so the session hooks that keep the
+fragment caches, search index and insight rollups current never see them.
+finish() makes up for that: it reports the touched tables to the cache
+invalidation hooks and rebuilds the search index and rollups where they
+are in use.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import insert, select
+from app import db
+
+DEFAULT_BATCH_SIZE = 1000
+
+_MISSING = object()
+
+
+def normalize_name(name: Any) -> Any:
+    """Case- and whitespace-insensitive form of a name; other values unchanged"""
+    if isinstance(name, str):
+        return ' '.join(name.split()).lower()
+    return name
+
+
+class Ref(NamedTuple):
+    """Foreign key to the row of model whose key is name (resolved at flush time)"""
+    model: type
+    name: Any
+
+
+class KeyIndex:
+    """Normalized key -> id for every row of a model, loaded in one query"""
+
+    def __init__(self, session, model, key: Sequence[str] = ('name',)):
+        self.model = model
+        self.key = tuple(key)
+        columns = [getattr(model, c) for c in self.key]
+        self._ids: Dict[Hashable, int] = {}
+        for row in session.execute(select(model.id, *columns)):
+            self.add(row[1:], row[0])
+
+    def normalize(self, values: Sequence[Any]) -> Hashable:
+        key = tuple(normalize_name(v) for v in values)
+        return key[0] if len(key) == 1 else key
+
+    def add(self, values: Sequence[Any], id_: int) -> None:
+        self._ids.setdefault(self.normalize(values), id_)
+
+    def get(self, *values) -> Optional[int]:
+        return self._ids.get(self.normalize(values))
+
+    def __contains__(self, values) -> bool:
+        if not isinstance(values, tuple):
+            values = (values,)
+        return self.normalize(values) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def model_values(model, record: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """Insert values for model taken from a JSON record.
+
+    Keys that are not columns of model (including the JSON file's own 'id')
+    are dropped, so seed files written for older schemas still load.
+    """
+    columns = model.__table__.columns
+    values = {k: v for k, v in record.items() if k in columns and k != 'id'}
+    values.update(overrides)
+    return values
+
+
+class BulkLoader:
+    """Queue rows and many-to-many links, then insert them in bulk"""
+
+    def __init__(self, session=None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit_every: Optional[int] = _MISSING):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.session = session or db.session
+        self.batch_size = batch_size
+        self.commit_every = batch_size if commit_every is _MISSING else commit_every
+        self._indexes: Dict[type, KeyIndex] = {}
+        self._pending: Dict[type, List[Dict[str, Any]]] = defaultdict(list)
+        self._pending_keys: Dict[type, Set[Hashable]] = defaultdict(set)
+        self._links: Dict[Any, List[Tuple[Ref, Ref]]] = defaultdict(list)
+        self._uncommitted = 0
+        self._uncommitted_tables: Set[str] = set()
+        self.touched: Set[str] = set()
+        # model/table name -> {'added': n, 'skipped': n, 'unresolved': n}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    # --- lookups ---------------------------------------------------------
+
+    def index(self, model, key: Sequence[str] = ('name',)) -> KeyIndex:
+        """The model's key index, loading it on first use"""
+        index = self._indexes.get(model)
+        if index is None or index.key != tuple(key):
+            index = self._indexes[model] = KeyIndex(self.session, model, key)
+        return index
+
+    def id_of(self, model, *key) -> Optional[int]:
+        """Id of an existing (or already inserted) row, None if there is none yet"""
+        return self._index_for(model).get(*key)
+
+    def exists(self, model, *key) -> bool:
+        """Whether a row with this key is in the database or queued"""
+        index = self._index_for(model)
+        return key in index or index.normalize(key) in self._pending_keys[model]
+
+    def _index_for(self, model) -> KeyIndex:
+        index = self._indexes.get(model)
+        return index if index is not None else self.index(model)
+
+    # --- queueing --------------------------------------------------------
+
+    def add(self, model, values: Dict[str, Any], key: Sequence[str] = ('name',)) -> bool:
+        """Queue a row unless one with the same key exists or is queued; returns True if queued"""
+        index = self.index(model, key)
+        key_values = tuple(values[c] for c in index.key)
+        normalized = index.normalize(key_values)
+        if key_values in index or normalized in self._pending_keys[model]:
+            self.stats[model.__name__]['skipped'] += 1
+            return False
+        self._pending_keys[model].add(normalized)
+        self._pending[model].append(values)
+        return True
+
+    def get_or_create(self, model, name: Any, **defaults) -> Ref:
+        """Reference to the row named name, queueing it with defaults if it does not exist"""
+        if not self.exists(model, name):
+            self.add(model, {'name': name, **defaults})
+        return Ref(model, name)
+
+    def link(self, table, left: Ref, right: Ref) -> None:
+        """Queue a row of a many-to-many table between two (possibly queued) rows"""
+        self._links[table].append((left, right))
+
+    # --- writing ---------------------------------------------------------
+
+    def flush(self) -> None:
+        """Insert everything queued: rows in foreign-key order, then links"""
+        order = {table: i for i, table in enumerate(db.metadata.sorted_tables)}
+        for model in sorted(self._pending, key=lambda m: order[m.__table__]):
+            rows, self._pending[model] = self._pending[model], []
+            self._pending_keys[model].clear()
+            self._insert_rows(model, rows)
+        self._pending.clear()
+        for table in sorted(self._links, key=lambda t: order[t]):
+            self._insert_links(table, self._links.pop(table))
+
+    def finish(self) -> Dict[str, Dict[str, int]]:
+        """Flush, commit, and refresh what the ORM hooks would have; returns stats"""
+        self.flush()
+        self.commit()
+        self.refresh_derived()
+        return {name: dict(counts) for name, counts in self.stats.items()}
+
+    def _resolve(self, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        resolved = {}
+        for column, value in values.items():
+            if isinstance(value, Ref):
+                value = self.id_of(value.model, value.name)
+                if value is None:
+                    return None
+            resolved[column] = value
+        return resolved
+
+    def _insert_rows(self, model, rows: List[Dict[str, Any]]) -> None:
+        index = self._index_for(model)
+        stats = self.stats[model.__name__]
+        resolved = []
+        for values in rows:
+            row = self._resolve(values)
+            if row is None:
+                stats['unresolved'] += 1
+            else:
+                resolved.append(row)
+        if not resolved:
+            return
+        key_columns = [getattr(model, c) for c in index.key]
+        returning = self.session.get_bind().dialect.insert_executemany_returning
+        for start in range(0, len(resolved), self.batch_size):
+            batch = resolved[start:start + self.batch_size]
+            if returning:
+                for row in self.session.execute(insert(model).returning(model.id, *key_columns), batch):
+                    index.add(row[1:], row[0])
+            else:
+                self.session.execute(insert(model), batch)
+            self._inserted(model.__table__, len(batch))
+            stats['added'] += len(batch)
+        if not returning:
+            self._indexes[model] = KeyIndex(self.session, model, index.key)
+
+    def _insert_links(self, table, pairs: List[Tuple[Ref, Ref]]) -> None:
+        stats = self.stats[table.name]
+        left_model, right_model = pairs[0][0].model, pairs[0][1].model
+        left_col = _column_referencing(table, left_model)
+        right_col = _column_referencing(table, right_model)
+        existing = set(self.session.execute(select(left_col, right_col)).tuples())
+        rows = []
+        for left, right in pairs:
+            ids = (self.id_of(left.model, left.name), self.id_of(right.model, right.name))
+            if None in ids:
+                stats['unresolved'] += 1
+            elif ids in existing:
+                stats['skipped'] += 1
+            else:
+                existing.add(ids)
+                rows.append({left_col.name: ids[0], right_col.name: ids[1]})
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            self.session.execute(table.insert(), batch)
+            self._inserted(table, len(batch))
+            stats['added'] += len(batch)
+
+    def _inserted(self, table, count: int) -> None:
+        self.touched.add(table.name)
+        self._uncommitted_tables.add(table.name)
+        self._uncommitted += count
+        if self.commit_every is not None and self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        # Hand the bulk-inserted tables to the cache invalidation hooks
+        # (app.utils.cache), which otherwise only learn of ORM flushes
+        if self._uncommitted_tables:
+            self.session.info.setdefault('touched_tables', set()).update(self._uncommitted_tables)
+        self.session.commit()
+        self._uncommitted = 0
+        self._uncommitted_tables = set()
+
+    def refresh_derived(self) -> None:
+        """Rebuild the search index and rollups if this loader inserted rows they cover"""
+        if not self.touched:
+            return
+        from app.utils.rollups import rebuild_rollups, rollups_built
+        from app.utils.search import SEARCHABLE, index_dialect, rebuild_search_index
+        searchable = {spec.model.__tablename__ for spec in SEARCHABLE.values()}
+        if self.touched & searchable and index_dialect(self.session.connection()):
+            rebuild_search_index(self.session)
+        # Each rebuild commits, so ask the session for a fresh connection
+        if rollups_built(self.session.connection()):
+            rebuild_rollups(self.session)
+
+
+def _column_referencing(table, model):
+    for column in table.columns:
+        if any(fk.column.table is model.__table__ for fk in column.foreign_keys):
+            return column
+    raise ValueError(f"{table.name} has no foreign key to {model.__tablename__}")
+
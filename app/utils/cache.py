@@ -0,0 +1,328 @@
+# app/utils/cache.py
+"""Caches for read-heavy views.
+
+TTLCache holds small computed values in-process; entries expire after a
+TTL and can be dropped early when a commit touches the tables they were
+computed from (see invalidate_on_commit). Each worker process holds its
+own copy, so the TTL bounds how stale a worker can be after another
+process commits.
+
+FragmentCache stores rendered HTMX fragments keyed on endpoint, view
+arguments, normalized query args and a version number per source table.
+A commit bumps the versions of the tables it touched, so stale entries
+are simply never read again. Versions live in the backend, so with the
+Redis backend every worker sees a bump as soon as it happens. The default
+in-process LRU backend only sees its own worker's commits; its short TTL
+bounds how long other workers keep serving the old fragment.
+
+The same table versions, plus an optional per-row version, drive strong
+ETags for detail fragments (FragmentCache.conditional): a matching
+If-None-Match is answered with 304 before the view runs.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe key -> value store whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+
+    def get_or_set(self, key: Any, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def tables_touched(session: Session) -> set:
+    """Names of the tables with pending inserts, updates or deletes in a session"""
+    tables = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(type(obj), '__table__', None)
+        if table is not None:
+            tables.add(table.name)
+    return tables
+
+
+# Callbacks run after a commit with the set of table names it changed
+_commit_listeners: List[Callable[[set], None]] = []
+
+
+def on_commit_touching(callback: Callable[[set], None]) -> None:
+    """Call callback(touched_table_names) after every commit that changed rows"""
+    _commit_listeners.append(callback)
+
+
+def invalidate_on_commit(cache: TTLCache, table_names: Iterable[str]) -> None:
+    """Clear cache after any commit that flushed changes to one of table_names"""
+    table_names = frozenset(table_names)
+
+    def clear_if_touched(touched):
+        if touched & table_names:
+            cache.clear()
+    on_commit_touching(clear_if_touched)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_touched_tables(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    session.info.setdefault('touched_tables', set()).update(tables_touched(session))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_touched(session):
+    touched = session.info.pop('touched_tables', None)
+    if not touched:
+        return
+    for callback in _commit_listeners:
+        callback(touched)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_touched(session):
+    session.info.pop('touched_tables', None)
+
+
+class LRUBackend:
+    """In-process fragment store: bounded LRU with per-entry expiry"""
+    # Counters are per process, so other workers' commits are not seen...
+    shared = False
+    # ...and a short default TTL bounds how long another worker serves stale fragments
+    default_ttl = 5
+
+    def __init__(self, max_entries: int = 512):
+        # Distinguishes counters of this process from any other (or a restart)
+        self.epoch = uuid.uuid4().hex
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, names: List[str]) -> List[int]:
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Shared fragment store for multi-worker deploys (Redis or any RESP-compatible server).
+
+    Needs the optional redis package; entries expire server-side.
+    """
+    shared = True
+    default_ttl = 300
+
+    def __init__(self, url: str, prefix: str = 'fragment:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("FRAGMENT_CACHE_BACKEND='redis' requires the redis package") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        # Shared by every worker; regenerated if the server loses its data (and counters)
+        self.client.set(f"{prefix}epoch", uuid.uuid4().hex, nx=True)
+        self.epoch = self.client.get(f"{prefix}epoch").decode('utf-8')
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value.encode('utf-8'), ex=max(1, int(ttl)))
+
+    def get_counters(self, names: List[str]) -> List[int]:
+        if not names:
+            return []
+        values = self.client.mget([f"{self.prefix}v:{name}" for name in names])
+        return [int(v) if v is not None else 0 for v in values]
+
+    def incr(self, name: str) -> None:
+        self.client.incr(f"{self.prefix}v:{name}")
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+def normalize_args(args) -> List[Tuple[str, str]]:
+    """Query args as sorted (name, value) pairs, whitespace-trimmed, blanks dropped"""
+    pairs = []
+    for name in args:
+        for value in args.getlist(name):
+            value = value.strip()
+            if value:
+                pairs.append((name, value))
+    return sorted(pairs)
+
+
+def mark_uncacheable() -> None:
+    """Keep the current response out of the fragment cache (e.g. error fragments)"""
+    g.fragment_cache_skip = True
+
+
+class FragmentCache:
+    """Cache rendered fragments per app; configure with FRAGMENT_CACHE_* settings.
+
+    FRAGMENT_CACHE_BACKEND: 'lru' (default), 'redis' or 'none'
+    FRAGMENT_CACHE_URL: Redis URL for the redis backend
+    FRAGMENT_CACHE_TTL: seconds an entry may live (default 5 for lru, 300 for redis)
+    FRAGMENT_CACHE_MAX_ENTRIES: LRU size (default 512)
+    """
+
+    def init_app(self, app) -> None:
+        backend_name = app.config.get('FRAGMENT_CACHE_BACKEND', 'lru')
+        if backend_name == 'redis':
+            backend = RedisBackend(app.config['FRAGMENT_CACHE_URL'])
+        elif backend_name == 'lru':
+            backend = LRUBackend(app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 512))
+        else:
+            backend = None
+        app.extensions['fragment_cache'] = backend
+
+    @staticmethod
+    def backend():
+        return current_app.extensions.get('fragment_cache') if has_app_context() else None
+
+    @staticmethod
+    def ttl(backend) -> float:
+        return current_app.config.get('FRAGMENT_CACHE_TTL') or backend.default_ttl
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        backend = self.backend()
+        if backend is not None:
+            for table in sorted(tables):
+                backend.incr(table)
+
+    def make_key(self, backend, tables: List[str]) -> str:
+        versions = backend.get_counters(tables)
+        payload = json.dumps([request.view_args, normalize_args(request.args), versions],
+                             sort_keys=True, default=str)
+        return f"{request.endpoint}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+    def cached(self, *sources) -> Callable:
+        """Cache a GET fragment view until a commit touches one of sources (models or table names)"""
+        tables = sorted(getattr(s, '__tablename__', s) for s in sources)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                backend = self.backend()
+                if backend is None or request.method != 'GET':
+                    return view(*args, **kwargs)
+                key = self.make_key(backend, tables)
+                body = backend.get(key)
+                if body is not None:
+                    return Response(body, mimetype='text/html', headers={'X-Fragment-Cache': 'hit'})
+
+                rv = view(*args, **kwargs)
+                if isinstance(rv, str) and not g.pop('fragment_cache_skip', False):
+                    backend.set(key, rv, self.ttl(backend))
+                return rv
+            return wrapper
+        return decorator
+
+    def etag(self, backend, tables: List[str], row_version: Any = None) -> str:
+        """Strong validator for the current request's fragment"""
+        parts = [backend.epoch, request.endpoint, request.view_args, normalize_args(request.args),
+                 backend.get_counters(tables), row_version, date.today()]
+        if not backend.shared:
+            # Commits in other workers are invisible here, so bound staleness by the TTL
+            parts.append(int(time.time() // self.ttl(backend)))
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def conditional(self, *sources, row_version: Optional[Callable[..., Any]] = None) -> Callable:
+        """Answer If-None-Match with 304 for a GET fragment without running the view.
+
+        The ETag covers the tables in sources (models or table names) and,
+        if given, row_version(**view_args) -- e.g. the row's updated_at.
+        """
+        tables = sorted(getattr(s, '__tablename__', s) for s in sources)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                backend = self.backend()
+                if backend is None or request.method != 'GET':
+                    return view(*args, **kwargs)
+                etag = self.etag(backend, tables, row_version(**kwargs) if row_version else None)
+                if etag in request.if_none_match:
+                    response = Response(status=304)
+                else:
+                    rv = view(*args, **kwargs)
+                    if not isinstance(rv, str) or g.pop('fragment_cache_skip', False):
+                        return rv
+                    response = Response(rv, mimetype='text/html')
+                response.set_etag(etag)
+                # Let browsers keep the fragment but always revalidate it
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+            return wrapper
+        return decorator
+
+
+fragment_cache = FragmentCache()
+on_commit_touching(fragment_cache.invalidate_tables)
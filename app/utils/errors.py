@@ -1,5 +1,6 @@
 # app/utils/errors.py
-from flask import jsonify, render_template_string
+from flask import jsonify, render_template_string, has_request_context
+from app.utils.cache import mark_uncacheable
 
 def json_error_response(message, status_code=400, details=None):
     """
@@ -54,6 +55,8 @@ def html_error_fragment(message, title="Error"):
     """
     Return an HTML error fragment for HTMX responses (legacy support)
     """
+    if has_request_context():
+        mark_uncacheable()
     template = '''
     <div class="bg-red-900/20 border border-red-700/30 rounded-lg p-4 mb-4">
         <div class="flex items-center space-x-3">
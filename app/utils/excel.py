@@ -0,0 +1,147 @@
+# app/utils/excel.py
+"""Streaming Excel exports built on openpyxl's write-only mode.
+
+Rows are pulled from any iterable (typically a query using yield_per) and
+never held in memory all at once: they are spooled to a temporary file
+while column widths are measured, then written through a write-only
+worksheet, and the finished workbook is streamed back in chunks.
+
+openpyxl is imported lazily so unrelated code paths and tests do not
+need it installed.
+"""
+import pickle
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from flask import Response
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Workbooks smaller than this stay in memory; larger ones roll over to disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+HEADER_ROW = 4
+
+CellStyler = Callable[[int, Any], Optional[Dict[str, Any]]]
+
+
+class ExcelExport:
+    """One-sheet export: title, generated-at line, styled header, bordered data rows.
+
+    cell_style(column_index, value) may return openpyxl style attributes
+    (font, fill, alignment, ...) for an individual data cell.
+    """
+
+    def __init__(self, title: str, headers: Sequence[str], sheet_title: Optional[str] = None,
+                 max_width: int = 48, cell_style: Optional[CellStyler] = None):
+        self.title = title
+        self.headers = list(headers)
+        self.sheet_title = sheet_title or title
+        self.max_width = max_width
+        self.cell_style = cell_style
+        self.row_count = 0
+
+    def spool_rows(self, rows: Iterable[Sequence[Any]], spool) -> List[int]:
+        """Copy rows to a temporary file, returning the widest value per column.
+
+        Short rows are padded with blanks when written; a row with more values
+        than there are headers raises ValueError, before any output is built.
+        """
+        widths = [len(h) for h in self.headers]
+        count = 0
+        for values in rows:
+            values = tuple(values)
+            if len(values) > len(widths):
+                raise ValueError(f"Row {count + 1} of '{self.title}' has {len(values)} values "
+                                 f"for {len(widths)} columns")
+            for idx, value in enumerate(values):
+                if value is not None:
+                    width = len(str(value))
+                    if width > widths[idx]:
+                        widths[idx] = width
+            pickle.dump(values, spool, pickle.HIGHEST_PROTOCOL)
+            count += 1
+        self.row_count = count
+        spool.seek(0)
+        return widths
+
+    @staticmethod
+    def read_spool(spool, count: int) -> Iterator[tuple]:
+        for _ in range(count):
+            yield pickle.load(spool)
+
+    def write(self, rows: Iterable[Sequence[Any]]):
+        """Build the workbook; returns a file object positioned at the start"""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+        from openpyxl.utils import get_column_letter
+
+        last_column = get_column_letter(len(self.headers))
+        with tempfile.TemporaryFile() as spool:
+            widths = self.spool_rows(rows, spool)
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet(self.sheet_title[:31])
+            # Write-only sheets emit column widths and panes before the first row
+            for idx, width in enumerate(widths, start=1):
+                ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, self.max_width)
+            ws.freeze_panes = f"A{HEADER_ROW + 1}"
+
+            thin = Side(style="thin", color="374151")  # slate-700
+            border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+            def cell(value, **style):
+                c = WriteOnlyCell(ws, value=value)
+                for attr, val in style.items():
+                    setattr(c, attr, val)
+                return c
+
+            ws.append([cell(self.title, font=Font(size=14, bold=True))])
+            ws.append([cell(f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}",
+                            font=Font(size=10, color="6B7280"))])
+            ws.append([])  # spacer so the header lands on HEADER_ROW
+            header_font = Font(color="FFFFFF", bold=True)
+            header_fill = PatternFill("solid", fgColor="1F2937")  # slate-800
+            ws.append([cell(h, font=header_font, fill=header_fill,
+                            alignment=Alignment(vertical="center"), border=border)
+                       for h in self.headers])
+            ws.merged_cells.add(f"A1:{last_column}1")
+
+            for values in self.read_spool(spool, self.row_count):
+                out = []
+                for idx in range(len(self.headers)):
+                    value = values[idx] if idx < len(values) else None
+                    style = self.cell_style(idx, value) if self.cell_style else None
+                    out.append(cell(value, border=border, **(style or {})))
+                ws.append(out)
+
+            ws.auto_filter.ref = f"A{HEADER_ROW}:{last_column}{HEADER_ROW + max(self.row_count, 1)}"
+
+            output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            wb.save(output)
+        output.seek(0)
+        return output
+
+    def response(self, rows: Iterable[Sequence[Any]], filename: str) -> Response:
+        """Build the workbook and stream it as a chunked attachment"""
+        return stream_file_response(self.write(rows), filename, XLSX_MIMETYPE)
+
+
+def stream_file_response(fileobj, filename: str, mimetype: str,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> Response:
+    """Stream an open file in chunks (no Content-Length, so chunked transfer), closing it afterwards"""
+    def generate():
+        try:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            fileobj.close()
+
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
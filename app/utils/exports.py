@@ -0,0 +1,129 @@
+# app/utils/exports.py
+"""Registry of downloadable exports.
+
+Each export is a builder function registered under a kind name together
+with the request parameters it accepts and the tables it reads. The same
+builder serves the synchronous download routes and background export
+jobs (app.utils.jobs); the tables give jobs a data version (app.utils.jobs.data_version) to decide when
+a finished file can be handed out again.
+
+A builder takes the cleaned params and a progress(done, total) callback
+and returns an open file object positioned at the start.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence
+from sqlalchemy import func
+from app import db
+from app.models.tran import (
+    Component, Configuration, Function, FunctionalArea, function_component,
+)
+from app.utils.excel import XLSX_MIMETYPE, ExcelExport
+from app.utils.search import search_filter
+from app.utils.stats import criticality_sort_key, function_stats
+
+Progress = Callable[[int, int], None]
+PROGRESS_EVERY = 500
+
+
+class ExportSpec(NamedTuple):
+    kind: str
+    build: Callable[[Dict[str, str], Progress], Any]
+    params: Sequence[str]
+    tables: Sequence[str]
+    extension: str
+    mimetype: str
+
+    def clean_params(self, args) -> Dict[str, str]:
+        """Accepted parameters from a mapping (e.g. request.args), trimmed, blanks dropped"""
+        cleaned = {}
+        for name in self.params:
+            value = (args.get(name) or '').strip()
+            if value:
+                cleaned[name] = value
+        return cleaned
+
+
+EXPORTS: Dict[str, ExportSpec] = {}
+
+
+def register_export(kind: str, tables: Sequence[Any], params: Sequence[str] = (),
+                    extension: str = 'xlsx', mimetype: str = XLSX_MIMETYPE):
+    """Register a builder under kind; tables are models or table names it reads"""
+    def decorator(build):
+        EXPORTS[kind] = ExportSpec(kind, build, tuple(params),
+                                   tuple(sorted(getattr(t, '__tablename__', getattr(t, 'name', t)) for t in tables)),
+                                   extension, mimetype)
+        return build
+    return decorator
+
+
+def track_progress(rows: Iterable, total: int, progress: Optional[Progress],
+                   every: int = PROGRESS_EVERY) -> Iterator:
+    """Pass rows through, calling progress(done, total) every `every` rows"""
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if progress and done % every == 0:
+            progress(done, total)
+    if progress:
+        progress(done, total)
+
+
+# Link-table edits flush as changes to the Component/Function rows, so list those too
+@register_export('functional_areas', [FunctionalArea, Function, function_component, Configuration, Component],
+                 params=('search',))
+def functional_areas_workbook(params: Dict[str, str], progress: Optional[Progress] = None):
+    """Functional Areas with their Functions.
+
+    Columns: Functional Area, Function, Criticality, # Components, # Agencies
+    Styling: title row, header styling, borders, auto-width, frozen header, autofilter,
+    conditional fill by criticality. Rows stream from the database into a write-only
+    workbook (see app.utils.excel).
+    """
+    from openpyxl.styles import Font, Alignment, PatternFill
+
+    q = (db.session.query(FunctionalArea.name, Function.id, Function.name, Function.criticality)
+         .outerjoin(Function, Function.functional_area_id == FunctionalArea.id))
+    search = params.get('search')
+    if search:
+        q = search_filter(q, FunctionalArea, search)
+    # Functions sorted by criticality then name for consistency with print view
+    q = q.order_by(FunctionalArea.name.asc(), FunctionalArea.id, criticality_sort_key(),
+                   func.lower(Function.name))
+
+    # Component and agency counts for every exported function in two grouped queries
+    stats = function_stats(fid for (fid,) in q.with_entities(Function.id).order_by(None) if fid is not None)
+    total = q.order_by(None).count() if progress else 0
+
+    def rows():
+        for area_name, function_id, function_name, criticality in q.yield_per(1000):
+            if function_id is None:
+                # Emit an area line with em dash if no functions yet
+                yield (area_name, "—", None, None, None)
+                continue
+            crit_val = getattr(criticality, 'value', None)
+            component_count, agency_count = stats[function_id]
+            yield (area_name, function_name, crit_val.title() if crit_val else None,
+                   component_count, agency_count)
+
+    crit_fills = {
+        "High": PatternFill("solid", fgColor="B91C1C"),    # red-700
+        "Medium": PatternFill("solid", fgColor="B45309"),  # amber-700
+        "Low": PatternFill("solid", fgColor="065F46"),     # emerald-800
+    }
+    badge_font = Font(color="FFFFFF", bold=True)
+    badge_alignment = Alignment(horizontal="center")
+
+    def criticality_badge(column, value):
+        # Color only the criticality cell for subtlety
+        if column == 2 and value in crit_fills:
+            return {'fill': crit_fills[value], 'font': badge_font, 'alignment': badge_alignment}
+        return None
+
+    export = ExcelExport(
+        "Functional Areas Export",
+        ["Functional Area", "Function", "Criticality", "# Components", "# Agencies"],
+        sheet_title="Functional Areas",
+        cell_style=criticality_badge,
+    )
+    return export.write(track_progress(rows(), total, progress))
@@ -0,0 +1,129 @@
+# app/utils/instrumentation.py
+"""Per-request SQL instrumentation.
+
+Cursor-execute hooks on every engine count the statements a request runs
+and time them. After the request the totals go out as a Server-Timing
+header (visible in the browser's network panel) and a structured log
+line; any statement slower than SLOW_QUERY_MS is logged on its own with
+the route that ran it.
+
+Settings:
+    SQL_INSTRUMENTATION: enable the hooks (default True)
+    SLOW_QUERY_MS: slow-query log threshold in milliseconds (default 250)
+    SQL_TIMING_TOP: how many of the slowest statements to report (default 3)
+    SQL_TIMING_DETAIL: put the slowest statements' SQL in Server-Timing
+        (default: only in debug mode, since the header is public)
+"""
+import heapq
+import time
+from typing import List, Tuple
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.logging import log_debug, log_slow_query
+
+STATEMENT_PREVIEW_LENGTH = 200
+SERVER_TIMING_DESC_LENGTH = 80
+
+
+class RequestQueryStats:
+    """Query count, total time and the slowest statements of one request"""
+
+    def __init__(self, top: int = 3):
+        self.top = top
+        self.count = 0
+        self.total = 0.0
+        self._slowest: List[Tuple[float, int, str]] = []
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        entry = (elapsed, self.count, statement)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(elapsed, statement) for elapsed, _, statement in sorted(self._slowest, reverse=True)]
+
+    def server_timing(self, detail: bool = False) -> str:
+        elapsed = time.perf_counter() - self.started
+        parts = [
+            f'db;dur={self.total * 1000:.1f};desc="{self.count} queries"',
+            f'app;dur={elapsed * 1000:.1f}',
+        ]
+        if detail:
+            for i, (seconds, statement) in enumerate(self.slowest, 1):
+                parts.append(f'sql-{i};dur={seconds * 1000:.1f};desc="{_header_text(statement)}"')
+        return ', '.join(parts)
+
+
+def _preview(statement: str, length: int = STATEMENT_PREVIEW_LENGTH) -> str:
+    text = ' '.join(statement.split())
+    return text if len(text) <= length else text[:length - 1] + '…'
+
+
+def _header_text(statement: str) -> str:
+    # Server-Timing desc is a quoted string; keep it ASCII and quote-free
+    text = _preview(statement, SERVER_TIMING_DESC_LENGTH)
+    return text.replace('\\', ' ').replace('"', "'").encode('ascii', 'replace').decode('ascii')
+
+
+def _current_stats():
+    return g.get('sql_stats') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current_stats()
+    if stats is None:
+        return
+    stats.record(statement, elapsed)
+    threshold = current_app.config.get('SLOW_QUERY_MS', 250)
+    if threshold is not None and elapsed * 1000 >= threshold:
+        log_slow_query(request.endpoint, elapsed * 1000, _preview(statement))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _drop_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    started = conn.info.get('query_started') if conn is not None else None
+    if started:
+        started.pop()
+
+
+def init_app(app) -> None:
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+
+    @app.before_request
+    def _start_query_stats():
+        g.sql_stats = RequestQueryStats(app.config.get('SQL_TIMING_TOP', 3))
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        detail = app.config.get('SQL_TIMING_DETAIL', app.debug)
+        response.headers.add('Server-Timing', stats.server_timing(detail))
+        log_debug('SQL_REQUEST_STATS',
+                  route=request.endpoint,
+                  queries=stats.count,
+                  db_ms=round(stats.total * 1000, 1),
+                  slowest=[f"{s * 1000:.1f}ms {_preview(sql, 80)}" for s, sql in stats.slowest])
+        return response
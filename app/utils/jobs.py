@@ -0,0 +1,333 @@
+# app/utils/jobs.py
+"""Background export jobs.
+
+Building a large export inside a request ties up a web worker for the
+whole build. submit_export() records an ExportJob row and hands the build
+to a small thread pool; the client polls /api/jobs/<id> and downloads the
+file from /api/jobs/<id>/download when the job has finished.
+
+Finished files are kept on local disk. A job's cache key combines the
+export kind, its parameters and the data version of the tables the export
+reads, so asking again for the same export while nothing it reads has
+changed returns the finished job instead of building a new file. Data
+versions are counters in the table_versions table, bumped after every
+commit that touches one of those tables, so every worker (and a restart)
+agrees on them. Writes that bypass the session are not counted. A request matching a job still queued or running in
+this process joins that job.
+
+Progress is tracked in memory by the process running the job; the job
+row records the status changes, so polls answered by another worker see
+queued -> running -> finished without the percentages in between.
+
+Settings:
+    EXPORT_JOB_WORKERS: threads building exports (default 2; 0 builds
+        inline in the submitting request, e.g. for tests)
+    EXPORT_ARTIFACT_DIR: where finished files are kept (default <instance>/exports)
+    EXPORT_JOB_RETENTION: seconds finished jobs and their files are kept (default 86400)
+    EXPORT_JOB_TIMEOUT: seconds after which a job not running in this process
+        and not updated is reported failed (default 3600)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.jobs import ExportJob, TableVersion
+from app.utils.cache import on_commit_touching
+from app.utils.exports import EXPORTS, ExportSpec
+from app.utils.logging import log_debug, log_error
+
+ACTIVE_STATUSES = ('queued', 'running')
+# Share of the bar given to streaming rows; the rest is writing the file
+ROW_PROGRESS_SHARE = 95
+COPY_CHUNK_SIZE = 64 * 1024
+
+versions_table = TableVersion.__table__
+# engine -> whether table_versions exists there
+_versions_exist: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class UnknownExport(KeyError):
+    """No export is registered under the requested kind"""
+
+
+class JobRunner:
+    """Per-app thread pool plus live progress of the jobs it is running"""
+
+    def __init__(self, app):
+        self.app = app
+        self.workers = app.config.get('EXPORT_JOB_WORKERS', 2)
+        self.artifact_dir = app.config.get('EXPORT_ARTIFACT_DIR') or os.path.join(app.instance_path, 'exports')
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._progress: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id: str) -> None:
+        with self._lock:
+            self._progress[job_id] = 0
+            if self.workers <= 0:
+                executor = None
+            else:
+                if self._executor is None:
+                    # Created on first use so CLI commands and tests start no threads
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix='export-job')
+                executor = self._executor
+        if executor is None:
+            run_job(self.app, job_id)
+        else:
+            executor.submit(run_job, self.app, job_id)
+
+    def is_live(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._progress
+
+    def progress(self, job_id: str) -> Optional[int]:
+        with self._lock:
+            return self._progress.get(job_id)
+
+    def set_progress(self, job_id: str, percent: int) -> None:
+        with self._lock:
+            if job_id in self._progress:
+                self._progress[job_id] = percent
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._progress.pop(job_id, None)
+
+
+def init_app(app) -> JobRunner:
+    runner = JobRunner(app)
+    app.extensions['export_jobs'] = runner
+    return runner
+
+
+def _runner() -> JobRunner:
+    return current_app.extensions['export_jobs']
+
+
+def cache_key(spec: ExportSpec, params: Dict[str, str], version: Optional[str]) -> str:
+    # Without a data version every job gets a unique key (nothing is reused)
+    payload = [spec.kind, sorted(params.items()), version or uuid.uuid4().hex]
+    return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()
+
+
+def _versions_tracked(connection) -> bool:
+    engine = connection.engine
+    if engine not in _versions_exist:
+        _versions_exist[engine] = inspect(connection).has_table(versions_table.name)
+    return _versions_exist[engine]
+
+
+def data_version(tables: Iterable[str]) -> Optional[str]:
+    """Opaque version of the contents of tables, or None where versions are not kept"""
+    connection = db.session.connection()
+    if not _versions_tracked(connection):
+        return None
+    tables = sorted(tables)
+    stored = dict(connection.execute(
+        select(versions_table.c.table_name, versions_table.c.version)
+        .where(versions_table.c.table_name.in_(tables))).all())
+    payload = [[name, stored.get(name, 0)] for name in tables]
+    return hashlib.sha1(json.dumps(payload).encode('utf-8')).hexdigest()
+
+
+def bump_versions(connection, tables: Iterable[str]) -> None:
+    """Add one to the version of each table (creating its row)"""
+    rows = [{'table_name': name, 'version': 1} for name in sorted(tables)]
+    if not rows:
+        return
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(versions_table)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[versions_table.c.table_name],
+            set_={'version': versions_table.c.version + 1}), rows)
+        return
+    for row in rows:
+        result = connection.execute(update(versions_table)
+                                    .where(versions_table.c.table_name == row['table_name'])
+                                    .values(version=versions_table.c.version + 1))
+        if result.rowcount == 0:
+            connection.execute(versions_table.insert().values(**row))
+
+
+def _bump_exported_tables(touched: set) -> None:
+    if not has_app_context():
+        return
+    tables = touched & {table for spec in EXPORTS.values() for table in spec.tables}
+    if not tables:
+        return
+    # The session's transaction has ended; record the bump in its own
+    with db.engine.begin() as connection:
+        if _versions_tracked(connection):
+            bump_versions(connection, tables)
+
+
+on_commit_touching(_bump_exported_tables)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _versions_created(target, connection, **kw):
+    _versions_exist[connection.engine] = inspect(connection).has_table(versions_table.name)
+
+
+def export_filename(spec: ExportSpec, at: Optional[datetime] = None) -> str:
+    return f"{spec.kind}_{(at or datetime.utcnow()).strftime('%Y%m%d_%H%M')}.{spec.extension}"
+
+
+def _reusable(job: ExportJob, runner: JobRunner) -> bool:
+    if job.status == 'finished':
+        return bool(job.artifact_path) and os.path.exists(job.artifact_path)
+    # A queued/running row left behind by another (or a restarted) process may never finish
+    return runner.is_live(job.id)
+
+
+def submit_export(kind: str, args, created_by: Optional[str] = None) -> ExportJob:
+    """Job building export kind for args (e.g. request.args); may be an existing job.
+
+    Raises UnknownExport for an unregistered kind.
+    """
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        raise UnknownExport(kind)
+    runner = _runner()
+    prune_jobs()
+    params = spec.clean_params(args)
+    key = cache_key(spec, params, data_version(spec.tables))
+
+    candidates = (ExportJob.query
+                  .filter(ExportJob.cache_key == key, ExportJob.status.in_(ACTIVE_STATUSES + ('finished',)))
+                  .order_by(ExportJob.created_at.desc()))
+    for job in candidates:
+        if _reusable(job, runner):
+            log_debug('EXPORT_JOB_REUSED', job_id=job.id, kind=kind, status=job.status)
+            return job
+
+    job = ExportJob(id=uuid.uuid4().hex, kind=kind, params=params, cache_key=key,
+                    mimetype=spec.mimetype, created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    runner.submit(job.id)
+    # An inline build committed from its own session; reload what it recorded
+    db.session.expire(job)
+    return job
+
+
+def run_job(app, job_id: str) -> None:
+    """Build the job's file and record the outcome (runs on a pool thread)"""
+    runner = app.extensions['export_jobs']
+    with app.app_context():
+        job = db.session.get(ExportJob, job_id)
+        try:
+            if job is None:
+                return
+            spec = EXPORTS[job.kind]
+            job.status = 'running'
+            db.session.commit()
+
+            def progress(done, total):
+                if total:
+                    runner.set_progress(job_id, min(ROW_PROGRESS_SHARE, done * ROW_PROGRESS_SHARE // total))
+
+            fileobj = spec.build(job.params or {}, progress)
+            path = _store_artifact(runner.artifact_dir, job_id, spec, fileobj)
+            job.status = 'finished'
+            job.progress = 100
+            job.artifact_path = path
+            job.filename = export_filename(spec, job.created_at)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            log_debug('EXPORT_JOB_FINISHED', job_id=job_id, kind=job.kind)
+        except Exception as e:
+            db.session.rollback()
+            log_error('EXPORT_JOB_FAILED', job_id=job_id, error=str(e))
+            if job is not None:
+                job.status = 'failed'
+                job.message = str(e)[:255]
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            runner.forget(job_id)
+            db.session.remove()
+
+
+def _store_artifact(directory: str, job_id: str, spec: ExportSpec, fileobj) -> str:
+    # Written under a temporary name and renamed, so a half-written file is never served
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{job_id}.{spec.extension}")
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out, fileobj:
+            for chunk in iter(lambda: fileobj.read(COPY_CHUNK_SIZE), b''):
+                out.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    """The job, with timed-out orphans marked failed"""
+    job = db.session.get(ExportJob, job_id)
+    if job is None or job.done:
+        return job
+    timeout = current_app.config.get('EXPORT_JOB_TIMEOUT', 3600)
+    if not _runner().is_live(job.id) and job.updated_at < datetime.utcnow() - timedelta(seconds=timeout):
+        job.status = 'failed'
+        job.message = 'Export was interrupted'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job
+
+
+def job_progress(job: ExportJob) -> int:
+    """Percent complete: live figure if this process runs the job, else the recorded one"""
+    if job.done:
+        return job.progress
+    live = _runner().progress(job.id)
+    return live if live is not None else job.progress
+
+
+def prune_jobs() -> int:
+    """Delete finished/failed jobs older than EXPORT_JOB_RETENTION and their files"""
+    retention = current_app.config.get('EXPORT_JOB_RETENTION', 86400)
+    cutoff = datetime.utcnow() - timedelta(seconds=retention)
+    expired = ExportJob.query.filter(ExportJob.created_at < cutoff,
+                                     ExportJob.status.in_(('finished', 'failed'))).all()
+    for job in expired:
+        if job.artifact_path and os.path.exists(job.artifact_path):
+            os.remove(job.artifact_path)
+        db.session.delete(job)
+    if expired:
+        db.session.commit()
+    return len(expired)
+
+
+def job_payload(job: ExportJob) -> dict:
+    """/api/jobs/<id> JSON body"""
+    from flask import url_for
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job_progress(job),
+        'message': job.message,
+        'params': job.params or {},
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': url_for('main.job_status', job_id=job.id),
+        'download_url': url_for('main.job_download', job_id=job.id) if job.status == 'finished' else None,
+    }
@@ -1,6 +1,5 @@
 # app/utils_logging.py
 from flask import g, current_app, has_app_context
-from flask_login import current_user
 import functools
 
 def log_with_context(level, message, **context):
@@ -67,4 +66,13 @@ def log_sms_event(event_type, phone_number, message, **context):
         f"SMS_{event_type.upper()}: {masked_phone} | {message}",
         event=event_type,
         **context
-    )
\ No newline at end of file
+    )
+
+def log_slow_query(route, duration_ms, statement, **context):
+    """Specialized logging for statements over the SLOW_QUERY_MS threshold."""
+    log_warning(
+        f"SLOW_QUERY: {duration_ms:.1f}ms | {statement}",
+        route=route or 'unknown',
+        duration_ms=round(duration_ms, 1),
+        **context
+    )
@@ -0,0 +1,99 @@
+# app/utils/pagination.py
+"""Keyset (cursor) pagination for list fragments.
+
+A page is fetched with `WHERE (sort key) beyond the last row seen ORDER BY
+sort key LIMIT n`, so with an index on the sort columns a deep page costs
+the same as the first one (no OFFSET scan). The position is handed to the
+client as an opaque, signed cursor token naming the last row's key values.
+"""
+from datetime import date, datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from flask import current_app, request, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, or_
+
+CURSOR_SALT = 'list-cursor'
+
+
+class InvalidCursor(ValueError):
+    """Cursor token was tampered with, truncated or belongs to another ordering"""
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+    def next_url(self, **overrides) -> Optional[str]:
+        """URL of the following page for the current endpoint and query args"""
+        if not self.next_cursor:
+            return None
+        args = {k: v for k, v in request.args.items() if k != 'cursor'}
+        args.update(overrides, cursor=self.next_cursor)
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def _serializer() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def _dump(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _load(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (date, datetime):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def encode_cursor(name: str, values: Sequence[Any]) -> str:
+    return _serializer().dumps([name, [_dump(v) for v in values]])
+
+
+def decode_cursor(name: str, token: str, columns: Sequence) -> Tuple:
+    try:
+        cursor_name, values = _serializer().loads(token)
+    except (BadSignature, TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if cursor_name != name or len(values) != len(columns):
+        raise InvalidCursor('Cursor does not match this list')
+    try:
+        return tuple(_load(col, v) for col, v in zip(columns, values))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def _after(columns: Sequence, values: Sequence, descending: bool):
+    # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y), which every
+    # dialect plans as a range scan on an (a, b) index
+    clauses = []
+    for i, column in enumerate(columns):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[columns[j] == values[j] for j in range(i)], beyond))
+    return or_(*clauses)
+
+
+def keyset_page(query, name: str, columns: Sequence, cursor: Optional[str], limit: int,
+                descending: bool = False) -> Page:
+    """One page of query ordered by columns (all non-null, last one unique).
+
+    name identifies the ordering, so a cursor from one list is rejected by
+    another. Raises InvalidCursor for a bad token.
+    """
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(name, cursor, columns), descending))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return Page(rows, None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor(name, [getattr(last, c.key) for c in columns]))
+
+
+def page_size(default: int, maximum: int) -> int:
+    """?limit= clamped to 1..maximum"""
+    return max(1, min(request.args.get('limit', default, type=int), maximum))
@@ -0,0 +1,459 @@
+# app/utils/rollups.py
+"""Maintenance of the insight rollup tables (app.models.rollups).
+
+Every flush that writes agencies, vendors, functional areas, functions,
+configurations, configuration products, products or product versions
+works out which agency, vendor and functional-area rollup rows it can
+have changed and recomputes just those rows with a few grouped queries,
+in the flush's own transaction. The single InsightSummary row is then
+adjusted by the difference: counters move by deltas, and a leader (tech
+leader, top vendor, ...) is re-queried only when an affected row held it
+or now reaches it. The insight endpoints read that row by primary key.
+
+Distinct counts (vendors per agency, configurations per vendor) cannot be
+kept with +1/-1 deltas, which is why touched rows are recomputed rather
+than adjusted. Writes that bypass the ORM (bulk SQL, imports) are not
+seen: run `flask rebuild-rollups` afterwards (app.utils.bulk.BulkLoader
+does so itself). db.create_all() builds the rollups with the tables; a
+database without the summary row is not maintained, and reads get an
+all-zero summary until it is rebuilt.
+"""
+import weakref
+from datetime import datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Set
+from sqlalchemy import Column, Integer, and_, delete, event, func, inspect, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import db
+from app.models.tran import (
+    Agency, Configuration, ConfigurationProduct, Function, FunctionalArea, Product, ProductVersion, Vendor,
+)
+from app.models.rollups import AgencyRollup, FunctionalAreaRollup, InsightSummary, VendorRollup
+from app.utils.logging import log_warning
+
+SUMMARY_ID = 1
+
+agencies = Agency.__table__
+vendors = Vendor.__table__
+areas = FunctionalArea.__table__
+functions = Function.__table__
+configurations = Configuration.__table__
+config_products = ConfigurationProduct.__table__
+products = Product.__table__
+versions = ProductVersion.__table__
+agency_rollups = AgencyRollup.__table__
+vendor_rollups = VendorRollup.__table__
+area_rollups = FunctionalAreaRollup.__table__
+summary_table = InsightSummary.__table__
+
+TRACKED_MODELS = (Agency, Vendor, FunctionalArea, Function, Configuration, ConfigurationProduct,
+                  Product, ProductVersion)
+
+# engine -> whether the rollup tables exist there
+_tables_exist: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class AffectedKeys:
+    """Rollup rows a flush may have changed, gathered from the flushed objects"""
+
+    def __init__(self):
+        self.agency_ids: Set[int] = set()
+        self.vendor_ids: Set[int] = set()
+        self.area_ids: Set[int] = set()
+        self.function_ids: Set[int] = set()
+        self.configuration_ids: Set[int] = set()
+        self.product_ids: Set[int] = set()
+        # Products that changed vendor: their agencies' vendor counts move too
+        self.moved_product_ids: Set[int] = set()
+
+    def add(self, obj) -> None:
+        if isinstance(obj, Agency):
+            self.agency_ids.add(obj.id)
+        elif isinstance(obj, Vendor):
+            self.vendor_ids.add(obj.id)
+        elif isinstance(obj, FunctionalArea):
+            self.area_ids.add(obj.id)
+        elif isinstance(obj, Function):
+            self.area_ids |= _values(obj, 'functional_area_id')
+        elif isinstance(obj, Configuration):
+            self.agency_ids |= _values(obj, 'agency_id')
+            self.function_ids |= _values(obj, 'function_id')
+        elif isinstance(obj, ConfigurationProduct):
+            self.configuration_ids |= _values(obj, 'configuration_id')
+            self.product_ids |= _values(obj, 'product_id')
+        elif isinstance(obj, Product):
+            vendor_ids = _values(obj, 'vendor_id')
+            self.vendor_ids |= vendor_ids
+            if len(vendor_ids) > 1:
+                self.moved_product_ids.add(obj.id)
+        elif isinstance(obj, ProductVersion):
+            self.product_ids |= _values(obj, 'product_id')
+
+    def resolve(self, connection) -> None:
+        """Turn function/configuration/product ids into the rollup keys they feed"""
+        if self.function_ids:
+            self.area_ids |= _column_values(connection, functions.c.functional_area_id,
+                                            functions.c.id.in_(self.function_ids))
+        if self.configuration_ids:
+            self.agency_ids |= _column_values(connection, configurations.c.agency_id,
+                                              configurations.c.id.in_(self.configuration_ids))
+        if self.product_ids:
+            self.vendor_ids |= _column_values(connection, products.c.vendor_id,
+                                              products.c.id.in_(self.product_ids))
+        if self.moved_product_ids:
+            self.agency_ids |= _column_values(
+                connection, configurations.c.agency_id,
+                config_products.c.product_id.in_(self.moved_product_ids),
+                join=configurations.join(config_products,
+                                         config_products.c.configuration_id == configurations.c.id))
+
+
+# Foreign keys whose old value decides which rollup rows a change leaves behind
+ROLLUP_FOREIGN_KEYS = (
+    Function.functional_area_id, Configuration.agency_id, Configuration.function_id,
+    ConfigurationProduct.configuration_id, ConfigurationProduct.product_id,
+    Product.vendor_id, ProductVersion.product_id,
+)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+for _attribute in ROLLUP_FOREIGN_KEYS:
+    # active_history loads an expired old value on assignment, so history.deleted has it
+    event.listen(_attribute, 'set', _keep_old_value, active_history=True, retval=True)
+
+
+def _values(obj, attr: str) -> Set[int]:
+    # Current and pre-flush values, so both sides of a changed foreign key are refreshed
+    history = inspect(obj).attrs[attr].history
+    values = set(history.added or ()) | set(history.unchanged or ()) | set(history.deleted or ())
+    values.add(inspect(obj).dict.get(attr))
+    values.discard(None)
+    return values
+
+
+def _column_values(connection, column, condition, join=None) -> Set[int]:
+    stmt = select(column).where(condition)
+    if join is not None:
+        stmt = stmt.select_from(join)
+    return {value for value in connection.execute(stmt).scalars() if value is not None}
+
+
+def _grouped(connection, key, aggregate, where, join=None) -> Dict[int, object]:
+    stmt = select(key, aggregate).where(where).group_by(key)
+    if join is not None:
+        stmt = stmt.select_from(join)
+    return dict(connection.execute(stmt).all())
+
+
+def _restrict(column, ids: Optional[Iterable[int]]):
+    return column.in_(ids) if ids is not None else column.isnot(None)
+
+
+def _replace_rows(connection, table, key_column, ids, rows) -> None:
+    connection.execute(delete(table).where(_restrict(key_column, ids)))
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def refresh_agency_rollups(connection, ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute agency rollups for ids (all agencies when ids is None)"""
+    existing = _column_values(connection, agencies.c.id, _restrict(agencies.c.id, ids))
+    config_counts = _grouped(connection, configurations.c.agency_id, func.count(configurations.c.id),
+                             _restrict(configurations.c.agency_id, ids))
+    vendor_counts = _grouped(
+        connection, configurations.c.agency_id, func.count(func.distinct(products.c.vendor_id)),
+        and_(_restrict(configurations.c.agency_id, ids), products.c.vendor_id.isnot(None)),
+        join=configurations
+        .join(config_products, config_products.c.configuration_id == configurations.c.id)
+        .join(products, products.c.id == config_products.c.product_id))
+    _replace_rows(connection, agency_rollups, agency_rollups.c.agency_id, ids, [
+        {'agency_id': i, 'configuration_count': config_counts.get(i, 0), 'vendor_count': vendor_counts.get(i, 0)}
+        for i in existing
+    ])
+
+
+def refresh_vendor_rollups(connection, ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute vendor rollups for ids (all vendors when ids is None)"""
+    existing = _column_values(connection, vendors.c.id, _restrict(vendors.c.id, ids))
+    in_vendors = _restrict(products.c.vendor_id, ids)
+    product_counts = _grouped(connection, products.c.vendor_id, func.count(products.c.id), in_vendors)
+    with_versions = products.join(versions, versions.c.product_id == products.c.id)
+    version_counts = _grouped(connection, products.c.vendor_id, func.count(versions.c.id), in_vendors,
+                              join=with_versions)
+    latest = _grouped(connection, products.c.vendor_id, func.max(versions.c.release_date), in_vendors,
+                      join=with_versions)
+    config_counts = _grouped(
+        connection, products.c.vendor_id, func.count(func.distinct(config_products.c.configuration_id)),
+        in_vendors, join=products.join(config_products, config_products.c.product_id == products.c.id))
+    _replace_rows(connection, vendor_rollups, vendor_rollups.c.vendor_id, ids, [
+        {'vendor_id': i, 'product_count': product_counts.get(i, 0), 'version_count': version_counts.get(i, 0),
+         'configuration_count': config_counts.get(i, 0), 'latest_release': latest.get(i)}
+        for i in existing
+    ])
+
+
+def refresh_area_rollups(connection, ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute functional-area rollups for ids (all areas when ids is None)"""
+    existing = _column_values(connection, areas.c.id, _restrict(areas.c.id, ids))
+    config_counts = _grouped(
+        connection, functions.c.functional_area_id, func.count(configurations.c.id),
+        _restrict(functions.c.functional_area_id, ids),
+        join=functions.join(configurations, configurations.c.function_id == functions.c.id))
+    _replace_rows(connection, area_rollups, area_rollups.c.functional_area_id, ids, [
+        {'functional_area_id': i, 'configuration_count': config_counts.get(i, 0)} for i in existing
+    ])
+
+
+
+
+class Leader(NamedTuple):
+    """Summary fields naming the rollup row with the highest metric (ties: lowest key)"""
+    name_field: str
+    id_field: str
+    metric_field: str
+    key: Column
+    metric: Column
+    entity_id: Column
+    entity_name: Column
+
+    @property
+    def counts(self) -> bool:
+        return isinstance(self.metric.type, Integer)
+
+    def qualifies(self, value) -> bool:
+        # Counts must be positive, dates merely present
+        return value is not None and (not self.counts or value > 0)
+
+    def values(self, connection) -> dict:
+        """The leader's summary fields, queried from the rollup table"""
+        row = connection.execute(
+            select(self.key, self.entity_name, self.metric)
+            .select_from(self.key.table.join(self.entity_id.table, self.entity_id == self.key))
+            .where(self.metric > 0 if self.counts else self.metric.isnot(None))
+            .order_by(self.metric.desc(), self.key.asc())
+            .limit(1)
+        ).first()
+        if row is None:
+            return {self.name_field: None, self.id_field: None, self.metric_field: 0 if self.counts else None}
+        return {self.id_field: row[0], self.name_field: row[1], self.metric_field: row[2]}
+
+    def may_change(self, summary, before: Dict[int, Any], after: Dict[int, Any]) -> bool:
+        """Whether rewriting the rollup rows before -> after can move this leader"""
+        current_id = summary[self.id_field]
+        if current_id in before or current_id in after:
+            return True
+        current = summary[self.metric_field]
+        metric = self.metric.name
+        return any(
+            self.qualifies(row[metric])
+            and (current_id is None or row[metric] > current or (row[metric] == current and key < current_id))
+            for key, row in after.items()
+        )
+
+
+LEADERS = (
+    Leader('tech_leader', 'tech_leader_id', 'tech_leader_count', agency_rollups.c.agency_id,
+           agency_rollups.c.configuration_count, agencies.c.id, agencies.c.name),
+    Leader('common_area', 'common_area_id', 'common_area_count', area_rollups.c.functional_area_id,
+           area_rollups.c.configuration_count, areas.c.id, areas.c.name),
+    Leader('top_vendor', 'top_vendor_id', 'top_vendor_configurations', vendor_rollups.c.vendor_id,
+           vendor_rollups.c.configuration_count, vendors.c.id, vendors.c.name),
+    Leader('most_versions_vendor', 'most_versions_vendor_id', 'most_versions_count', vendor_rollups.c.vendor_id,
+           vendor_rollups.c.version_count, vendors.c.id, vendors.c.name),
+    Leader('latest_release_vendor', 'latest_release_vendor_id', 'latest_release_date', vendor_rollups.c.vendor_id,
+           vendor_rollups.c.latest_release, vendors.c.id, vendors.c.name),
+)
+
+# Rollup table, its key, the AffectedKeys attribute feeding it and its refresh function
+ROLLUPS = (
+    (agency_rollups.c.agency_id, 'agency_ids', refresh_agency_rollups),
+    (vendor_rollups.c.vendor_id, 'vendor_ids', refresh_vendor_rollups),
+    (area_rollups.c.functional_area_id, 'area_ids', refresh_area_rollups),
+)
+
+# Summary counters kept as (inserted - deleted) rows of the model in each flush
+COUNTED_MODELS = {
+    'agency_count': Agency,
+    'configuration_count': Configuration,
+    'vendor_count': Vendor,
+    'product_count': Product,
+}
+
+
+def _write_summary(connection, values: dict) -> None:
+    # Upsert, so concurrent first writers cannot both try to insert id=1
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(summary_table).values(id=SUMMARY_ID, **values)
+        connection.execute(stmt.on_conflict_do_update(index_elements=[summary_table.c.id], set_=values))
+        return
+    result = connection.execute(update(summary_table).where(summary_table.c.id == SUMMARY_ID).values(**values))
+    if result.rowcount == 0:
+        connection.execute(insert(summary_table).values(id=SUMMARY_ID, **values))
+
+
+def refresh_summary(connection) -> None:
+    """Re-derive the whole InsightSummary row from the base and rollup tables"""
+    count = lambda table: select(func.count()).select_from(table).scalar_subquery()
+    totals = connection.execute(select(
+        count(agencies).label('agency_count'),
+        count(configurations).label('configuration_count'),
+        count(vendors).label('vendor_count'),
+        count(products).label('product_count'),
+        select(func.count()).where(vendor_rollups.c.configuration_count > 0)
+        .scalar_subquery().label('vendors_with_usage'),
+        select(func.coalesce(func.sum(agency_rollups.c.vendor_count), 0))
+        .scalar_subquery().label('agency_vendor_total'),
+        select(func.count()).where(agency_rollups.c.vendor_count > 0)
+        .scalar_subquery().label('agencies_with_vendors'),
+    )).one()
+    values = dict(totals._mapping)
+    for leader in LEADERS:
+        values.update(leader.values(connection))
+    values['updated_at'] = datetime.utcnow()
+    _write_summary(connection, values)
+
+
+def build_rollups(connection) -> None:
+    """Recompute every rollup row and the summary on connection (caller commits)"""
+    for _, _, refresh in ROLLUPS:
+        refresh(connection)
+    refresh_summary(connection)
+
+
+def rebuild_rollups(session=None) -> Dict[str, int]:
+    """Recompute every rollup row and the summary from scratch; returns rows per table"""
+    session = session or db.session
+    build_rollups(session.connection())
+    session.commit()
+    return {
+        table.name: session.execute(select(func.count()).select_from(table)).scalar()
+        for table in (agency_rollups, vendor_rollups, area_rollups)
+    }
+
+
+def _empty_summary() -> InsightSummary:
+    return InsightSummary(
+        id=SUMMARY_ID, agency_count=0, configuration_count=0, agency_vendor_total=0, agencies_with_vendors=0,
+        tech_leader_count=0, common_area_count=0, vendor_count=0, product_count=0, vendors_with_usage=0,
+        top_vendor_configurations=0, most_versions_count=0,
+    )
+
+
+def insight_summary() -> InsightSummary:
+    """The summary row; an unsaved all-zero summary if rollups were never built.
+
+    Read-only: rollups are built by db.create_all() or `flask rebuild-rollups`.
+    """
+    summary = db.session.get(InsightSummary, SUMMARY_ID)
+    if summary is None:
+        log_warning('INSIGHT_ROLLUPS_MISSING', hint='run flask rebuild-rollups')
+        return _empty_summary()
+    return summary
+
+
+def agency_stats_payload(summary: InsightSummary) -> dict:
+    """/api/agencies/stats body (legacy key names)"""
+    agency_count = summary.agency_count
+    return {
+        'active_implementations': summary.configuration_count,
+        'avg_implementations_per_agency': round(summary.configuration_count / agency_count, 1) if agency_count else 0,
+        'avg_vendors_per_agency': summary.avg_vendors_per_agency,
+    }
+
+
+def agency_insights_payload(summary: InsightSummary) -> dict:
+    """/api/agencies/insights body"""
+    return {
+        'tech_leader': summary.tech_leader or 'N/A',
+        'common_area': summary.common_area or 'N/A',
+        'top_vendor': summary.top_vendor or 'N/A',
+    }
+
+
+def _summary_row(connection):
+    engine = connection.engine
+    if engine not in _tables_exist:
+        _tables_exist[engine] = inspect(connection).has_table(summary_table.name)
+    if not _tables_exist[engine]:
+        return None
+    return connection.execute(select(summary_table).where(summary_table.c.id == SUMMARY_ID)).mappings().first()
+
+
+def rollups_built(connection) -> bool:
+    """Whether the summary row exists, i.e. rollups are being maintained on connection's database"""
+    return _summary_row(connection) is not None
+
+
+def _rows_by_key(connection, key_column, ids) -> Dict[int, Any]:
+    if not ids:
+        return {}
+    rows = connection.execute(select(key_column.table).where(key_column.in_(ids))).mappings()
+    return {row[key_column.name]: row for row in rows}
+
+
+def _positive(rows: Dict[int, Any], column: str) -> int:
+    return sum(1 for row in rows.values() if row[column] > 0)
+
+
+def _apply_to_summary(connection, summary, counts: Dict[str, int], before: Dict[str, dict],
+                      after: Dict[str, dict]) -> None:
+    """Adjust the summary by the change between the before and after rollup rows"""
+    agencies_before, agencies_after = before[agency_rollups.name], after[agency_rollups.name]
+    vendors_before, vendors_after = before[vendor_rollups.name], after[vendor_rollups.name]
+    deltas = dict(counts)
+    deltas['agency_vendor_total'] = (sum(r['vendor_count'] for r in agencies_after.values())
+                                     - sum(r['vendor_count'] for r in agencies_before.values()))
+    deltas['agencies_with_vendors'] = (_positive(agencies_after, 'vendor_count')
+                                       - _positive(agencies_before, 'vendor_count'))
+    deltas['vendors_with_usage'] = (_positive(vendors_after, 'configuration_count')
+                                    - _positive(vendors_before, 'configuration_count'))
+    # Relative updates, so concurrent writers' deltas add up
+    values = {column: summary_table.c[column] + delta for column, delta in deltas.items() if delta}
+    for leader in LEADERS:
+        table = leader.key.table.name
+        if leader.may_change(summary, before[table], after[table]):
+            values.update(leader.values(connection))
+    if values:
+        values['updated_at'] = datetime.utcnow()
+        connection.execute(update(summary_table).where(summary_table.c.id == SUMMARY_ID).values(**values))
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _tables_created(target, connection, tables=(), **kw):
+    _tables_exist[connection.engine] = True
+    if summary_table in tables:
+        # New rollup tables start out built (and maintained) for whatever rows already exist
+        build_rollups(connection)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_rollups(session, flush_context):
+    touched = [obj for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, TRACKED_MODELS)]
+    if not touched:
+        return
+    connection = session.connection()
+    summary = _summary_row(connection)
+    if summary is None:
+        return
+    keys = AffectedKeys()
+    for obj in touched:
+        keys.add(obj)
+    keys.resolve(connection)
+    before, after = {}, {}
+    for key_column, attr, refresh in ROLLUPS:
+        ids = getattr(keys, attr)
+        before[key_column.table.name] = _rows_by_key(connection, key_column, ids)
+        if ids:
+            refresh(connection, ids)
+        after[key_column.table.name] = _rows_by_key(connection, key_column, ids)
+    counts = {
+        field: sum(isinstance(obj, model) for obj in session.new)
+        - sum(isinstance(obj, model) for obj in session.deleted)
+        for field, model in COUNTED_MODELS.items()
+    }
+    _apply_to_summary(connection, summary, counts, before, after)
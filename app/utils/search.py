@@ -0,0 +1,307 @@
+# app/utils/search.py
+"""Full-text search over names and descriptions.
+
+One index table (search_index) holds a (kind, ref_id, title, body) row per
+searchable record. On SQLite it is an FTS5 virtual table ranked with bm25;
+on PostgreSQL it is a plain table with a generated tsvector column and a
+GIN index, ranked with ts_rank. Titles weigh more than bodies on both.
+
+The index is created alongside db.create_all() and can be (re)built with
+`flask search-index`. It is kept current from the session: every flush
+that inserts, deletes or edits an indexed column of a searchable model
+rewrites the matching index rows in the same transaction.
+
+Matching is by word prefix: every term in the box must start a word of
+the record ("micro" finds "Microsoft", "soft" does not). This replaces
+the substring match of the old ILIKE filters, which could not use an
+index. Where the index does not exist (another dialect, or a database
+created by migrations before it was built) search_filter and
+ranked_search() fall back to that ILIKE substring match over the same
+columns.
+"""
+import re
+import time
+import weakref
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from sqlalchemy import Integer, event, inspect, or_, select, text
+from sqlalchemy.orm import Session
+from app import db
+from app.models.tran import Agency, Component, Function, FunctionalArea, Product, Vendor
+
+SEARCH_TABLE = 'search_index'
+DEFAULT_LIMIT = 20
+MAX_TERMS = 8
+REBUILD_BATCH_SIZE = 1000
+# Seconds before a database found without the index is probed again, so web
+# workers pick up an index built later by `flask search-index`
+INDEX_RECHECK_SECONDS = 30
+
+
+class Searchable(NamedTuple):
+    model: type
+    title: Sequence[str]
+    body: Sequence[str]
+
+
+# kind -> model and the columns indexed as title (weighted) and body
+SEARCHABLE: Dict[str, Searchable] = {
+    'agency': Searchable(Agency, ('name', 'short_name'), ('description',)),
+    'functional_area': Searchable(FunctionalArea, ('name',), ('description',)),
+    'function': Searchable(Function, ('name',), ('description',)),
+    'component': Searchable(Component, ('name',), ('short_description', 'description')),
+    'vendor': Searchable(Vendor, ('name', 'short_name'), ('description',)),
+    'product': Searchable(Product, ('name',), ('description',)),
+}
+KIND_BY_MODEL = {s.model: kind for kind, s in SEARCHABLE.items()}
+
+_DDL = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, title, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    ],
+    'postgresql': [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "kind VARCHAR(32) NOT NULL, ref_id INTEGER NOT NULL, title TEXT NOT NULL, body TEXT, "
+        "document TSVECTOR GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED, "
+        "PRIMARY KEY (kind, ref_id))",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+    ],
+}
+
+_UPSERT = {
+    'sqlite': None,  # FTS5 has no unique key; handled as delete + insert
+    'postgresql': (f"INSERT INTO {SEARCH_TABLE} (kind, ref_id, title, body) "
+                   "VALUES (:kind, :ref_id, :title, :body) "
+                   "ON CONFLICT (kind, ref_id) DO UPDATE SET title = excluded.title, body = excluded.body"),
+}
+
+# Ranked match, best first; :match is built by _match_expression
+_MATCH = {
+    'sqlite': (f"SELECT kind, ref_id, title, body, bm25({SEARCH_TABLE}, 0.0, 0.0, 10.0, 1.0) AS rank "
+               f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match{{kinds}} ORDER BY rank LIMIT :limit"),
+    'postgresql': (f"SELECT kind, ref_id, title, body, ts_rank(document, to_tsquery('simple', :match)) AS rank "
+                   f"FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', :match){{kinds}} "
+                   "ORDER BY rank DESC LIMIT :limit"),
+}
+_MATCH_IDS = {
+    'sqlite': f"SELECT ref_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match AND kind = :kind",
+    'postgresql': (f"SELECT ref_id FROM {SEARCH_TABLE} "
+                   "WHERE document @@ to_tsquery('simple', :match) AND kind = :kind"),
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+# engine -> dialect name, for engines where the index table exists
+_index_dialects: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+# engine -> time.monotonic() of the last probe that found no index
+_index_missing: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: int
+    title: str
+    description: str
+    rank: float
+
+
+def search_terms(term: str) -> List[str]:
+    """Lower-cased word tokens of a search box value (at most MAX_TERMS)"""
+    return _TOKEN.findall((term or '').lower())[:MAX_TERMS]
+
+
+def _match_expression(dialect: str, terms: List[str]) -> str:
+    # Every term must match, each as a prefix so results follow the keystrokes
+    if dialect == 'sqlite':
+        return ' '.join(f'"{t}"*' for t in terms)
+    return ' & '.join(f'{t}:*' for t in terms)
+
+
+def index_dialect(bind) -> Optional[str]:
+    """Dialect name if the search index exists on bind's engine, else None.
+
+    A found index is remembered; a missing one is re-probed at most every
+    INDEX_RECHECK_SECONDS.
+    """
+    engine = getattr(bind, 'engine', bind)
+    name = _index_dialects.get(engine)
+    if name is not None or engine.dialect.name not in _DDL:
+        return name
+    checked = _index_missing.get(engine)
+    if checked is not None and time.monotonic() - checked < INDEX_RECHECK_SECONDS:
+        return None
+    if inspect(bind).has_table(SEARCH_TABLE):
+        _index_missing.pop(engine, None)
+        _index_dialects[engine] = engine.dialect.name
+        return engine.dialect.name
+    _index_missing[engine] = time.monotonic()
+    return None
+
+
+def create_search_index(connection) -> bool:
+    """Create the index table on connection's database if the dialect supports it"""
+    statements = _DDL.get(connection.dialect.name)
+    if not statements:
+        return False
+    for statement in statements:
+        connection.execute(text(statement))
+    _index_dialects[connection.engine] = connection.dialect.name
+    _index_missing.pop(connection.engine, None)
+    return True
+
+
+def exclude_search_index(obj, name, type_, reflected, compare_to) -> bool:
+    """Alembic include_object hook: the index (and FTS5 shadow tables) are not models"""
+    return not (type_ == 'table' and name and name.startswith(SEARCH_TABLE))
+
+
+def _document(kind: str, obj) -> dict:
+    spec = SEARCHABLE[kind]
+    values = lambda cols: ' '.join(v for v in (getattr(obj, c, None) for c in cols) if v)
+    return {'kind': kind, 'ref_id': obj.id, 'title': values(spec.title), 'body': values(spec.body)}
+
+
+def _write_documents(connection, dialect: str, documents: List[dict], replace: bool = True) -> None:
+    if not documents:
+        return
+    if _UPSERT[dialect]:
+        connection.execute(text(_UPSERT[dialect]), documents)
+        return
+    if replace:
+        _delete_documents(connection, [(d['kind'], d['ref_id']) for d in documents])
+    connection.execute(text(f"INSERT INTO {SEARCH_TABLE} (kind, ref_id, title, body) "
+                            "VALUES (:kind, :ref_id, :title, :body)"), documents)
+
+
+def _delete_documents(connection, keys) -> None:
+    if keys:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE kind = :kind AND ref_id = :ref_id"),
+                           [{'kind': kind, 'ref_id': ref_id} for kind, ref_id in keys])
+
+
+def rebuild_search_index(session=None) -> Dict[str, int]:
+    """Create the index if needed and refill it from the models; returns rows per kind"""
+    session = session or db.session
+    connection = session.connection()
+    if not create_search_index(connection):
+        raise RuntimeError(f"Full-text search is not supported on {connection.dialect.name}")
+    dialect = connection.dialect.name
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    counts = {}
+    for kind, spec in SEARCHABLE.items():
+        counts[kind] = 0
+        batch = []
+        for obj in session.query(spec.model).yield_per(REBUILD_BATCH_SIZE):
+            batch.append(_document(kind, obj))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                _write_documents(connection, dialect, batch, replace=False)
+                counts[kind] += len(batch)
+                batch = []
+        _write_documents(connection, dialect, batch, replace=False)
+        counts[kind] += len(batch)
+    session.commit()
+    return counts
+
+
+def search_filter(query, model, term: str):
+    """Restrict query to rows of model matching a search box value.
+
+    Uses the full-text index when present (every term a word prefix);
+    otherwise an ILIKE substring match over the model's indexed columns.
+    """
+    kind = KIND_BY_MODEL[model]
+    terms = search_terms(term)
+    dialect = index_dialect(db.session.connection()) if terms else None
+    if dialect is None:
+        spec = SEARCHABLE[kind]
+        return query.filter(or_(*[getattr(model, c).ilike(f"%{term}%") for c in (*spec.title, *spec.body)]))
+    ids = (text(_MATCH_IDS[dialect])
+           .bindparams(match=_match_expression(dialect, terms), kind=kind)
+           .columns(ref_id=Integer)
+           .subquery())
+    return query.filter(model.id.in_(select(ids.c.ref_id)))
+
+
+def ranked_search(term: str, kinds: Optional[Sequence[str]] = None, limit: int = DEFAULT_LIMIT) -> List[SearchHit]:
+    """Ranked hits across every searchable kind (or just kinds), best first"""
+    term = (term or '').strip()
+    kinds = [k for k in (kinds or SEARCHABLE) if k in SEARCHABLE]
+    terms = search_terms(term)
+    if not kinds or not term:
+        return []
+    dialect = index_dialect(db.session.connection()) if terms else None
+    if dialect is None:
+        return _fallback_search(term, kinds, limit)
+
+    params = {'match': _match_expression(dialect, terms), 'limit': limit}
+    kind_clause = ''
+    if len(kinds) < len(SEARCHABLE):
+        kind_clause = ' AND kind IN (' + ', '.join(f':kind_{i}' for i in range(len(kinds))) + ')'
+        params.update({f'kind_{i}': k for i, k in enumerate(kinds)})
+    rows = db.session.execute(text(_MATCH[dialect].format(kinds=kind_clause)), params)
+    return [SearchHit(r.kind, int(r.ref_id), r.title, r.body or '', float(r.rank)) for r in rows]
+
+
+def _fallback_search(term: str, kinds: Sequence[str], limit: int) -> List[SearchHit]:
+    # Title matches rank ahead of description-only matches, then by title
+    like = f"%{term}%"
+    hits = []
+    for kind in kinds:
+        spec = SEARCHABLE[kind]
+        model = spec.model
+        title_match = or_(*[getattr(model, c).ilike(like) for c in spec.title])
+        body_match = or_(*[getattr(model, c).ilike(like) for c in spec.body])
+        for obj in model.query.filter(or_(title_match, body_match)).limit(limit):
+            doc = _document(kind, obj)
+            in_title = term.lower() in doc['title'].lower()
+            hits.append(SearchHit(kind, obj.id, doc['title'], doc['body'], 0.0 if in_title else 1.0))
+    hits.sort(key=lambda h: (h.rank, h.title.lower()))
+    return hits[:limit]
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_with_tables(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_with_tables(target, connection, **kw):
+    if connection.dialect.name in _DDL:
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    _index_dialects.pop(connection.engine, None)
+    _index_missing.pop(connection.engine, None)
+
+
+def _indexed_columns_changed(kind: str, obj) -> bool:
+    spec = SEARCHABLE[kind]
+    state = inspect(obj)
+    return any(state.attrs[c].history.has_changes() for c in (*spec.title, *spec.body))
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_search_index(session, flush_context):
+    # Runs before the flush's history is reset, in the flush's transaction
+    changed, removed = [], []
+    for obj in session.new:
+        kind = KIND_BY_MODEL.get(type(obj))
+        if kind:
+            changed.append(_document(kind, obj))
+    for obj in session.dirty:
+        kind = KIND_BY_MODEL.get(type(obj))
+        if kind and _indexed_columns_changed(kind, obj):
+            changed.append(_document(kind, obj))
+    for obj in session.deleted:
+        kind = KIND_BY_MODEL.get(type(obj))
+        if kind:
+            removed.append((kind, obj.id))
+    if not changed and not removed:
+        return
+    connection = session.connection()
+    dialect = index_dialect(connection)
+    if dialect is None:
+        return
+    _delete_documents(connection, removed)
+    _write_documents(connection, dialect, changed)
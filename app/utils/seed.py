@@ -0,0 +1,265 @@
+# app/utils/seed.py
+"""Seed a database from a directory of JSON files (`flask seed`).
+
+Replaces running the scripts/load_*.py loaders one at a time. Every *.json
+file in the directory is parsed up front on a small thread pool, so file
+reads overlap (parsing in worker processes would cost as much again to
+pickle the parsed data back), and each stage takes its records from the matching top-level key of every
+file ("functional_areas", "functions", "agencies", "vendors",
+"components", "standards", "integration_points", "implementations"), so
+one combined file and one file per entity both work.
+
+Stage order is derived from the models: a stage runs after every stage
+whose table it references by foreign key or also writes to (integration
+points may create standards, so the standards file loads first). All
+stages share one BulkLoader, so names inserted by an earlier stage
+resolve in memory. Each stage is inserted in bulk and committed as one
+transaction; the search index and insight rollups are rebuilt once at
+the end.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from graphlib import TopologicalSorter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app import db
+from app.models.tran import (
+    Agency, Component, Configuration, Criticality, Function, FunctionalArea, IntegrationPoint,
+    Standard, Tag, TagGroup, Vendor, function_component, integration_standard, integration_tag,
+)
+from app.utils.bulk import DEFAULT_BATCH_SIZE, BulkLoader, Ref, model_values
+
+INTEGRATION_TAG_GROUP = "Integration Tags"
+CONFIGURATION_KEY = ('agency_id', 'function_id', 'component_id')
+
+
+class SeedError(Exception):
+    """Seed input could not be read"""
+
+
+class StageResult:
+    """Outcome counters and timings of one stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.records = 0
+        self.added = 0
+        self.skipped = 0
+        self.errors: List[str] = []
+        self.load_seconds = 0.0
+        self.commit_seconds = 0.0
+
+    def error(self, message: str) -> None:
+        self.errors.append(message)
+
+
+# Each handler queues one JSON record on the loader; returns True if it
+# queued a new row, False if the row already exists, None after result.error()
+Handler = Callable[[BulkLoader, Dict[str, Any], StageResult], Optional[bool]]
+
+
+class Stage(NamedTuple):
+    name: str
+    model: type
+    handler: Handler
+    # Other models and association tables the stage inserts into
+    writes: Tuple = ()
+
+
+def _by_name(model) -> Handler:
+    def handler(loader, record, result):
+        return loader.add(model, model_values(model, record))
+    return handler
+
+
+def _function(loader, record, result):
+    area = record.get('functional_area')
+    if not loader.exists(FunctionalArea, area):
+        result.error(f"Functional area '{area}' not found for function '{record['name']}'")
+        return None
+    criticality = getattr(Criticality, record.get('criticality') or 'medium', None)
+    if criticality is None:
+        result.error(f"Unknown criticality '{record['criticality']}' for function '{record['name']}'")
+        return None
+    return loader.add(Function, model_values(Function, record, criticality=criticality,
+                                             functional_area_id=Ref(FunctionalArea, area)))
+
+
+def _component(loader, record, result):
+    queued = loader.add(Component, model_values(Component, record))
+    function_name = record.get('function_name')
+    if queued and function_name:
+        if loader.exists(Function, function_name):
+            loader.link(function_component, Ref(Function, function_name), Ref(Component, record['name']))
+        else:
+            result.error(f"Function '{function_name}' not found for component '{record['name']}'")
+    return queued
+
+
+def _integration_point(loader, record, result):
+    if not loader.add(IntegrationPoint, model_values(IntegrationPoint, record)):
+        return False
+    ip = Ref(IntegrationPoint, record['name'])
+    for standard in record.get('standards', []):
+        ref = loader.get_or_create(Standard, standard['name'], description=standard.get('description'),
+                                   standard_url=standard.get('website'), version=None)
+        loader.link(integration_standard, ip, ref)
+    for tag_name in record.get('tags', []):
+        if not loader.exists(Tag, tag_name):
+            group = loader.get_or_create(TagGroup, INTEGRATION_TAG_GROUP,
+                                         description="Tags related to integration points")
+            loader.get_or_create(Tag, tag_name, description=None, color=None, tag_group_id=group)
+        loader.link(integration_tag, ip, Ref(Tag, tag_name))
+    return True
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def _implementation(loader, record, result):
+    ids = {}
+    for column, model, field in (('agency_id', Agency, 'agency'), ('function_id', Function, 'function'),
+                                 ('component_id', Component, 'component')):
+        ids[column] = loader.id_of(model, record.get(field))
+        if ids[column] is None:
+            result.error(f"{model.__name__} not found: {record.get(field)}")
+            return None
+    try:
+        deployment_date = _parse_date(record.get('deployment_date'))
+    except ValueError:
+        result.error(f"Invalid date format: {record['deployment_date']}")
+        return None
+    return loader.add(Configuration, {
+        **ids,
+        'deployment_date': deployment_date,
+        'version_label': record.get('version'),
+        'status': record.get('status', 'Active'),
+        'implementation_notes': record.get('implementation_notes') or record.get('deployment_notes'),
+        'additional_metadata': record.get('additional_metadata'),
+    }, key=CONFIGURATION_KEY)
+
+
+STAGES: List[Stage] = [
+    Stage('functional_areas', FunctionalArea, _by_name(FunctionalArea)),
+    Stage('functions', Function, _function),
+    Stage('agencies', Agency, _by_name(Agency)),
+    Stage('vendors', Vendor, _by_name(Vendor)),
+    Stage('components', Component, _component, (function_component,)),
+    Stage('standards', Standard, _by_name(Standard)),
+    Stage('integration_points', IntegrationPoint, _integration_point,
+          (Standard, Tag, TagGroup, integration_standard, integration_tag)),
+    Stage('implementations', Configuration, _implementation),
+]
+
+
+def _table(target):
+    return getattr(target, '__table__', target)
+
+
+def stage_order(stages: Sequence[Stage] = STAGES) -> List[Stage]:
+    """Stages sorted so each runs after the stages whose tables it depends on"""
+    owner = {_table(stage.model): stage.name for stage in stages}
+    graph = {}
+    for stage in stages:
+        tables = [_table(stage.model)] + [_table(t) for t in stage.writes]
+        referenced = {fk.column.table for table in tables for fk in table.foreign_keys}
+        depends = {owner[t] for t in referenced | set(tables[1:]) if t in owner}
+        depends.discard(stage.name)
+        graph[stage.name] = depends
+    by_name = {stage.name: stage for stage in stages}
+    return [by_name[name] for name in TopologicalSorter(graph).static_order()]
+
+
+def parse_file(path: str) -> Tuple[str, Dict[str, Any], float]:
+    """Parse one JSON file; returns (path, data, seconds)"""
+    started = time.perf_counter()
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise SeedError(f"{path}: expected a JSON object with entity lists")
+    return path, data, time.perf_counter() - started
+
+
+def parse_files(paths: Sequence[str], workers: int = 1) -> List[Tuple[str, Dict[str, Any], float]]:
+    """Parse every file, on worker threads when workers > 1; keeps the order of paths"""
+    try:
+        if workers <= 1 or len(paths) <= 1:
+            return [parse_file(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            return list(executor.map(parse_file, paths))
+    except (OSError, ValueError) as e:
+        raise SeedError(str(e)) from e
+
+
+def seed_files(data_dir: str) -> List[str]:
+    if not os.path.isdir(data_dir):
+        raise SeedError(f"Not a directory: {data_dir}")
+    return sorted(os.path.join(data_dir, name) for name in os.listdir(data_dir) if name.endswith('.json'))
+
+
+def run_seed(data_dir: str, workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+             only: Optional[Sequence[str]] = None, session=None) -> Dict[str, Any]:
+    """Load every stage from data_dir; returns per-stage results and timings.
+
+    Raises SeedError for unreadable input; a stage that fails to insert is
+    rolled back (earlier stages stay committed, with the search index and
+    rollups refreshed to cover them) and its exception re-raised.
+    """
+    session = session or db.session
+    started = time.perf_counter()
+    unknown = set(only or ()) - {stage.name for stage in STAGES}
+    if unknown:
+        raise SeedError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    paths = seed_files(data_dir)
+    workers = workers or max(1, min(len(paths), os.cpu_count() or 1))
+    parse_started = time.perf_counter()
+    parsed = parse_files(paths, workers)
+    parse_seconds = time.perf_counter() - parse_started
+
+    loader = BulkLoader(session, batch_size=batch_size, commit_every=None)
+    results = []
+    committed = False
+    for stage in stage_order():
+        if only and stage.name not in only:
+            continue
+        result = StageResult(stage.name)
+        records = [record for _, data, _ in parsed for record in data.get(stage.name) or []]
+        result.records = len(records)
+        if not records:
+            results.append(result)
+            continue
+        stage_started = time.perf_counter()
+        try:
+            for record in records:
+                queued = stage.handler(loader, record, result)
+                if queued:
+                    result.added += 1
+                elif queued is False:
+                    result.skipped += 1
+            loader.flush()
+            result.load_seconds = time.perf_counter() - stage_started
+            commit_started = time.perf_counter()
+            loader.commit()
+            result.commit_seconds = time.perf_counter() - commit_started
+            committed = True
+        except Exception:
+            session.rollback()
+            if committed:
+                loader.refresh_derived()
+            raise
+        results.append(result)
+
+    refresh_started = time.perf_counter()
+    loader.refresh_derived()
+    return {
+        'files': [(os.path.basename(path), seconds) for path, _, seconds in parsed],
+        'workers': workers,
+        'parse_seconds': parse_seconds,
+        'stages': results,
+        'refresh_seconds': time.perf_counter() - refresh_started,
+        'duration': time.perf_counter() - started,
+    }
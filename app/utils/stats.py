@@ -0,0 +1,130 @@
+# app/utils/stats.py
+"""Grouped statistics shared by list, print and export views.
+
+Each helper answers for a whole set of ids with a fixed number of grouped
+queries, so callers never loop issuing one COUNT per row.
+"""
+from typing import Dict, Iterable, List, NamedTuple
+from flask import current_app, has_app_context
+from sqlalchemy import case, func, select
+from app import db
+from app.models.tran import (
+    Agency, Component, Configuration, Criticality, Function, FunctionalArea,
+    IntegrationPoint, Product, Vendor, function_component,
+)
+from app.utils.cache import TTLCache, on_commit_touching
+
+CRITICALITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+class FunctionStats(NamedTuple):
+    component_count: int
+    agency_count: int
+
+
+def function_stats(function_ids: Iterable[int]) -> Dict[int, FunctionStats]:
+    """Component and distinct-agency counts for each function id (two queries).
+
+    Every requested id is present in the result; functions with nothing
+    linked get zero counts.
+    """
+    ids = list(set(function_ids))
+    if not ids:
+        return {}
+    component_counts = dict(
+        db.session.query(function_component.c.function_id, func.count(function_component.c.component_id))
+        .filter(function_component.c.function_id.in_(ids))
+        .group_by(function_component.c.function_id)
+        .all()
+    )
+    agency_counts = dict(
+        db.session.query(Configuration.function_id, func.count(func.distinct(Configuration.agency_id)))
+        .filter(Configuration.function_id.in_(ids))
+        .group_by(Configuration.function_id)
+        .all()
+    )
+    return {
+        fid: FunctionStats(component_counts.get(fid, 0), agency_counts.get(fid, 0))
+        for fid in ids
+    }
+
+
+def sort_functions_by_criticality(functions: Iterable[Function]) -> List[Function]:
+    """Order functions high -> medium -> low criticality, then by name"""
+    return sorted(
+        functions,
+        key=lambda fx: (
+            CRITICALITY_ORDER.get(getattr(getattr(fx, 'criticality', None), 'value', 'medium'), 1),
+            (fx.name or '').lower(),
+        ),
+    )
+
+
+def criticality_sort_key():
+    """SQL expression ordering functions the way sort_functions_by_criticality does"""
+    return case(
+        *[(Function.criticality == c, CRITICALITY_ORDER[c.value]) for c in Criticality],
+        else_=CRITICALITY_ORDER['medium'],
+    )
+
+
+def decorate_functions(functions: Iterable[Function]) -> List[Function]:
+    """Set component_count/agency_count on each function and return them sorted for display"""
+    functions = list(functions)
+    stats = function_stats(f.id for f in functions)
+    for f in functions:
+        f.component_count, f.agency_count = stats.get(f.id, FunctionStats(0, 0))
+    return sort_functions_by_criticality(functions)
+
+
+# Dashboard metric name -> model counted
+DASHBOARD_COUNTS = {
+    'agencies': Agency,
+    'functional_areas': FunctionalArea,
+    'components': Component,
+    'integration_points': IntegrationPoint,
+    'vendors': Vendor,
+    'configurations': Configuration,
+    'products': Product,
+}
+DASHBOARD_TABLES = frozenset(model.__tablename__ for model in DASHBOARD_COUNTS.values())
+DEFAULT_DASHBOARD_CACHE_TTL = 30
+
+
+def init_app(app) -> None:
+    """Give app its own dashboard count cache (DASHBOARD_CACHE_TTL seconds)"""
+    app.extensions['dashboard_cache'] = TTLCache(
+        ttl=app.config.get('DASHBOARD_CACHE_TTL', DEFAULT_DASHBOARD_CACHE_TTL))
+
+
+def _dashboard_cache():
+    return current_app.extensions.get('dashboard_cache') if has_app_context() else None
+
+
+def _clear_dashboard_cache(touched: set) -> None:
+    cache = _dashboard_cache()
+    if cache is not None and touched & DASHBOARD_TABLES:
+        cache.clear()
+
+
+on_commit_touching(_clear_dashboard_cache)
+
+
+def _query_dashboard_counts() -> Dict[str, int]:
+    stmt = select(*[
+        select(func.count()).select_from(model).scalar_subquery().label(name)
+        for name, model in DASHBOARD_COUNTS.items()
+    ])
+    return dict(db.session.execute(stmt).one()._mapping)
+
+
+def dashboard_counts() -> Dict[str, int]:
+    """All dashboard counts from one SELECT, cached per app for DASHBOARD_CACHE_TTL seconds.
+
+    The cache is cleared whenever a commit in this process changes one of
+    the counted tables.
+    """
+    cache = _dashboard_cache()
+    if cache is None:
+        return _query_dashboard_counts()
+    return cache.get_or_set('counts', _query_dashboard_counts)
@@ -34,6 +34,25 @@ class Config:
     WTF_CSRF_TIME_LIMIT = 24 * 3600  # 24 hours in seconds
     WTF_CSRF_SSL_STRICT = False
     
+    # Caching (seconds)
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 30))
+    # HTMX fragment cache: 'lru' (per process), 'redis' (shared, needs FRAGMENT_CACHE_URL) or 'none'.
+    # With 'lru' under several workers, a commit in one worker is not seen by the others: they keep
+    # serving the old fragment for up to FRAGMENT_CACHE_TTL (default 5s for lru, 300s for redis).
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'lru')
+    FRAGMENT_CACHE_URL = os.environ.get('FRAGMENT_CACHE_URL', 'redis://localhost:6379/0')
+    FRAGMENT_CACHE_TTL = int(os.environ['FRAGMENT_CACHE_TTL']) if os.environ.get('FRAGMENT_CACHE_TTL') else None
+    # Per-request SQL timing (Server-Timing header, debug log) and slow-query log threshold
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'true').lower() in ('1', 'true', 'yes')
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 250))
+    # How often the logo/header asset manifest stats the static/images directories for added or
+    # removed files (0 = never); files replaced in place need `flask assets-refresh` outside debug mode
+    ASSET_MANIFEST_CHECK_INTERVAL = float(os.environ.get('ASSET_MANIFEST_CHECK_INTERVAL', 2))
+    # Background export jobs: builder threads per process (0 = build inline) and where finished files live
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+    EXPORT_ARTIFACT_DIR = os.environ.get('EXPORT_ARTIFACT_DIR')  # default <instance>/exports
+    EXPORT_JOB_RETENTION = int(os.environ.get('EXPORT_JOB_RETENTION', 24 * 3600))
+    
     # File upload settings
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500 MB limit
     
@@ -1,45 +1,517 @@
 #!/usr/bin/env python3
 """
-GTFS Data Loader - Idempotent loader for GTFS static data into PostgreSQL
+GTFS Data Loader - Idempotent loader for GTFS static data into PostgreSQL or SQLite
 
 Usage:
     python gtfs_loader.py /path/to/gtfs/files
+    python gtfs_loader.py /path/to/gtfs.zip
     
 Or as a module:
     from gtfs_loader import GTFSLoader
-    loader = GTFSLoader(app, '/path/to/gtfs/files')
+    loader = GTFSLoader(app, '/path/to/gtfs/files')  # or a zip path / binary file object
     loader.load_all()
 """
 
 import os
+import io
 import csv
 import sys
-from pathlib import Path
-from datetime import datetime, date, time
-from decimal import Decimal
-from typing import Dict, List, Any, Optional
+import hashlib
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from time import perf_counter, process_time
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Callable, Tuple, Set, BinaryIO, Union
 import logging
 
-from sqlalchemy import text
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import (
+    text, select, literal, bindparam, and_, tuple_, insert, delete, exists,
+    MetaData, Table, Column, Index, Integer, Numeric, Float, Date,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from app import create_app, db
 from app.models import (
     GTFSAgency, GTFSStop, GTFSRoute, GTFSCalendar, GTFSCalendarDate, GTFSTrip, 
     GTFSStopTime, GTFSShape, GTFSFeedInfo, GTFSFareMedia, GTFSRiderCategory, 
-    GTFSFareProduct, GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule
+    GTFSFareProduct, GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule,
+    GTFSLoadManifest
 )
+from app.models.gtfs import GTFSTime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows per upsert statement; keeps memory flat regardless of feed size
+DEFAULT_BATCH_SIZE = 10_000
+
+# NULL marker used in COPY buffers (distinguishes NULL from an empty string)
+COPY_NULL = '\\N'
+
+# PostgreSQL's wire protocol caps a statement at 65535 bind parameters
+POSTGRESQL_MAX_PARAMS = 65535
+
+# Keys per SELECT when probing for existing rows (generic merge, incremental diff)
+KEY_LOOKUP_CHUNK = 500
+
+# Bytes read at a time when hashing feed files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_batches(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group an iterable of records into lists of at most batch_size"""
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+# Field converters: each takes the raw CSV string and returns the typed value
+Converter = Callable[[str], Any]
+# Row plan: (header index, column name, converter) for every model column in the file
+RowPlan = List[Tuple[int, str, Converter]]
+
+
+def convert_int(value: str) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return None
+
+
+def convert_float(value: str) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def convert_decimal(value: str) -> Optional[Decimal]:
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def convert_gtfs_time(value: str) -> Optional[int]:
+    """Parse GTFS H:MM:SS / HH:MM:SS into seconds since noon minus 12h.
+
+    Hours of 24 and above are kept, not wrapped. The colons are found by
+    position from the end, so each field is a single slice and int().
+    """
+    if not value:
+        return None
+    n = len(value)
+    if n < 7 or value[n - 3] != ':' or value[n - 6] != ':':
+        stripped = value.strip()
+        return convert_gtfs_time(stripped) if stripped != value else None
+    try:
+        hours = int(value[:n - 6])
+        minutes = int(value[n - 5:n - 3])
+        seconds = int(value[n - 2:])
+    except ValueError:
+        return None
+    if hours < 0 or minutes > 59 or seconds > 59:
+        return None
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def convert_str(value: str) -> Optional[str]:
+    if not value:
+        return None
+    return value.strip()
+
+
+def build_copy_buffer(records: List[Dict[str, Any]], columns: List[str]) -> io.StringIO:
+    """Serialize a batch of records as CSV for COPY ... FROM STDIN"""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    for record in records:
+        writer.writerow([
+            COPY_NULL if value is None else value
+            for value in (record.get(column) for column in columns)
+        ])
+    buf.seek(0)
+    return buf
+
+
+class HashingReader(io.RawIOBase):
+    """Binary stream that feeds every byte read through a hashlib object"""
+
+    def __init__(self, raw: BinaryIO, digest):
+        self.raw = raw
+        self.digest = digest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        buffer[:len(data)] = data
+        self.digest.update(data)
+        return len(data)
+
+    def drain(self) -> None:
+        """Hash whatever the consumer did not read"""
+        for chunk in iter(lambda: self.raw.read(HASH_CHUNK_SIZE), b''):
+            self.digest.update(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+class DirectorySource:
+    """GTFS feed extracted into a directory"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def exists(self, filename: str) -> bool:
+        return (self.path / filename).exists()
+
+    def open(self, filename: str) -> BinaryIO:
+        return open(self.path / filename, 'rb')
+
+    def close(self) -> None:
+        pass
+
+
+class ZipSource:
+    """GTFS feed read in place from a zip archive (path or binary file object).
+
+    Members are streamed out of the archive on demand; nothing is extracted
+    to disk. Files nested in a single top-level folder are found by name.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.path = Path(source) if isinstance(source, (str, os.PathLike)) else None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._members: Dict[str, str] = {}
+
+    def __str__(self) -> str:
+        return str(self.path) if self.path is not None else '<zip stream>'
+
+    @property
+    def archive(self) -> zipfile.ZipFile:
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.source)
+            # Shallowest member wins when the same file name appears twice
+            for name in sorted(self._zip.namelist(), key=lambda n: (n.count('/'), n), reverse=True):
+                if not name.endswith('/'):
+                    self._members[PurePosixPath(name).name] = name
+        return self._zip
+
+    def exists(self, filename: str) -> bool:
+        self.archive
+        return filename in self._members
+
+    def open(self, filename: str) -> BinaryIO:
+        return self.archive.open(self._members[filename])
+
+    def close(self) -> None:
+        # ZipFile leaves caller-supplied file objects open
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            self._members = {}
+
+
+FeedSource = Union[DirectorySource, ZipSource]
+
+
+def open_feed(source) -> FeedSource:
+    """Wrap a directory path, zip path or binary zip file object as a feed source"""
+    if isinstance(source, (DirectorySource, ZipSource)):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        path = Path(source)
+        if path.is_file():
+            if not zipfile.is_zipfile(path):
+                raise ValueError(f"{path} is not a GTFS directory or zip archive")
+            return ZipSource(path)
+        return DirectorySource(path)
+    if hasattr(source, 'read'):
+        return ZipSource(source)
+    raise TypeError(f"Unsupported GTFS source: {source!r}")
+
+
+def primary_key_of(table, record: Dict[str, Any]) -> Tuple:
+    return tuple(record.get(col.name) for col in table.primary_key.columns)
+
+
+def select_by_keys(session, table, keys: List[Tuple], columns=None) -> Iterator[Any]:
+    """Yield rows of table whose primary key is in keys, querying in chunks"""
+    pk_cols = list(table.primary_key.columns)
+    columns = columns if columns is not None else pk_cols
+    for chunk in iter_batches(keys, KEY_LOOKUP_CHUNK):
+        if len(pk_cols) == 1:
+            condition = pk_cols[0].in_([k[0] for k in chunk])
+        else:
+            condition = tuple_(*pk_cols).in_(chunk)
+        yield from session.execute(select(*columns).where(condition))
+
+
+def dedupe_on_primary_key(table, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the last record for each primary key, preserving first-seen order"""
+    latest = {}
+    for record in records:
+        latest[primary_key_of(table, record)] = record
+    return list(latest.values())
+
+
+class Upserter:
+    """Dialect-specific strategy for writing GTFS batches.
+
+    Subclasses pick the statement shape and batch size that suit the bound
+    engine; get_upserter chooses one from the dialect name.
+    """
+    name = 'generic'
+    supports_copy = False
+    # Whether separate connections can write different tables at the same time
+    supports_parallel_writes = True
+
+    def batch_size(self, table, requested: int) -> int:
+        """Rows per batch for this table, capped by any dialect limits"""
+        return requested
+
+    def begin_load(self, session) -> None:
+        """Hook run once before a full load"""
+
+    def end_load(self, session) -> None:
+        """Hook run once after a full load has committed"""
+
+    def update_columns(self, table) -> List[str]:
+        return [col.name for col in table.columns if not col.primary_key]
+
+    def clear_tables(self, session, tables: List[Table]) -> None:
+        """Empty tables, children first, with one unfiltered DELETE each"""
+        for table in tables:
+            session.execute(delete(table))
+
+    def upsert(self, session, table, records: List[Dict[str, Any]]) -> int:
+        """Generic merge: look up existing keys, then executemany UPDATE and INSERT"""
+        records = dedupe_on_primary_key(table, records)
+        pk_cols = list(table.primary_key.columns)
+        keys = [primary_key_of(table, r) for r in records]
+        existing = {tuple(row) for row in select_by_keys(session, table, keys)}
+
+        inserts = [r for r, k in zip(records, keys) if k not in existing]
+        updates = [r for r, k in zip(records, keys) if k in existing]
+
+        if inserts:
+            session.execute(insert(table), inserts)
+        if updates:
+            # Bind names must not collide with column names in UPDATE ... SET
+            set_cols = [c for c in updates[0] if not table.columns[c].primary_key]
+            if set_cols:
+                stmt = (table.update()
+                        .where(and_(*[c == bindparam(f"pk_{c.name}") for c in pk_cols]))
+                        .values({c: bindparam(f"v_{c}") for c in set_cols}))
+                session.execute(stmt, [
+                    {**{f"pk_{c.name}": r.get(c.name) for c in pk_cols},
+                     **{f"v_{c}": r.get(c) for c in set_cols}}
+                    for r in updates
+                ])
+        return len(inserts) + len(updates)
+
+
+class PostgreSQLUpserter(Upserter):
+    """Multi-row INSERT ... ON CONFLICT DO UPDATE, plus COPY for bulk loads"""
+    name = 'postgresql'
+    supports_copy = True
+
+    def batch_size(self, table, requested: int) -> int:
+        return max(1, min(requested, POSTGRESQL_MAX_PARAMS // len(table.columns)))
+
+    def clear_tables(self, session, tables: List[Table]) -> None:
+        # One TRUNCATE for every table: no per-row WAL and no FK checks between them
+        preparer = session.get_bind().dialect.identifier_preparer
+        names = ', '.join(preparer.format_table(t) for t in tables)
+        session.execute(text(f"TRUNCATE TABLE {names} RESTART IDENTITY CASCADE"))
+
+    def upsert(self, session, table, records: List[Dict[str, Any]]) -> int:
+        # A single statement may not touch the same key twice
+        records = dedupe_on_primary_key(table, records)
+        primary_key_cols = [col.name for col in table.primary_key.columns]
+        stmt = postgresql.insert(table).values(records)
+        update_dict = {c: stmt.excluded[c] for c in self.update_columns(table)}
+        if update_dict:
+            stmt = stmt.on_conflict_do_update(index_elements=primary_key_cols, set_=update_dict)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=primary_key_cols)
+        return session.execute(stmt).rowcount
+
+
+class SQLiteUpserter(Upserter):
+    """INSERT ... ON CONFLICT DO UPDATE sent with executemany.
+
+    executemany binds one row at a time, so a batch never approaches
+    SQLITE_MAX_VARIABLE_NUMBER however wide or long it is. The whole load
+    runs in one transaction with synchronous=OFF, restored afterwards on
+    the same connection. Clearing uses the generic unfiltered DELETE,
+    which SQLite runs as a truncate rather than row by row.
+    """
+    name = 'sqlite'
+    # SQLite serializes writers; parallel workers would only contend for the lock
+    supports_parallel_writes = False
+
+    def __init__(self):
+        self._dbapi_connection = None
+        self._synchronous = None
+
+    def begin_load(self, session) -> None:
+        connection = session.connection()
+        self._dbapi_connection = connection.connection.dbapi_connection
+        self._synchronous = connection.exec_driver_sql("PRAGMA synchronous").scalar()
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+
+    def end_load(self, session) -> None:
+        if self._dbapi_connection is not None and self._synchronous is not None:
+            self._dbapi_connection.execute(f"PRAGMA synchronous={int(self._synchronous)}")
+        self._dbapi_connection = None
+        self._synchronous = None
+
+    def upsert(self, session, table, records: List[Dict[str, Any]]) -> int:
+        primary_key_cols = [col.name for col in table.primary_key.columns]
+        stmt = sqlite.insert(table)
+        update_dict = {c: stmt.excluded[c] for c in self.update_columns(table)}
+        if update_dict:
+            stmt = stmt.on_conflict_do_update(index_elements=primary_key_cols, set_=update_dict)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=primary_key_cols)
+        return session.execute(stmt, records).rowcount
+
+
+UPSERTERS = {
+    'postgresql': PostgreSQLUpserter,
+    'sqlite': SQLiteUpserter,
+}
+
+
+def get_upserter(dialect_name: str) -> Upserter:
+    """Pick the upsert strategy for a dialect, falling back to the generic merge"""
+    return UPSERTERS.get(dialect_name, Upserter)()
+
+
+def dependency_levels(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Group a dependency graph into levels that can be loaded together.
+
+    Every node appears after all of its dependencies; nodes within a level
+    keep the graph's insertion order.
+    """
+    remaining = {node: set(deps) & graph.keys() for node, deps in graph.items()}
+    levels = []
+    done: Set[str] = set()
+    while remaining:
+        level = [node for node, deps in remaining.items() if deps <= done]
+        if not level:
+            raise ValueError(f"Dependency cycle between: {sorted(remaining)}")
+        levels.append(level)
+        done.update(level)
+        for node in level:
+            del remaining[node]
+    return levels
+
+
+def run_dependency_graph(graph: Dict[str, Set[str]], executor: Executor,
+                         fn: Callable[..., Any], *args) -> Dict[str, Any]:
+    """Run fn(node, *args) for every node, starting each once its dependencies finish.
+
+    Returns {node: result}. On the first failure nothing new is submitted,
+    pending work is cancelled and the error is re-raised.
+    """
+    dependencies = {node: set(deps) & graph.keys() for node, deps in graph.items()}
+    done: Set[str] = set()
+    results: Dict[str, Any] = {}
+    running = {}
+
+    def submit_ready():
+        for node, deps in dependencies.items():
+            if node not in done and node not in running.values() and deps <= done:
+                running[executor.submit(fn, node, *args)] = node
+
+    submit_ready()
+    while running:
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            node = running.pop(future)
+            try:
+                results[node] = future.result()
+            except Exception:
+                for pending in running:
+                    pending.cancel()
+                raise
+            done.add(node)
+        submit_ready()
+    return results
+
+
+def load_file_in_worker(filename: str, database_uri: str, gtfs_source: str,
+                        batch_size: int, use_copy: bool, cleared: bool) -> Optional[Dict[str, Any]]:
+    """Process pool entry point: load one file over its own connection and commit"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    loader = GTFSLoader(app, gtfs_source, batch_size=batch_size, use_copy=use_copy)
+    loader.cleared = cleared
+    with app.app_context():
+        model_class, _ = loader.file_mapping[filename]
+        loader.upserter.begin_load(db.session)
+        try:
+            loader.load_file(filename, model_class)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            loader.upserter.end_load(db.session)
+            loader.feed.close()
+    return loader.stats.get(filename)
+
 
 class GTFSLoader:
     """Idempotent GTFS data loader with upsert capabilities"""
     
-    def __init__(self, app, gtfs_directory: str):
+    def __init__(self, app, gtfs_source, batch_size: int = DEFAULT_BATCH_SIZE,
+                 use_copy: bool = True, incremental: bool = False):
         self.app = app
-        self.gtfs_directory = Path(gtfs_directory)
+        # Directory, zip path or binary zip file object
+        self.feed = open_feed(gtfs_source)
+        self.batch_size = batch_size
+        # Allow the PostgreSQL COPY fast path for cleared or empty tables
+        self.use_copy = use_copy
+        self.cleared = False
+        # Skip files whose hash matches the manifest and diff the rest row by row
+        self.incremental = incremental
+        # (model class, temp table of keys seen in the file) awaiting deletes;
+        # no key table means the file left the feed and every row goes
+        self.pending_deletes: List[Tuple[Any, Optional[Table]]] = []
+        self._upserter: Optional[Upserter] = None
         self.stats = {}
+        # model class -> {column name: converter}, built once per model
+        self._converters: Dict[type, Dict[str, Converter]] = {}
         
         # File mapping: filename -> (model_class, required)
         self.file_mapping = {
@@ -65,15 +537,14 @@ class GTFSLoader:
         missing_required = []
         
         for filename, (model_class, required) in self.file_mapping.items():
-            file_path = self.gtfs_directory / filename
-            if required and not file_path.exists():
+            if required and not self.feed.exists(filename):
                 missing_required.append(filename)
         
         if missing_required:
             logger.error(f"Missing required GTFS files: {missing_required}")
             return False
         
-        logger.info(f"GTFS directory validation passed: {self.gtfs_directory}")
+        logger.info(f"GTFS feed validation passed: {self.feed}")
         return True
     
     def parse_gtfs_date(self, date_str: str) -> Optional[date]:
@@ -86,128 +557,123 @@ class GTFSLoader:
             logger.warning(f"Invalid date format: {date_str}")
             return None
     
-    def parse_gtfs_time(self, time_str: str) -> Optional[time]:
-        """Parse GTFS time format HH:MM:SS (can be > 24 hours)"""
+    def parse_gtfs_time(self, time_str: str) -> Optional[int]:
+        """Parse GTFS time format HH:MM:SS (can be > 24 hours) into GTFSTime seconds"""
         if not time_str or time_str.strip() == '':
             return None
-        
-        try:
-            time_str = time_str.strip()
-            parts = time_str.split(':')
-            if len(parts) != 3:
-                return None
-            
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = int(parts[2])
-            
-            # Handle times >= 24:00:00 by wrapping to next day
-            if hours >= 24:
-                hours = hours % 24
-            
-            return time(hours, minutes, seconds)
-        except (ValueError, IndexError):
+        seconds = convert_gtfs_time(time_str)
+        if seconds is None:
             logger.warning(f"Invalid time format: {time_str}")
-            return None
+        return seconds
+    
+    def get_converters(self, model_class) -> Dict[str, Converter]:
+        """Return the cached column name -> converter table for a model"""
+        converters = self._converters.get(model_class)
+        if converters is None:
+            converters = {}
+            for column in model_class.__table__.columns:
+                column_type = column.type
+                # Float subclasses Numeric, so it must be checked first
+                if isinstance(column_type, GTFSTime):
+                    converters[column.name] = convert_gtfs_time
+                elif isinstance(column_type, Integer):
+                    converters[column.name] = convert_int
+                elif isinstance(column_type, Float):
+                    converters[column.name] = convert_float
+                elif isinstance(column_type, Numeric):
+                    converters[column.name] = convert_decimal
+                elif isinstance(column_type, Date):
+                    converters[column.name] = self.parse_gtfs_date
+                else:
+                    converters[column.name] = convert_str
+            self._converters[model_class] = converters
+        return converters
+    
+    def build_row_plan(self, header: List[str], model_class) -> RowPlan:
+        """Map CSV header positions to model columns and their converters.
+
+        Header fields that are not columns on the model are dropped here, once
+        per file, instead of being filtered out of every row.
+        """
+        converters = self.get_converters(model_class)
+        plan = []
+        for index, key in enumerate(header):
+            # Clean field names (remove BOM, strip whitespace)
+            clean_key = key.strip().replace('\ufeff', '') if key else key
+            converter = converters.get(clean_key)
+            if converter is not None:
+                plan.append((index, clean_key, converter))
+        return plan
     
     def clean_field_value(self, value: Any, field_name: str, model_class) -> Any:
-        """Clean and convert field values based on model field types"""
+        """Clean and convert a single field value based on its model column type"""
         if value == '' or value is None:
             return None
-        
-        # Get field type from model
-        if hasattr(model_class, '__table__'):
-            column = model_class.__table__.columns.get(field_name)
-            if column is not None:
-                column_type = str(column.type)
-                
-                # Handle different data types
-                if 'INTEGER' in column_type:
-                    try:
-                        return int(float(value)) if value != '' else None
-                    except (ValueError, TypeError):
-                        return None
-                elif 'DECIMAL' in column_type or 'NUMERIC' in column_type:
-                    try:
-                        return Decimal(str(value)) if value != '' else None
-                    except (ValueError, TypeError):
-                        return None
-                elif 'FLOAT' in column_type or 'REAL' in column_type:
-                    try:
-                        return float(value) if value != '' else None
-                    except (ValueError, TypeError):
-                        return None
-                elif 'DATE' in column_type:
-                    return self.parse_gtfs_date(str(value))
-                elif 'TIME' in column_type:
-                    return self.parse_gtfs_time(str(value))
-        
-        # Default: return as string, stripped
-        return str(value).strip() if value is not None else None
+        converter = self.get_converters(model_class).get(field_name, convert_str)
+        return converter(str(value))
     
-    def read_gtfs_file(self, filename: str, model_class) -> List[Dict[str, Any]]:
-        """Read and parse a GTFS CSV file"""
-        file_path = self.gtfs_directory / filename
-        
-        if not file_path.exists():
+    def read_gtfs_file(self, filename: str, model_class, digest=None) -> Iterator[Dict[str, Any]]:
+        """Stream parsed records from a GTFS CSV file, one dict per row.
+
+        Only fields that exist on the model are kept, so each record can be
+        passed straight to upsert_records. With digest (a hashlib object),
+        the file's bytes are hashed as they are read.
+        """
+        if not self.feed.exists(filename):
             logger.info(f"Optional file {filename} not found, skipping")
-            return []
+            return
         
-        records = []
+        row_count = 0
+        hashing = None
+        stream = self.feed.open(filename)
+        if digest is not None:
+            hashing = HashingReader(stream, digest)
+            stream = io.BufferedReader(hashing, HASH_CHUNK_SIZE)
         try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
+            with io.TextIOWrapper(stream, encoding='utf-8-sig', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header:
+                    logger.warning(f"{filename} is empty, skipping")
+                    return
+                
+                plan = self.build_row_plan(header, model_class)
+                if not plan:
+                    logger.warning(f"{filename} has no columns matching {model_class.__tablename__}, skipping")
+                    if hashing is not None:
+                        hashing.drain()
+                    return
+                width = len(header)
                 
-                for row_num, row in enumerate(reader, 1):
-                    # Clean field names (remove BOM, strip whitespace)
-                    cleaned_row = {}
-                    for key, value in row.items():
-                        clean_key = key.strip().replace('\ufeff', '') if key else key
-                        cleaned_value = self.clean_field_value(value, clean_key, model_class)
-                        if clean_key:  # Only add non-empty keys
-                            cleaned_row[clean_key] = cleaned_value
-                    
-                    if cleaned_row:  # Only add non-empty rows
-                        records.append(cleaned_row)
+                for row in reader:
+                    if not row:  # Skip blank lines
+                        continue
+                    if len(row) < width:
+                        row.extend([''] * (width - len(row)))
+                    row_count += 1
+                    yield {name: convert(row[index]) for index, name, convert in plan}
                 
-                logger.info(f"Read {len(records)} records from {filename}")
+                logger.info(f"Read {row_count} records from {filename}")
                 
         except Exception as e:
             logger.error(f"Error reading {filename}: {e}")
             raise
-        
-        return records
+    
+    @property
+    def upserter(self) -> Upserter:
+        """Upsert strategy for the engine bound to the session"""
+        if self._upserter is None:
+            self._upserter = get_upserter(db.session.get_bind().dialect.name)
+        return self._upserter
     
     def upsert_records(self, model_class, records: List[Dict[str, Any]]) -> int:
-        """Upsert records using PostgreSQL ON CONFLICT"""
+        """Upsert records with the strategy for the bound dialect"""
         if not records:
             return 0
         
         table = model_class.__table__
-        primary_key_cols = [col.name for col in table.primary_key.columns]
-        
         try:
-            # Use PostgreSQL's INSERT ... ON CONFLICT ... DO UPDATE
-            stmt = insert(table).values(records)
-            
-            # Create update dict for all non-primary key columns
-            update_dict = {
-                col.name: stmt.excluded[col.name] 
-                for col in table.columns 
-                if col.name not in primary_key_cols
-            }
-            
-            if update_dict:  # Only if there are columns to update
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=primary_key_cols,
-                    set_=update_dict
-                )
-            else:
-                stmt = stmt.on_conflict_do_nothing(index_elements=primary_key_cols)
-            
-            result = db.session.execute(stmt)
-            affected_rows = result.rowcount
-            
+            affected_rows = self.upserter.upsert(db.session, table, records)
             logger.info(f"Upserted {affected_rows} records into {table.name}")
             return affected_rows
             
@@ -216,33 +682,308 @@ class GTFSLoader:
             db.session.rollback()
             raise
     
-    def load_file(self, filename: str, model_class) -> int:
-        """Load a single GTFS file"""
-        logger.info(f"Loading {filename}...")
-        
-        records = self.read_gtfs_file(filename, model_class)
-        if not records:
-            return 0
+    def quote(self, name: str) -> str:
+        """Quote an identifier for the bound database"""
+        return db.session.get_bind().dialect.identifier_preparer.quote(name)
+    
+    def table_is_empty(self, model_class) -> bool:
+        """Check for any row without counting the whole table"""
+        stmt = select(literal(1)).select_from(model_class.__table__).limit(1)
+        return db.session.execute(stmt).first() is None
+    
+    def should_copy(self, model_class) -> bool:
+        """Use COPY when loading into a cleared or empty PostgreSQL table"""
+        if not self.use_copy or not self.upserter.supports_copy:
+            return False
+        return self.cleared or self.table_is_empty(model_class)
+    
+    def create_staging_table(self, model_class) -> str:
+        """Create a transaction-scoped temp table shaped like the target"""
+        staging = self.quote(f"stage_{model_class.__tablename__}")
+        db.session.execute(text(
+            f"CREATE TEMP TABLE {staging} "
+            f"(LIKE {self.quote(model_class.__tablename__)} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        return staging
+    
+    def copy_records(self, staging: str, columns: List[str], records: List[Dict[str, Any]]) -> None:
+        """Stream a batch into the staging table with COPY FROM STDIN"""
+        column_list = ', '.join(self.quote(c) for c in columns)
+        sql = f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        # Raw DBAPI cursor on the session's connection, so COPY joins the load transaction
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(sql, build_copy_buffer(records, columns))
+        finally:
+            cursor.close()
+    
+    def build_merge_sql(self, model_class, staging: str, columns: List[str]) -> str:
+        """Build the single INSERT ... SELECT ... ON CONFLICT merging staging into the target"""
+        table = model_class.__table__
+        primary_key_cols = [self.quote(col.name) for col in table.primary_key.columns]
+        quoted = [self.quote(c) for c in columns]
+        pk_list = ', '.join(primary_key_cols)
+        column_list = ', '.join(quoted)
+        # DISTINCT ON keeps the last occurrence of a duplicated key, like successive upserts would
+        sql = (
+            f"INSERT INTO {self.quote(table.name)} ({column_list}) "
+            f"SELECT DISTINCT ON ({pk_list}) {column_list} FROM {staging} "
+            f"ORDER BY {pk_list}, ctid DESC "
+        )
+        # Columns missing from the file take their defaults via EXCLUDED, as with upserts
+        updates = [
+            f"{self.quote(c)} = EXCLUDED.{self.quote(c)}"
+            for c in self.upserter.update_columns(table)
+        ]
+        if updates:
+            sql += f"ON CONFLICT ({pk_list}) DO UPDATE SET {', '.join(updates)}"
+        else:
+            sql += f"ON CONFLICT ({pk_list}) DO NOTHING"
+        return sql
+    
+    def copy_file(self, filename: str, model_class, file_stats: Dict[str, Any], digest=None) -> None:
+        """Bulk load a file through COPY into staging, then merge into the target"""
+        staging = self.create_staging_table(model_class)
+        columns = None
+        records = self.read_gtfs_file(filename, model_class, digest)
+        batch_size = self.upserter.batch_size(model_class.__table__, self.batch_size)
+        for batch in iter_batches(records, batch_size):
+            if columns is None:
+                columns = list(batch[0].keys())
+            self.copy_records(staging, columns, batch)
+            self.record_batch(filename, file_stats, len(batch), 0)
         
-        # Filter records to only include fields that exist in the model
-        table_columns = {col.name for col in model_class.__table__.columns}
-        filtered_records = []
+        if columns is not None:
+            result = db.session.execute(text(self.build_merge_sql(model_class, staging, columns)))
+            file_stats['records_affected'] = result.rowcount
+            logger.info(f"Merged {result.rowcount} records into {model_class.__tablename__} via COPY")
+        db.session.execute(text(f"DROP TABLE {staging}"))
+    
+    def record_batch(self, filename: str, file_stats: Dict[str, Any], rows: int, affected: int) -> None:
+        """Update per-file progress after a batch"""
+        file_stats['records_processed'] += rows
+        file_stats['records_affected'] += affected
+        file_stats['batches'] += 1
+        self.stats[filename] = file_stats
+        logger.info(
+            f"{filename}: batch {file_stats['batches']} "
+            f"({file_stats['records_processed']} records so far)"
+        )
+    
+    def file_digest(self, filename: str) -> Optional[str]:
+        """SHA-256 of a feed file, or None if it is absent"""
+        if not self.feed.exists(filename):
+            return None
+        digest = hashlib.sha256()
+        with self.feed.open(filename) as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def is_unchanged(self, filename: str, digest: str, model_class) -> bool:
+        """True when the manifest already holds this exact file and its table has data"""
+        manifest = db.session.get(GTFSLoadManifest, filename)
+        return (manifest is not None and manifest.sha256 == digest
+                and not self.table_is_empty(model_class))
+    
+    def record_manifest(self, filename: str, digest: str, row_count: int) -> None:
+        db.session.merge(GTFSLoadManifest(
+            filename=filename, sha256=digest, row_count=row_count, loaded_at=datetime.utcnow()
+        ))
+    
+    def create_key_table(self, model_class) -> Table:
+        """Temp table holding the primary keys seen in an incremental load"""
+        source = model_class.__table__
+        pk_names = [col.name for col in source.primary_key.columns]
+        # Indexed but not unique: a key repeated across batches must not fail the insert
+        keys = Table(
+            f"keys_{source.name}", MetaData(),
+            *[Column(col.name, col.type) for col in source.primary_key.columns],
+            Index(f"ix_keys_{source.name}", *pk_names),
+            prefixes=['TEMPORARY'],
+        )
+        keys.create(db.session.connection())
+        return keys
+    
+    def diff_file(self, filename: str, model_class, file_stats: Dict[str, Any]) -> None:
+        """Write only inserted or changed rows; remember keys so deletes can follow.
+
+        Rows are compared on every column of the model, so a column dropped
+        from the feed is reset rather than keeping its old values.
+        """
+        table = model_class.__table__
+        keys_table = self.create_key_table(model_class)
+        self.pending_deletes.append((model_class, keys_table))
+        file_stats.update({'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0})
         
-        for record in records:
-            filtered_record = {
-                key: value for key, value in record.items() 
-                if key in table_columns
+        # Columns the file leaves out hold what a fresh load would store: the default or NULL
+        absent = {
+            col.name: col.default.arg if col.default is not None and col.default.is_scalar else None
+            for col in table.columns
+        }
+        records = ({**absent, **record} for record in self.read_gtfs_file(filename, model_class))
+        batch_size = self.upserter.batch_size(table, self.batch_size)
+        for batch in iter_batches(records, batch_size):
+            batch = dedupe_on_primary_key(table, batch)
+            keys = [primary_key_of(table, r) for r in batch]
+            existing = {
+                primary_key_of(table, row._mapping): row._mapping
+                for row in select_by_keys(db.session, table, keys, list(table.columns))
             }
-            if filtered_record:
-                filtered_records.append(filtered_record)
+            changed = []
+            for key, record in zip(keys, batch):
+                current = existing.get(key)
+                if current is None:
+                    file_stats['inserted'] += 1
+                    changed.append(record)
+                elif any(current[c] != v for c, v in record.items()):
+                    file_stats['updated'] += 1
+                    changed.append(record)
+                else:
+                    file_stats['unchanged'] += 1
+            
+            db.session.execute(insert(keys_table), [dict(zip(keys_table.c.keys(), k)) for k in keys])
+            affected_rows = self.upsert_records(model_class, changed) if changed else 0
+            self.record_batch(filename, file_stats, len(batch), affected_rows)
+    
+    def apply_pending_deletes(self) -> None:
+        """Delete rows missing from their diffed file, children before parents.
+
+        A file removed from the feed (no key table) loses all its rows and
+        its manifest entry.
+        """
+        for model_class, keys_table in reversed(self.pending_deletes):
+            table = model_class.__table__
+            filename = next(f for f, (m, _) in self.file_mapping.items() if m is model_class)
+            if keys_table is None:
+                deleted = db.session.execute(delete(table)).rowcount
+                db.session.execute(delete(GTFSLoadManifest.__table__)
+                                   .where(GTFSLoadManifest.filename == filename))
+            else:
+                seen = exists().where(and_(*[
+                    keys_table.c[col.name] == col for col in table.primary_key.columns
+                ]))
+                deleted = db.session.execute(delete(table).where(~seen)).rowcount
+                keys_table.drop(db.session.connection())
+            file_stats = self.stats.get(filename)
+            if file_stats is not None:
+                file_stats['deleted'] = deleted
+                file_stats['records_affected'] += deleted
+            logger.info(f"Deleted {deleted} rows from {table.name} no longer in {filename}")
+        self.pending_deletes = []
+    
+    def load_file(self, filename: str, model_class) -> int:
+        """Load a single GTFS file in fixed-size batches.
+
+        Progress is written to self.stats[filename] after every batch. In
+        incremental mode an unchanged file is skipped, a changed file is
+        diffed against the rows already in its table, and a file that was
+        loaded before but has left the feed is emptied. Otherwise the file
+        is hashed while it is read, for the manifest.
+        """
+        incremental = self.incremental and not self.cleared
+        if not self.feed.exists(filename):
+            if incremental and db.session.get(GTFSLoadManifest, filename) is not None:
+                logger.info(f"{filename} no longer in the feed; its rows will be deleted")
+                self.pending_deletes.append((model_class, None))
+                self.stats[filename] = {'records_processed': 0, 'records_affected': 0,
+                                        'batches': 0, 'method': 'removed'}
+            else:
+                logger.info(f"Optional file {filename} not found, skipping")
+            return 0
         
-        affected_rows = self.upsert_records(model_class, filtered_records)
-        self.stats[filename] = {
-            'records_processed': len(filtered_records),
-            'records_affected': affected_rows
+        file_stats = {
+            'records_processed': 0,
+            'records_affected': 0,
+            'batches': 0,
+            'method': 'upsert',
         }
+        streaming = None
+        if incremental:
+            # Needed before reading, to decide whether to read at all
+            digest = self.file_digest(filename)
+            if self.is_unchanged(filename, digest, model_class):
+                logger.info(f"{filename} unchanged since last load, skipping")
+                file_stats['method'] = 'skipped'
+                self.stats[filename] = file_stats
+                return 0
+        else:
+            streaming = hashlib.sha256()
+        
+        logger.info(f"Loading {filename}...")
+        wall_start, cpu_start = perf_counter(), process_time()
         
-        return affected_rows
+        if self.should_copy(model_class):
+            file_stats['method'] = 'copy'
+            self.copy_file(filename, model_class, file_stats, streaming)
+        elif incremental and not self.table_is_empty(model_class):
+            file_stats['method'] = 'diff'
+            self.diff_file(filename, model_class, file_stats)
+        else:
+            records = self.read_gtfs_file(filename, model_class, streaming)
+            batch_size = self.upserter.batch_size(model_class.__table__, self.batch_size)
+            for batch in iter_batches(records, batch_size):
+                affected_rows = self.upsert_records(model_class, batch)
+                self.record_batch(filename, file_stats, len(batch), affected_rows)
+        
+        if streaming is not None:
+            digest = streaming.hexdigest()
+        self.record_manifest(filename, digest, file_stats['records_processed'])
+        file_stats['wall_seconds'] = round(perf_counter() - wall_start, 3)
+        file_stats['cpu_seconds'] = round(process_time() - cpu_start, 3)
+        self.stats[filename] = file_stats
+        return file_stats['records_affected']
+    
+    def build_dependency_graph(self) -> Dict[str, Set[str]]:
+        """Map each file to the files its model has foreign keys into"""
+        table_to_file = {
+            model_class.__tablename__: filename
+            for filename, (model_class, _) in self.file_mapping.items()
+        }
+        graph = {}
+        for filename, (model_class, _) in self.file_mapping.items():
+            dependencies = set()
+            for fk in model_class.__table__.foreign_keys:
+                target = table_to_file.get(fk.column.table.name)
+                if target and target != filename:  # ignore self references (parent_station)
+                    dependencies.add(target)
+            graph[filename] = dependencies
+        return graph
+    
+    def load_order(self) -> List[str]:
+        """Files in an order that respects foreign keys"""
+        return [f for level in dependency_levels(self.build_dependency_graph()) for f in level]
+    
+    def load_sequential(self) -> None:
+        """Load every file in dependency order inside one transaction"""
+        self.upserter.begin_load(db.session)
+        try:
+            for filename in self.load_order():
+                model_class, _ = self.file_mapping[filename]
+                self.load_file(filename, model_class)
+            self.apply_pending_deletes()
+            db.session.commit()
+        finally:
+            self.upserter.end_load(db.session)
+    
+    def load_parallel(self, workers: int) -> None:
+        """Load independent files concurrently in a process pool.
+
+        Each file is parsed and written by a worker over its own connection
+        and committed on its own, as soon as every file it references has
+        committed. A failure stops scheduling, but files already committed
+        stay loaded.
+        """
+        database_uri = db.engine.url.render_as_string(hide_password=False)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = run_dependency_graph(
+                self.build_dependency_graph(), executor, load_file_in_worker,
+                database_uri, str(self.feed.path), self.batch_size,
+                self.use_copy, self.cleared,
+            )
+        for filename, file_stats in results.items():
+            if file_stats:
+                self.stats[filename] = file_stats
     
     def clear_existing_data(self):
         """Clear existing GTFS data in dependency order"""
@@ -253,61 +994,103 @@ class GTFSLoader:
             GTFSFareTransferRule, GTFSFareLegRule, GTFSStopTime, GTFSTrip, 
             GTFSCalendarDate, GTFSCalendar, GTFSRoute, GTFSStop, GTFSShape,
             GTFSFareProduct, GTFSTimeframe, GTFSRiderCategory, GTFSFareMedia,
-            GTFSAgency, GTFSFeedInfo
-        ] 
-            CalendarDate, Calendar, Route, Stop, Shape,
-            FareProduct, Timeframe, RiderCategory, FareMedia,
-            Agency, FeedInfo
+            GTFSAgency, GTFSFeedInfo, GTFSLoadManifest
         ]
+        tables = [model_class.__table__ for model_class in clear_order]
         
-        for model_class in clear_order:
-            try:
-                count = db.session.query(model_class).count()
-                if count > 0:
-                    db.session.query(model_class).delete()
-                    logger.info(f"Cleared {count} records from {model_class.__tablename__}")
-            except Exception as e:
-                logger.error(f"Error clearing {model_class.__tablename__}: {e}")
-                db.session.rollback()
-                raise
+        started = perf_counter()
+        try:
+            self.upserter.clear_tables(db.session, tables)
+        except Exception as e:
+            logger.error(f"Error clearing GTFS tables: {e}")
+            db.session.rollback()
+            raise
         
         db.session.commit()
+        logger.info(f"Cleared {len(tables)} GTFS tables in {perf_counter() - started:.2f}s")
+    
+    def secondary_indexes(self) -> List[Index]:
+        """Non-primary-key indexes declared on the tables this loader fills"""
+        indexes = []
+        for model_class, _ in self.file_mapping.values():
+            indexes.extend(sorted(model_class.__table__.indexes, key=lambda idx: idx.name or ''))
+        return indexes
+    
+    def drop_indexes(self) -> List[Index]:
+        """Drop secondary indexes before a bulk load; returns what was dropped"""
+        indexes = self.secondary_indexes()
+        connection = db.session.connection()
+        for index in indexes:
+            index.drop(bind=connection, checkfirst=True)
+        db.session.commit()
+        if indexes:
+            logger.info(f"Dropped {len(indexes)} secondary indexes for the load")
+        return indexes
+    
+    def rebuild_indexes(self, indexes: List[Index]) -> None:
+        """Recreate indexes removed by drop_indexes, one build per index"""
+        if not indexes:
+            return
+        started = perf_counter()
+        connection = db.session.connection()
+        for index in indexes:
+            index.create(bind=connection, checkfirst=True)
+        db.session.commit()
+        logger.info(f"Rebuilt {len(indexes)} indexes in {perf_counter() - started:.2f}s")
     
-    def load_all(self, clear_existing: bool = False) -> Dict[str, Any]:
-        """Load all GTFS files in the correct order"""
+    def load_all(self, clear_existing: bool = False, workers: int = 1,
+                 incremental: Optional[bool] = None,
+                 drop_indexes: bool = False) -> Dict[str, Any]:
+        """Load all GTFS files, respecting foreign key order.
+
+        With workers > 1, independent files load in parallel (see
+        load_parallel) where the database allows concurrent writers.
+        Incremental loads always run sequentially so that deletes can be
+        applied children-first in the same transaction. With clear_existing
+        and drop_indexes, secondary indexes are dropped after the clear and
+        rebuilt once the load finishes, whether or not it succeeds.
+        """
+        if incremental is not None:
+            self.incremental = incremental
         start_time = datetime.now()
+        wall_start = perf_counter()
         
         if not self.validate_files():
+            self.feed.close()
             raise ValueError("GTFS file validation failed")
         
         with self.app.app_context():
+            dropped_indexes: List[Index] = []
             try:
+                self.cleared = False
                 if clear_existing:
                     self.clear_existing_data()
+                    self.cleared = True
+                    if drop_indexes:
+                        dropped_indexes = self.drop_indexes()
                 
-                # Load in dependency order
-                load_order = [
-                    'feed_info.txt', 'agency.txt', 'stops.txt', 'shapes.txt',
-                    'routes.txt', 'calendar.txt', 'calendar_dates.txt', 'trips.txt',
-                    'stop_times.txt', 'fare_media.txt', 'rider_categories.txt',
-                    'fare_products.txt', 'timeframes.txt', 'fare_leg_rules.txt',
-                    'fare_transfer_rules.txt'
-                ]
-                
-                for filename in load_order:
-                    if filename in self.file_mapping:
-                        model_class, required = self.file_mapping[filename]
-                        self.load_file(filename, model_class)
+                # Workers reopen the feed by path, so in-memory zip streams load sequentially
+                parallel = (workers > 1 and self.upserter.supports_parallel_writes
+                            and not self.incremental and self.feed.path is not None)
+                if workers > 1 and not parallel:
+                    logger.warning("Parallel load unavailable (incremental mode, zip stream or single-writer database); loading sequentially")
                 
-                db.session.commit()
+                if parallel:
+                    self.load_parallel(workers)
+                else:
+                    self.load_sequential()
                 
                 end_time = datetime.now()
-                duration = end_time - start_time
+                duration = perf_counter() - wall_start
+                cpu_time = sum(s.get('cpu_seconds', 0) for s in self.stats.values())
                 
                 summary = {
                     'success': True,
-                    'duration': duration.total_seconds(),
+                    'duration': duration,
+                    'cpu_time': round(cpu_time, 3),
+                    'workers': workers if parallel else 1,
                     'files_processed': len(self.stats),
+                    'files_skipped': sum(1 for s in self.stats.values() if s['method'] == 'skipped'),
                     'total_records': sum(s['records_processed'] for s in self.stats.values()),
                     'total_affected': sum(s['records_affected'] for s in self.stats.values()),
                     'file_stats': self.stats,
@@ -315,7 +1098,7 @@ class GTFSLoader:
                     'end_time': end_time.isoformat()
                 }
                 
-                logger.info(f"GTFS load completed successfully in {duration}")
+                logger.info(f"GTFS load completed successfully in {duration:.2f}s wall, {cpu_time:.2f}s CPU")
                 logger.info(f"Total records processed: {summary['total_records']}")
                 logger.info(f"Total records affected: {summary['total_affected']}")
                 
@@ -325,25 +1108,31 @@ class GTFSLoader:
                 db.session.rollback()
                 logger.error(f"GTFS load failed: {e}")
                 raise
+            
+            finally:
+                try:
+                    self.rebuild_indexes(dropped_indexes)
+                finally:
+                    self.feed.close()
 
 
 def main():
     """CLI entry point"""
     if len(sys.argv) != 2:
-        print("Usage: python gtfs_loader.py /path/to/gtfs/files")
+        print("Usage: python gtfs_loader.py /path/to/gtfs/files|/path/to/gtfs.zip")
         sys.exit(1)
     
-    gtfs_directory = sys.argv[1]
+    gtfs_source = sys.argv[1]
     
-    if not os.path.exists(gtfs_directory):
-        print(f"Error: Directory {gtfs_directory} does not exist")
+    if not os.path.exists(gtfs_source):
+        print(f"Error: {gtfs_source} does not exist")
         sys.exit(1)
     
     # Create Flask app
     app = create_app()
     
     # Load GTFS data
-    loader = GTFSLoader(app, gtfs_directory)
+    loader = GTFSLoader(app, gtfs_source)
     
     try:
         # Ask if user wants to clear existing data
@@ -352,7 +1141,7 @@ def main():
         summary = loader.load_all(clear_existing=clear_existing)
         
         print("\n=== GTFS Load Summary ===")
-        print(f"Duration: {summary['duration']:.2f} seconds")
+        print(f"Duration: {summary['duration']:.2f} seconds ({summary['cpu_time']:.2f}s CPU)")
         print(f"Files processed: {summary['files_processed']}")
         print(f"Records processed: {summary['total_records']}")
         print(f"Records affected: {summary['total_affected']}")
@@ -8,7 +8,7 @@ from app.models import (
     GTFSAgency, GTFSStop, GTFSRoute, GTFSCalendar, GTFSCalendarDate,
     GTFSTrip, GTFSStopTime, GTFSShape, GTFSFeedInfo,
     GTFSFareMedia, GTFSRiderCategory, GTFSFareProduct, 
-    GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule
+    GTFSTimeframe, GTFSFareLegRule, GTFSFareTransferRule, GTFSLoadManifest
 )
 import os
 import click
@@ -50,20 +50,80 @@ def make_shell_context():
         'GTFSTimeframe': GTFSTimeframe,
         'GTFSFareLegRule': GTFSFareLegRule,
         'GTFSFareTransferRule': GTFSFareTransferRule,
+        'GTFSLoadManifest': GTFSLoadManifest,
     }
 
 # Add CLI command for loading GTFS data
 @app.cli.command()
-@click.argument('gtfs_directory')
+@click.argument('gtfs_source')
 @click.option('--clear', is_flag=True, help='Clear existing GTFS data first')
-def load_gtfs(gtfs_directory, clear):
-    """Load GTFS data from directory"""
-    from gtfs_loader import GTFSLoader
-    loader = GTFSLoader(app, gtfs_directory)
-    summary = loader.load_all(clear_existing=clear)
-    click.echo(f"✅ Loaded {summary['total_records']} records in {summary['duration']:.2f}s")
+@click.option('--batch-size', type=int, default=None, help='Rows per upsert batch (default 10000)')
+@click.option('--workers', type=int, default=1, help='Load independent files in parallel processes')
+@click.option('--incremental', is_flag=True, help='Skip unchanged files and apply row-level diffs to changed ones')
+@click.option('--drop-indexes', is_flag=True, help='With --clear, drop secondary indexes during the load and rebuild them after')
+def load_gtfs(gtfs_source, clear, batch_size, workers, incremental, drop_indexes):
+    """Load GTFS data from a directory or zip file"""
+    from gtfs_loader import GTFSLoader, DEFAULT_BATCH_SIZE
+    loader = GTFSLoader(app, gtfs_source, batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    summary = loader.load_all(clear_existing=clear, workers=workers, incremental=incremental,
+                              drop_indexes=drop_indexes)
+    click.echo(f"✅ Loaded {summary['total_records']} records in {summary['duration']:.2f}s "
+               f"({summary['cpu_time']:.2f}s CPU, {summary['workers']} worker(s))")
     click.echo(f"📊 Files processed: {summary['files_processed']}")
     click.echo(f"🔄 Records affected: {summary['total_affected']}")
 
+@app.cli.command('search-index')
+def search_index():
+    """Create the full-text search index and rebuild it from the database"""
+    from app.utils.search import rebuild_search_index
+    counts = rebuild_search_index()
+    click.echo(f"✅ Indexed {sum(counts.values())} records for search")
+    for kind, count in counts.items():
+        click.echo(f"   {kind}: {count}")
+
+@app.cli.command('assets-refresh')
+def assets_refresh():
+    """Make running workers rescan logo/header images (after replacing files in place)"""
+    manifest = app.extensions['asset_manifest']
+    touched = manifest.touch()
+    count = manifest.refresh()
+    click.echo(f"✅ Touched {touched} image directories; {count} assets fingerprinted")
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the agency/vendor/functional-area insight rollups from scratch"""
+    from app.utils.rollups import rebuild_rollups
+    counts = rebuild_rollups()
+    click.echo("✅ Rebuilt insight rollups: " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+
+@app.cli.command('seed')
+@click.argument('data_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--only', multiple=True, help='Load just this stage (repeatable), e.g. --only agencies')
+@click.option('--workers', type=int, default=None, help='Threads reading JSON files (default: one per file, up to CPU count)')
+@click.option('--batch-size', type=int, default=None, help='Rows per bulk INSERT (default 1000)')
+@click.option('--create-tables', is_flag=True, help='Run db.create_all() first (fresh test/staging databases)')
+def seed(data_dir, only, workers, batch_size, create_tables):
+    """Load functional areas, functions, agencies, vendors, components, standards,
+    integration points and implementations from the JSON files in DATA_DIR"""
+    from app.utils.bulk import DEFAULT_BATCH_SIZE
+    from app.utils.seed import SeedError, run_seed
+    if create_tables:
+        db.create_all()
+    try:
+        summary = run_seed(data_dir, workers=workers, batch_size=batch_size or DEFAULT_BATCH_SIZE, only=only)
+    except SeedError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"📥 Parsed {len(summary['files'])} file(s) in {summary['parse_seconds']:.2f}s "
+               f"({summary['workers']} worker(s))")
+    for filename, seconds in summary['files']:
+        click.echo(f"   {filename}: {seconds:.2f}s")
+    for stage in summary['stages']:
+        click.echo(f"   {stage.name:<20} {stage.records:>6} records: {stage.added} added, {stage.skipped} skipped, "
+                   f"{len(stage.errors)} errors; load {stage.load_seconds:.2f}s, commit {stage.commit_seconds:.2f}s")
+        for message in stage.errors:
+            click.echo(f"      ❌ {message}")
+    click.echo(f"🔄 Search index/rollups refreshed in {summary['refresh_seconds']:.2f}s")
+    click.echo(f"✅ Seed complete in {summary['duration']:.2f}s")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+GTFS Row Cleaning Benchmark
+
+Usage:
+    python scripts/bench_gtfs_cleaning.py                 # 1,000,000 stop_times rows
+    python scripts/bench_gtfs_cleaning.py --rows 250000
+
+Compares the legacy per-field cleaning path (column lookup + str(column.type)
+substring checks for every value) with the precompiled row plan used by
+GTFSLoader.read_gtfs_file. Only parsing/conversion is timed; nothing is
+written to the database.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import time as dt_time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.models import GTFSStopTime
+from app.models.gtfs import GTFSTime
+from gtfs_loader import GTFSLoader
+
+
+def write_stop_times(path, rows):
+    """Write a synthetic stop_times.txt with the given number of rows"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence',
+            'stop_headsign', 'pickup_type', 'drop_off_type', 'shape_dist_traveled', 'timepoint'
+        ])
+        stops_per_trip = 40
+        for i in range(rows):
+            trip, seq = divmod(i, stops_per_trip)
+            secs = 5 * 3600 + trip * 300 + seq * 90
+            hhmmss = f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+            writer.writerow([
+                f"T{trip}", hhmmss, hhmmss, f"S{(trip + seq) % 5000}", seq + 1,
+                '', 0, 0, f"{seq * 412.5:.1f}", 1
+            ])
+
+
+def legacy_parse_gtfs_time(time_str):
+    """Time parsing as implemented before GTFSTime seconds (hours wrapped)"""
+    if not time_str or time_str.strip() == '':
+        return None
+    try:
+        hours, minutes, seconds = (int(p) for p in time_str.strip().split(':'))
+        return dt_time(hours % 24, minutes, seconds)
+    except ValueError:
+        return None
+
+
+def legacy_clean_field_value(loader, value, field_name, model_class):
+    """Per-field cleaning as implemented before the converter table"""
+    if value == '' or value is None:
+        return None
+    column = model_class.__table__.columns.get(field_name)
+    if column is not None:
+        # Time columns were TIME before they became GTFSTime
+        column_type = 'TIME' if isinstance(column.type, GTFSTime) else str(column.type)
+        if 'INTEGER' in column_type:
+            try:
+                return int(float(value))
+            except (ValueError, TypeError):
+                return None
+        elif 'DECIMAL' in column_type or 'NUMERIC' in column_type:
+            try:
+                return Decimal(str(value))
+            except (ValueError, TypeError):
+                return None
+        elif 'FLOAT' in column_type or 'REAL' in column_type:
+            try:
+                return float(value)
+            except (ValueError, TypeError):
+                return None
+        elif 'DATE' in column_type:
+            return loader.parse_gtfs_date(str(value))
+        elif 'TIME' in column_type:
+            return legacy_parse_gtfs_time(str(value))
+    return str(value).strip()
+
+
+def run_legacy(loader, path):
+    table_columns = {col.name for col in GTFSStopTime.__table__.columns}
+    count = 0
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            record = {}
+            for key, value in row.items():
+                clean_key = key.strip().replace('\ufeff', '') if key else key
+                cleaned = legacy_clean_field_value(loader, value, clean_key, GTFSStopTime)
+                if clean_key:
+                    record[clean_key] = cleaned
+            record = {k: v for k, v in record.items() if k in table_columns}
+            count += 1
+    return count
+
+
+def run_precompiled(loader, path):
+    count = 0
+    for _ in loader.read_gtfs_file(os.path.basename(path), GTFSStopTime):
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GTFS row cleaning.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='stop_times rows to generate')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stop_times.txt')
+        print(f"📋 Generating {args.rows:,} stop_times rows...")
+        write_stop_times(path, args.rows)
+
+        loader = GTFSLoader(None, tmp)
+        results = {}
+        for label, runner in (('legacy', run_legacy), ('precompiled', run_precompiled)):
+            started = time.process_time()
+            count = runner(loader, path)
+            results[label] = time.process_time() - started
+            print(f"  {label:<12} {count:,} rows in {results[label]:.2f}s CPU "
+                  f"({count / results[label]:,.0f} rows/s)")
+
+        speedup = results['legacy'] / results['precompiled'] if results['precompiled'] else 0
+        print(f"\n✅ Speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+GTFS Loader Benchmark
+
+Usage:
+    python scripts/bench_gtfs_loader.py                                  # SQLite, default feed
+    python scripts/bench_gtfs_loader.py --trips-per-route 400 --output bench.json
+    python scripts/bench_gtfs_loader.py --postgres postgresql://localhost/gtfs_bench --workers 4
+    python scripts/bench_gtfs_loader.py --feed /path/to/feed.zip --no-sqlite --postgres "$DATABASE_URL"
+
+Generates a synthetic feed (see generate_gtfs_feed.py) unless --feed is
+given, then runs GTFSLoader.load_all(clear_existing=True) against each
+target database. Every run happens in a fresh process so peak RSS is per
+backend. Results (rows/sec, peak RSS and per-file timings) are printed
+and written to JSON for comparison across commits.
+
+The PostgreSQL database is cleared and its GTFS tables created if
+missing; point it at a scratch database. GTFS_BENCH_POSTGRES_URL is used
+when --postgres is not passed.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate_gtfs_feed import generate_feed
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_backend(database_uri, feed, batch_size, workers, repeat):
+    """Load the feed into one database; runs in its own process"""
+    import logging
+    from app import create_app, db
+    from gtfs_loader import GTFSLoader
+
+    logging.getLogger('gtfs_loader').setLevel(logging.WARNING)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri})
+    with app.app_context():
+        db.create_all()
+        dialect = db.engine.dialect.name
+
+    runs = []
+    for _ in range(repeat):
+        loader = GTFSLoader(app, feed, batch_size=batch_size)
+        summary = loader.load_all(clear_existing=True, workers=workers)
+        runs.append({
+            'duration': round(summary['duration'], 3),
+            'cpu_time': summary['cpu_time'],
+            'workers': summary['workers'],
+            'total_records': summary['total_records'],
+            'rows_per_sec': round(summary['total_records'] / summary['duration']) if summary['duration'] else 0,
+            'files': {
+                filename: {
+                    'records': stats['records_processed'],
+                    'method': stats['method'],
+                    'wall_seconds': stats.get('wall_seconds'),
+                    'cpu_seconds': stats.get('cpu_seconds'),
+                    'rows_per_sec': (round(stats['records_processed'] / stats['wall_seconds'])
+                                     if stats.get('wall_seconds') else None),
+                }
+                for filename, stats in summary['file_stats'].items()
+            },
+        })
+    best = min(runs, key=lambda r: r['duration'])
+    return {
+        'dialect': dialect,
+        'database': database_uri.split('@')[-1],
+        'best': best,
+        'runs': runs,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GTFSLoader.load_all against SQLite and PostgreSQL.")
+    parser.add_argument('--feed', help='Existing feed directory or zip (default: generate one)')
+    parser.add_argument('--stops', type=int, default=2000)
+    parser.add_argument('--routes', type=int, default=40)
+    parser.add_argument('--trips-per-route', type=int, default=100)
+    parser.add_argument('--stops-per-trip', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-sqlite', action='store_true', help='Skip the SQLite run')
+    parser.add_argument('--postgres', default=os.environ.get('GTFS_BENCH_POSTGRES_URL'),
+                        help='PostgreSQL URL of a scratch database')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=1, help='Loads per backend; the fastest is reported')
+    parser.add_argument('--output', default='gtfs_bench.json', help='JSON results file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = args.feed
+        feed_spec = {'path': feed}
+        if feed is None:
+            feed = os.path.join(tmp, 'feed')
+            print("📋 Generating synthetic feed...")
+            row_counts = generate_feed(feed, stops=args.stops, routes=args.routes,
+                                       trips_per_route=args.trips_per_route,
+                                       stops_per_trip=args.stops_per_trip, seed=args.seed)
+            feed_spec = {
+                'stops': args.stops, 'routes': args.routes, 'trips_per_route': args.trips_per_route,
+                'stops_per_trip': args.stops_per_trip, 'seed': args.seed, 'row_counts': row_counts,
+            }
+            print(f"   {sum(row_counts.values()):,} rows, {row_counts['stop_times.txt']:,} stop_times")
+
+        targets = []
+        if not args.no_sqlite:
+            targets.append(('sqlite', f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+        if args.postgres:
+            targets.append(('postgresql', args.postgres))
+        if not targets:
+            print("❌ Nothing to run: pass --postgres or drop --no-sqlite")
+            sys.exit(1)
+
+        results = {}
+        # spawn gives each backend a clean process, so peak RSS is not inherited
+        context = multiprocessing.get_context('spawn')
+        for label, uri in targets:
+            print(f"🚀 Loading into {label}...")
+            with context.Pool(1) as pool:
+                result = pool.apply(run_backend, (uri, feed, args.batch_size, args.workers, args.repeat))
+            results[label] = result
+            best = result['best']
+            print(f"   {best['total_records']:,} rows in {best['duration']:.2f}s "
+                  f"({best['rows_per_sec']:,} rows/s, {best['cpu_time']:.2f}s CPU, "
+                  f"peak RSS {result['peak_rss_mb']:.0f} MB)")
+            for filename, stats in best['files'].items():
+                if stats['wall_seconds']:
+                    print(f"     {filename:<26} {stats['records']:>10,} rows {stats['wall_seconds']:>8.2f}s "
+                          f"[{stats['method']}]")
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'feed': feed_spec,
+        'batch_size': args.batch_size,
+        'workers': args.workers,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
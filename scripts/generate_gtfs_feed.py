@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Synthetic GTFS Feed Generator
+
+Usage:
+    python scripts/generate_gtfs_feed.py /tmp/feed                       # default scale
+    python scripts/generate_gtfs_feed.py /tmp/feed.zip --zip --trips-per-route 400
+    python scripts/generate_gtfs_feed.py /tmp/feed --stops 20000 --routes 300 --stops-per-trip 60
+
+Writes a complete, referentially valid feed (agency, stops, routes,
+calendar, calendar_dates, shapes, trips, stop_times, feed_info and the
+fares v2 files) that GTFSLoader can load as-is. Output is fully determined
+by the scale options and --seed, so benchmark runs are comparable.
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import zipfile
+from datetime import date
+from typing import Dict, Iterable, List, Sequence
+
+# Roughly Portland, OR; stops are scattered on a ~30km square around it
+CENTER_LAT = 45.52
+CENTER_LON = -122.68
+SPAN_DEGREES = 0.27
+
+SERVICE_IDS = ['WKDY', 'SAT', 'SUN']
+FIRST_DEPARTURE = 5 * 3600
+# Trips keep starting until 25:00:00 so late service crosses midnight
+LAST_DEPARTURE = 25 * 3600
+
+
+def format_time(seconds: int) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    return f"{hours:02d}:{remainder // 60:02d}:{remainder % 60:02d}"
+
+
+class FeedWriter:
+    """Write feed files into a directory or a single zip archive"""
+
+    def __init__(self, target: str, as_zip: bool = False):
+        self.target = target
+        self.archive = zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) if as_zip else None
+        if self.archive is None:
+            os.makedirs(target, exist_ok=True)
+        self.row_counts: Dict[str, int] = {}
+
+    def write(self, filename: str, header: Sequence[str], rows: Iterable[Sequence]) -> None:
+        if self.archive is not None:
+            with self.archive.open(filename, 'w') as raw:
+                with io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+                    self.row_counts[filename] = self._write_rows(f, header, rows)
+        else:
+            with open(os.path.join(self.target, filename), 'w', encoding='utf-8', newline='') as f:
+                self.row_counts[filename] = self._write_rows(f, header, rows)
+
+    @staticmethod
+    def _write_rows(f, header: Sequence[str], rows: Iterable[Sequence]) -> int:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.archive.close()
+
+
+def generate_feed(target: str, stops: int = 2000, routes: int = 40, trips_per_route: int = 100,
+                  stops_per_trip: int = 30, seed: int = 0, fares: bool = True,
+                  as_zip: bool = False) -> Dict[str, int]:
+    """Write a synthetic feed and return {filename: data rows written}"""
+    if stops < 2 or routes < 1 or trips_per_route < 1 or stops_per_trip < 2:
+        raise ValueError("Feed needs at least 2 stops, 1 route, 1 trip per route and 2 stops per trip")
+    stops_per_trip = min(stops_per_trip, stops)
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    end = date(2025, 12, 31)
+
+    writer = FeedWriter(target, as_zip=as_zip)
+    try:
+        writer.write('agency.txt',
+                     ['agency_id', 'agency_name', 'agency_url', 'agency_timezone', 'agency_lang', 'agency_phone'],
+                     [['SYN', 'Synthetic Transit', 'https://transit.example', 'America/Los_Angeles', 'en', '555-0100']])
+
+        stop_points = [
+            (CENTER_LAT + (rng.random() - 0.5) * SPAN_DEGREES,
+             CENTER_LON + (rng.random() - 0.5) * SPAN_DEGREES)
+            for _ in range(stops)
+        ]
+        writer.write('stops.txt',
+                     ['stop_id', 'stop_code', 'stop_name', 'stop_lat', 'stop_lon', 'zone_id', 'wheelchair_boarding'],
+                     ([f"S{i}", str(10000 + i), f"Stop {i}", f"{lat:.6f}", f"{lon:.6f}", f"Z{i % 3}", i % 2]
+                      for i, (lat, lon) in enumerate(stop_points)))
+
+        # Each route serves a fixed pattern of stops, reversed for direction 1
+        patterns: List[List[int]] = [rng.sample(range(stops), stops_per_trip) for _ in range(routes)]
+        writer.write('routes.txt',
+                     ['route_id', 'agency_id', 'route_short_name', 'route_long_name', 'route_type',
+                      'route_color', 'route_text_color', 'route_sort_order', 'network_id'],
+                     ([f"R{r}", 'SYN', str(r + 1), f"Route {r + 1}", 3 if r % 5 else 0,
+                       f"{rng.randrange(0x1000000):06X}", 'FFFFFF', r, 'bus' if r % 5 else 'rail']
+                      for r in range(routes)))
+
+        writer.write('calendar.txt',
+                     ['service_id', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday',
+                      'saturday', 'sunday', 'start_date', 'end_date'],
+                     [['WKDY', 1, 1, 1, 1, 1, 0, 0, f"{start:%Y%m%d}", f"{end:%Y%m%d}"],
+                      ['SAT', 0, 0, 0, 0, 0, 1, 0, f"{start:%Y%m%d}", f"{end:%Y%m%d}"],
+                      ['SUN', 0, 0, 0, 0, 0, 0, 1, f"{start:%Y%m%d}", f"{end:%Y%m%d}"]])
+
+        holidays = [date(2025, 1, 1), date(2025, 5, 26), date(2025, 7, 4), date(2025, 9, 1),
+                    date(2025, 11, 27), date(2025, 12, 25)]
+        writer.write('calendar_dates.txt', ['service_id', 'date', 'exception_type'],
+                     ([service_id, f"{day:%Y%m%d}", exception_type]
+                      for day in holidays
+                      for service_id, exception_type in (('WKDY', 2), ('SUN', 1))))
+
+        def shape_rows():
+            for r, pattern in enumerate(patterns):
+                for direction in (0, 1):
+                    ordered = pattern if direction == 0 else pattern[::-1]
+                    for seq, stop_index in enumerate(ordered):
+                        lat, lon = stop_points[stop_index]
+                        yield [f"SH{r}_{direction}", f"{lat:.6f}", f"{lon:.6f}", seq + 1, f"{seq * 400.0:.1f}"]
+        writer.write('shapes.txt',
+                     ['shape_id', 'shape_pt_lat', 'shape_pt_lon', 'shape_pt_sequence', 'shape_dist_traveled'],
+                     shape_rows())
+
+        headway = max(60, (LAST_DEPARTURE - FIRST_DEPARTURE) // trips_per_route)
+        trip_plan = []
+        for r in range(routes):
+            offset = rng.randrange(headway)
+            for t in range(trips_per_route):
+                direction = t % 2
+                trip_plan.append((f"T{r}_{t}", r, SERVICE_IDS[t % len(SERVICE_IDS)], direction,
+                                  FIRST_DEPARTURE + offset + t * headway))
+
+        writer.write('trips.txt',
+                     ['route_id', 'service_id', 'trip_id', 'trip_headsign', 'direction_id', 'block_id',
+                      'shape_id', 'wheelchair_accessible', 'bikes_allowed'],
+                     ([f"R{r}", service_id, trip_id, f"Route {r + 1} {'Outbound' if direction == 0 else 'Inbound'}",
+                       direction, f"B{r}_{i // 8}", f"SH{r}_{direction}", 1, i % 2]
+                      for i, (trip_id, r, service_id, direction, _) in enumerate(trip_plan)))
+
+        def stop_time_rows():
+            for trip_id, r, _, direction, departure in trip_plan:
+                pattern = patterns[r] if direction == 0 else patterns[r][::-1]
+                clock = departure
+                for seq, stop_index in enumerate(pattern):
+                    dwell = 30 if seq % 4 == 0 else 0
+                    yield [trip_id, format_time(clock), format_time(clock + dwell), f"S{stop_index}", seq + 1,
+                           '', 0, 0, f"{seq * 400.0:.1f}", 1 if seq % 4 == 0 else 0]
+                    clock += dwell + 60 + rng.randrange(120)
+        writer.write('stop_times.txt',
+                     ['trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence',
+                      'stop_headsign', 'pickup_type', 'drop_off_type', 'shape_dist_traveled', 'timepoint'],
+                     stop_time_rows())
+
+        writer.write('feed_info.txt',
+                     ['feed_publisher_name', 'feed_publisher_url', 'feed_lang', 'feed_start_date',
+                      'feed_end_date', 'feed_version'],
+                     [['Synthetic Transit', 'https://transit.example', 'en', f"{start:%Y%m%d}",
+                       f"{end:%Y%m%d}", f"seed-{seed}"]])
+
+        if fares:
+            write_fares(writer)
+    finally:
+        writer.close()
+    return writer.row_counts
+
+
+def write_fares(writer: FeedWriter) -> None:
+    """Fares v2: media, rider categories, products, timeframes and leg/transfer rules"""
+    writer.write('fare_media.txt', ['fare_media_id', 'fare_media_name', 'fare_media_type'],
+                 [['cash', 'Cash', 0], ['paper', 'Paper ticket', 1], ['card', 'Transit card', 2],
+                  ['app', 'Mobile app', 4]])
+    writer.write('rider_categories.txt',
+                 ['rider_category_id', 'rider_category_name', 'is_default_fare_category', 'min_age', 'max_age'],
+                 [['adult', 'Adult', 1, 18, 64], ['youth', 'Youth', 0, 7, 17], ['senior', 'Honored citizen', 0, 65, '']])
+
+    prices = {'adult': 2.80, 'youth': 1.40, 'senior': 1.40}
+    products = []
+    for category, price in prices.items():
+        for media in ('cash', 'paper', 'card', 'app'):
+            products.append([f"single_{category}_{media}", f"Single ride ({category}, {media})",
+                             category, media, f"{price:.2f}", 'USD'])
+            products.append([f"day_{category}_{media}", f"Day pass ({category}, {media})",
+                             category, media, f"{price * 2:.2f}", 'USD'])
+    writer.write('fare_products.txt',
+                 ['fare_product_id', 'fare_product_name', 'rider_category_id', 'fare_media_id', 'amount', 'currency'],
+                 products)
+
+    writer.write('timeframes.txt', ['timeframe_group_id', 'start_time', 'end_time', 'service_id'],
+                 [['peak', '06:00:00', '09:00:00', 'WKDY'], ['peak', '16:00:00', '19:00:00', 'WKDY'],
+                  ['offpeak', '09:00:00', '16:00:00', 'WKDY'], ['offpeak', '19:00:00', '24:00:00', 'WKDY'],
+                  ['offpeak', '00:00:00', '24:00:00', 'SAT'], ['offpeak', '00:00:00', '24:00:00', 'SUN']])
+
+    writer.write('fare_leg_rules.txt',
+                 ['leg_group_id', 'network_id', 'fare_product_id', 'from_timeframe_group_id', 'to_timeframe_group_id'],
+                 ([f"{network}_{timeframe}", network, product[0], timeframe, timeframe]
+                  for network in ('bus', 'rail')
+                  for timeframe in ('peak', 'offpeak')
+                  for product in products if product[0].startswith('single_')))
+
+    writer.write('fare_transfer_rules.txt',
+                 ['from_leg_group_id', 'to_leg_group_id', 'fare_product_id', 'transfer_count',
+                  'duration_limit', 'duration_limit_type', 'fare_transfer_type'],
+                 ([f"{a}_{tf}", f"{b}_{tf}", '', 1, 9000, 0, 0]
+                  for tf in ('peak', 'offpeak')
+                  for a in ('bus', 'rail')
+                  for b in ('bus', 'rail')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic GTFS feed.")
+    parser.add_argument('target', help='Output directory (or .zip path with --zip)')
+    parser.add_argument('--stops', type=int, default=2000)
+    parser.add_argument('--routes', type=int, default=40)
+    parser.add_argument('--trips-per-route', type=int, default=100)
+    parser.add_argument('--stops-per-trip', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-fares', action='store_true', help='Skip the fares v2 files')
+    parser.add_argument('--zip', action='store_true', help='Write a single zip archive')
+    args = parser.parse_args()
+
+    try:
+        counts = generate_feed(args.target, stops=args.stops, routes=args.routes,
+                               trips_per_route=args.trips_per_route, stops_per_trip=args.stops_per_trip,
+                               seed=args.seed, fares=not args.no_fares, as_zip=args.zip)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for filename, count in counts.items():
+        print(f"  {filename:<26} {count:>10,} rows")
+    print(f"✅ Wrote {sum(counts.values()):,} rows to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
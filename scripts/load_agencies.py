@@ -17,10 +17,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
 from app.models.tran import Agency
-
-def normalize_name(name):
-    """Case-insensitive name normalization"""
-    return name.strip().lower()
+from app.utils.bulk import BulkLoader, model_values
 
 def clear_data():
     """Deletes all agencies"""
@@ -50,38 +47,19 @@ def load_agencies_from_file(filename, replace_mode=False):
         'skipped': 0
     }
 
-    existing = {
-        normalize_name(agency.name): agency for agency in Agency.query.all()
-    }
+    loader = BulkLoader()
 
     for agency_data in data.get("agencies", []):
-        norm = normalize_name(agency_data["name"])
-        if norm in existing:
+        if not loader.add(Agency, model_values(Agency, agency_data)):
             print(f"⚠️  Skipping existing agency: {agency_data['name']}")
             stats['skipped'] += 1
             continue
 
-        # All fields present in your Agency model
-        agency = Agency(
-            name=agency_data['name'],
-            location=agency_data.get('location'),
-            description=agency_data.get('description'),
-            website=agency_data.get('website'),
-            ceo=agency_data.get('ceo'),
-            address_hq=agency_data.get('address_hq'),
-            phone_number=agency_data.get('phone_number'),
-            transit_map_link=agency_data.get('transit_map_link'),
-            contact_email=agency_data.get('contact_email'),
-            contact_phone=agency_data.get('contact_phone'),
-            contact_name=agency_data.get('contact_name'),
-            additional_metadata=agency_data.get('additional_metadata')
-        )
-        db.session.add(agency)
         stats['added'] += 1
-        print(f"➕ Added agency: {agency.name}")
+        print(f"➕ Added agency: {agency_data['name']}")
 
     try:
-        db.session.commit()
+        loader.finish()
         print("\n✅ Agencies loaded successfully!")
         print("📊 Summary:")
         print(f"   Added: {stats['added']}")
@@ -10,11 +10,11 @@ import json
 import os
 import sys
 import argparse
-from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
-from app.models.tran import Component, Vendor
+from app.models.tran import Component
+from app.utils.bulk import BulkLoader, model_values
 
 def load_components_from_file(filename):
     """Load components from JSON file"""
@@ -28,52 +28,22 @@ def load_components_from_file(filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
+        loader = BulkLoader()
         stats = {'added': 0, 'skipped': 0}
         
         for comp_data in data.get('components', []):
-            # Check if component already exists
-            existing = Component.query.filter_by(name=comp_data['name']).first()
-            if existing:
+            # Vendors, versions and dates now live on products/configurations;
+            # model_values keeps only the Component columns of each record
+            if not loader.add(Component, model_values(Component, comp_data)):
                 print(f"  ⚠️  Component '{comp_data['name']}' already exists, skipping")
                 stats['skipped'] += 1
                 continue
             
-            # Find vendor
-            vendor = None
-            if comp_data.get('vendor'):
-                vendor = Vendor.query.filter_by(name=comp_data['vendor']).first()
-                if not vendor:
-                    print(f"    ❌ Vendor not found: {comp_data['vendor']}")
-                    continue
-            
-            # Parse deployment date
-            deployment_date = None
-            if comp_data.get('deployment_date'):
-                try:
-                    deployment_date = datetime.strptime(comp_data['deployment_date'], '%Y-%m-%d').date()
-                except ValueError:
-                    print(f"    ⚠️  Invalid date format for {comp_data['name']}: {comp_data['deployment_date']}")
-            
-            # Create component
-            component = Component(
-                name=comp_data['name'],
-                description=comp_data.get('description'),
-                version=comp_data.get('version'),
-                deployment_date=deployment_date,
-                update_frequency=comp_data.get('update_frequency'),
-                known_issues=comp_data.get('known_issues'),
-                is_composite=comp_data.get('is_composite', False),
-                vendor_id=vendor.id if vendor else None,
-                additional_metadata=comp_data.get('additional_metadata')
-            )
-            
-            db.session.add(component)
             stats['added'] += 1
-            vendor_name = vendor.name if vendor else "No Vendor"
-            print(f"  ➕ Added component: {component.name} ({vendor_name})")
+            print(f"  ➕ Added component: {comp_data['name']}")
         
         try:
-            db.session.commit()
+            loader.finish()
             print(f"\n✅ Components loaded successfully!")
             print(f"📊 Summary:")
             print(f"   Added: {stats['added']}")
@@ -10,10 +10,10 @@ Usage:
 
 Features:
     - Loads vendors and components from a JSON file containing "vendors" and/or "components" keys.
-    - Links each component to its vendors and function (by name; creates function if missing).
+    - Links each component to its function (by name; reported and skipped if the function does not exist).
     - Idempotent: running multiple times will not duplicate data.
     - Can be used with files containing only vendors, only components, or both.
-    - Parent/child relationships for components are automatically established.
+    - Names are resolved against indexes preloaded once per model; new rows are bulk inserted.
 
 Expected file structure:
 {
@@ -22,133 +22,46 @@ Expected file structure:
 }
 
 Notes:
-    - To add or update related functions, ensure functions exist or allow the script to create them (with default properties).
+    - Load functional areas and functions first; a function needs its functional area, so none are created here.
+    - Fields that are no longer model columns (component vendors, versions, parent/child links) are ignored.
     - If using --replace or --clear, all existing components and vendors will be deleted first.
 """
 import json
 import os
-from datetime import datetime
-from app import create_app, db
-from app.models.tran import Vendor, Component, Function, Criticality
+from app import create_app
+from app.models.tran import Vendor, Component, Function, function_component
+from app.utils.bulk import BulkLoader, Ref, model_values
 
-def load_vendors(vendors_data):
+def load_vendors(loader, vendors_data):
     """
-    Load vendors from a list of dicts.
-    Returns dict mapping vendor JSON id to Vendor object.
+    Queue vendors from a list of dicts (existing names are skipped).
     """
     print(f"Processing {len(vendors_data)} vendors...")
-    id_map = {}
     for v in vendors_data:
-        vendor = Vendor.query.filter_by(name=v['name']).first()
-        if vendor:
-            print(f"  Vendor '{v['name']}' already exists.")
+        if loader.add(Vendor, model_values(Vendor, v)):
+            print(f"  Added vendor: {v['name']}")
         else:
-            vendor = Vendor(
-                name=v['name'],
-                website=v.get('website'),
-                vendor_email=v.get('vendor_email'),
-                vendor_phone=v.get('vendor_phone'),
-                contact_name=v.get('contact_name'),
-                contact_email=v.get('contact_email'),
-                contact_phone=v.get('contact_phone'),
-                description=v.get('description'),
-            )
-            db.session.add(vendor)
-            print(f"  Added vendor: {vendor.name}")
-            db.session.flush()  # So we get the .id right away
-        id_map[v['id']] = vendor
-    db.session.commit()
-    return id_map
-
-def get_or_create_function(function_name):
-    """
-    Find a Function by name or create it (with default description and medium criticality).
-    """
-    if not function_name:
-        return None
-    function = Function.query.filter_by(name=function_name).first()
-    if function:
-        return function
-    function = Function(
-        name=function_name,
-        description="Auto-added by loader.",
-        criticality=Criticality.medium,
-        functional_area_id=None  # Adjust if you want to auto-assign
-    )
-    db.session.add(function)
-    db.session.flush()
-    print(f"    Created function: {function_name}")
-    return function
+            print(f"  Vendor '{v['name']}' already exists.")
 
-def load_components(components_data, vendor_id_map):
+def load_components(loader, components_data):
     """
-    Load components and set up parent/child relationships and function links.
+    Queue components and their function links.
     """
     print(f"Processing {len(components_data)} components...")
-    id_map = {}
-    # Pass 1: Add all components (without parent/child links)
     for c in components_data:
-        component = Component.query.filter_by(name=c['name']).first()
-        if component:
+        if not loader.add(Component, model_values(Component, c)):
             print(f"  Component '{c['name']}' already exists.")
-            id_map[c['id']] = component
             continue
-
-        # Pick first vendor in list (adjust if you want multi-vendor support)
-        vendor = None
-        vendor_ids = c.get('vendors') or []
-        for v_id in vendor_ids:
-            vendor = vendor_id_map.get(v_id)
-            if vendor:
-                break
-        # Parse deployment_date (accept "YYYY-MM-DD" or just "YYYY")
-        deployment_date = None
-        if c.get('deployment_date'):
-            dt = c['deployment_date']
-            try:
-                deployment_date = datetime.strptime(dt, '%Y-%m-%d').date()
-            except Exception:
-                try:
-                    deployment_date = datetime.strptime(dt, '%Y').date()
-                except Exception:
-                    deployment_date = None
-
-        component = Component(
-            name=c['name'],
-            description=c.get('description'),
-            version=c.get('version'),
-            deployment_date=deployment_date,
-            update_frequency=c.get('update_frequency'),
-            known_issues=c.get('known_issues'),
-            is_composite=c.get('is_composite', False),
-            vendor_id=vendor.id if vendor else None,
-            additional_metadata=c.get('additional_metadata'),
-        )
-        db.session.add(component)
-        db.session.flush()  # Ensure .id is available for linking
+        print(f"  Added component: {c['name']}")
 
         # Function linkage (single function)
         function_name = c.get('function_name')
         if function_name:
-            function = get_or_create_function(function_name)
-            if function and function not in component.functions:
-                component.functions.append(function)
-                print(f"    Linked function '{function.name}' to component '{component.name}'")
-
-        id_map[c['id']] = component
-        print(f"  Added component: {component.name}")
-
-    db.session.commit()
-
-    # Pass 2: Handle parent/child (child_components)
-    for c in components_data:
-        parent = id_map.get(c['id'])
-        for child_id in c.get('child_components', []):
-            child = id_map.get(child_id)
-            if child:
-                child.parent_component_id = parent.id
-                print(f"    Linked child '{child.name}' to parent '{parent.name}'")
-    db.session.commit()
+            if loader.exists(Function, function_name):
+                loader.link(function_component, Ref(Function, function_name), Ref(Component, c['name']))
+                print(f"    Linked function '{function_name}' to component '{c['name']}'")
+            else:
+                print(f"    Function not found: {function_name}")
 
 def load_from_json(json_file_path):
     """
@@ -157,19 +70,10 @@ def load_from_json(json_file_path):
     with open(json_file_path, 'r') as f:
         data = json.load(f)
 
-    vendors_data = data.get('vendors', [])
-    components_data = data.get('components', [])
-
-    # Load vendors first, get vendor id map
-    vendor_id_map = {}
-    if vendors_data:
-        vendor_id_map = load_vendors(vendors_data)
-    else:
-        # If vendors weren't provided, build id map from DB
-        vendor_id_map = {v.id: v for v in Vendor.query.all()}
-
-    if components_data:
-        load_components(components_data, vendor_id_map)
+    loader = BulkLoader()
+    load_vendors(loader, data.get('vendors', []))
+    load_components(loader, data.get('components', []))
+    loader.finish()
 
 def main():
     import sys
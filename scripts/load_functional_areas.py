@@ -14,6 +14,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
 from app.models.tran import FunctionalArea
+from app.utils.bulk import BulkLoader, model_values
 
 def load_functional_areas_from_file(filename):
     """Load functional areas from JSON file"""
@@ -27,28 +28,21 @@ def load_functional_areas_from_file(filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
+        loader = BulkLoader()
         stats = {'added': 0, 'skipped': 0}
         
         for fa_data in data.get('functional_areas', []):
-            # Check if functional area already exists
-            existing = FunctionalArea.query.filter_by(name=fa_data['name']).first()
-            if existing:
+            # Existing names come from one preloaded index, new rows are inserted in bulk
+            if not loader.add(FunctionalArea, model_values(FunctionalArea, fa_data)):
                 print(f"  ⚠️  Functional Area '{fa_data['name']}' already exists, skipping")
                 stats['skipped'] += 1
                 continue
             
-            # Create functional area
-            functional_area = FunctionalArea(
-                name=fa_data['name'],
-                description=fa_data.get('description')
-            )
-            
-            db.session.add(functional_area)
             stats['added'] += 1
-            print(f"  ➕ Added functional area: {functional_area.name}")
+            print(f"  ➕ Added functional area: {fa_data['name']}")
         
         try:
-            db.session.commit()
+            loader.finish()
             print(f"\n✅ Functional areas loaded successfully!")
             print(f"📊 Summary:")
             print(f"   Added: {stats['added']}")
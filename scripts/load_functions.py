@@ -14,6 +14,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
 from app.models.tran import FunctionalArea, Function, Criticality
+from app.utils.bulk import BulkLoader, Ref
 
 def load_functions_from_file(filename):
     """Load functions from JSON file"""
@@ -27,22 +28,18 @@ def load_functions_from_file(filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
+        loader = BulkLoader()
         stats = {'added': 0, 'skipped': 0}
         
         for func_data in data.get('functions', []):
-            # Check if function already exists
-            existing = Function.query.filter_by(name=func_data['name']).first()
-            if existing:
+            # Check if function already exists (preloaded name index)
+            if loader.exists(Function, func_data['name']):
                 print(f"  ⚠️  Function '{func_data['name']}' already exists, skipping")
                 stats['skipped'] += 1
                 continue
             
             # Find the functional area
-            functional_area = FunctionalArea.query.filter_by(
-                name=func_data['functional_area']
-            ).first()
-            
-            if not functional_area:
+            if not loader.exists(FunctionalArea, func_data['functional_area']):
                 print(f"  ❌ Functional area '{func_data['functional_area']}' not found for function '{func_data['name']}'")
                 continue
             
@@ -50,19 +47,17 @@ def load_functions_from_file(filename):
             criticality = getattr(Criticality, func_data.get('criticality', 'medium'))
             
             # Create function
-            function = Function(
-                name=func_data['name'],
-                description=func_data.get('description'),
-                criticality=criticality,
-                functional_area_id=functional_area.id
-            )
-            
-            db.session.add(function)
+            loader.add(Function, {
+                'name': func_data['name'],
+                'description': func_data.get('description'),
+                'criticality': criticality,
+                'functional_area_id': Ref(FunctionalArea, func_data['functional_area']),
+            })
             stats['added'] += 1
-            print(f"  ➕ Added function: {function.name} → {functional_area.name}")
+            print(f"  ➕ Added function: {func_data['name']} → {func_data['functional_area']}")
         
         try:
-            db.session.commit()
+            loader.finish()
             print(f"\n✅ Functions loaded successfully!")
             print(f"📊 Summary:")
             print(f"   Added: {stats['added']}")
@@ -14,7 +14,10 @@ from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
-from app.models.tran import Agency, Function, Component, AgencyFunctionImplementation
+from app.models.tran import Agency, Function, Component, Configuration
+from app.utils.bulk import BulkLoader
+
+CONFIGURATION_KEY = ('agency_id', 'function_id', 'component_id')
 
 def load_implementations_from_file(filename):
     """Load agency function implementations from JSON file"""
@@ -28,41 +31,30 @@ def load_implementations_from_file(filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
+        loader = BulkLoader()
         stats = {'added': 0, 'skipped': 0, 'errors': 0}
         
         for impl_data in data.get('implementations', []):
-            # Find agency
-            agency = Agency.query.filter_by(name=impl_data['agency']).first()
-            if not agency:
+            # Agency, component and function ids all come from preloaded name indexes
+            agency_id = loader.id_of(Agency, impl_data['agency'])
+            if agency_id is None:
                 print(f"    ❌ Agency not found: {impl_data['agency']}")
                 stats['errors'] += 1
                 continue
             
-            # Find component
-            component = Component.query.filter_by(name=impl_data['component']).first()
-            if not component:
+            component_id = loader.id_of(Component, impl_data['component'])
+            if component_id is None:
                 print(f"    ❌ Component not found: {impl_data['component']}")
                 stats['errors'] += 1
                 continue
             
-            # Find function
-            function = Function.query.filter_by(name=impl_data['function']).first()
-            if not function:
+            function_id = loader.id_of(Function, impl_data['function'])
+            if function_id is None:
                 print(f"    ❌ Function not found: {impl_data['function']}")
                 stats['errors'] += 1
                 continue
             
-            # Check if implementation already exists
-            existing = AgencyFunctionImplementation.query.filter_by(
-                agency_id=agency.id,
-                function_id=function.id,
-                component_id=component.id
-            ).first()
-            
-            if existing:
-                print(f"    ⚠️  Implementation already exists: {agency.name} → {function.name} → {component.name}")
-                stats['skipped'] += 1
-                continue
+            label = f"{impl_data['agency']} → {impl_data['function']} → {impl_data['component']}"
             
             # Parse deployment date
             deployment_date = None
@@ -72,31 +64,33 @@ def load_implementations_from_file(filename):
                 except ValueError:
                     print(f"    ⚠️  Invalid date format: {impl_data['deployment_date']}")
             
-            # Create implementation
-            implementation = AgencyFunctionImplementation(
-                agency_id=agency.id,
-                function_id=function.id,
-                component_id=component.id,
-                deployment_date=deployment_date,
-                version=impl_data.get('version'),
-                status=impl_data.get('status', 'Active'),
-                deployment_notes=impl_data.get('deployment_notes'),
-                implementation_notes=impl_data.get('implementation_notes'),
-                additional_metadata=impl_data.get('additional_metadata')
-            )
+            # Implementations are stored as configurations (one per agency/function/component)
+            configuration = {
+                'agency_id': agency_id,
+                'function_id': function_id,
+                'component_id': component_id,
+                'deployment_date': deployment_date,
+                'version_label': impl_data.get('version'),
+                'status': impl_data.get('status', 'Active'),
+                'implementation_notes': impl_data.get('implementation_notes') or impl_data.get('deployment_notes'),
+                'additional_metadata': impl_data.get('additional_metadata'),
+            }
+            if not loader.add(Configuration, configuration, key=CONFIGURATION_KEY):
+                print(f"    ⚠️  Implementation already exists: {label}")
+                stats['skipped'] += 1
+                continue
             
-            db.session.add(implementation)
             stats['added'] += 1
-            print(f"  ➕ Added implementation: {agency.name} → {function.name} → {component.name}")
+            print(f"  ➕ Added implementation: {label}")
         
         try:
-            db.session.commit()
+            loader.finish()
             print(f"\n✅ Agency implementations loaded successfully!")
             print(f"📊 Summary:")
             print(f"   Added: {stats['added']}")
             print(f"   Skipped: {stats['skipped']}")
             print(f"   Errors: {stats['errors']}")
-            print(f"   Total Implementations: {AgencyFunctionImplementation.query.count()}")
+            print(f"   Total Implementations: {Configuration.query.count()}")
             return True
         except Exception as e:
             db.session.rollback()
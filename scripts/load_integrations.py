@@ -38,10 +38,10 @@ import argparse
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
-from app.models.tran import IntegrationPoint, Standard, Tag, TagGroup
+from app.models.tran import IntegrationPoint, Standard, Tag, TagGroup, integration_standard, integration_tag
+from app.utils.bulk import BulkLoader, Ref
 
-def normalize_name(name):
-    return name.strip().lower()
+TAG_GROUP_NAME = "Integration Tags"
 
 def clear_data():
     """Deletes all integration points"""
@@ -50,36 +50,24 @@ def clear_data():
     db.session.commit()
     print("✅ All integration points deleted.")
 
-def get_or_create_standard(standard_data):
-    """Fetch an existing standard or create a new one"""
-    name = standard_data['name']
-    standard = Standard.query.filter_by(name=name).first()
-    if not standard:
-        standard = Standard(
-            name=name,
-            description=standard_data.get('description'),
-            standard_url=standard_data.get('website'),
-            version=None
-        )
-        db.session.add(standard)
-    return standard
-
-def get_or_create_tag(tag_name):
-    tag = Tag.query.filter_by(name=tag_name).first()
-    if tag:
-        return tag
+def get_or_create_standard(loader, standard_data):
+    """Reference an existing standard or queue a new one"""
+    return loader.get_or_create(
+        Standard,
+        standard_data['name'],
+        description=standard_data.get('description'),
+        standard_url=standard_data.get('website'),
+        version=None
+    )
+
+def get_or_create_tag(loader, tag_name):
+    """Reference an existing tag or queue a new one in the default integration tag group"""
+    if loader.exists(Tag, tag_name):
+        return Ref(Tag, tag_name)
 
     # Ensure default tag group exists
-    group_name = "Integration Tags"
-    tag_group = TagGroup.query.filter_by(name=group_name).first()
-    if not tag_group:
-        tag_group = TagGroup(name=group_name, description="Tags related to integration points")
-        db.session.add(tag_group)
-        db.session.flush()  # get ID before using in Tag
-
-    tag = Tag(name=tag_name, tag_group=tag_group)
-    db.session.add(tag)
-    return tag
+    group = loader.get_or_create(TagGroup, TAG_GROUP_NAME, description="Tags related to integration points")
+    return loader.get_or_create(Tag, tag_name, description=None, color=None, tag_group_id=group)
 
 def load_integration_points_from_file(filename, replace_mode=False):
     if replace_mode:
@@ -102,34 +90,27 @@ def load_integration_points_from_file(filename, replace_mode=False):
         'skipped': 0
     }
 
-    existing = {
-        normalize_name(ip.name): ip for ip in IntegrationPoint.query.all()
-    }
+    loader = BulkLoader()
 
     for ip_data in data.get("integration_points", []):
-        norm = normalize_name(ip_data["name"])
-        if norm in existing:
+        ip = {'name': ip_data["name"], 'description': ip_data.get("description")}
+        if not loader.add(IntegrationPoint, ip):
             print(f"⚠️  Skipping existing integration point: {ip_data['name']}")
             stats['skipped'] += 1
             continue
 
-        ip = IntegrationPoint(
-            name=ip_data["name"],
-            description=ip_data.get("description")
-        )
-
+        ip_ref = Ref(IntegrationPoint, ip_data["name"])
         for std in ip_data.get("standards", []):
-            ip.standards.append(get_or_create_standard(std))
+            loader.link(integration_standard, ip_ref, get_or_create_standard(loader, std))
 
         for tag_name in ip_data.get("tags", []):
-            ip.tags.append(get_or_create_tag(tag_name))
+            loader.link(integration_tag, ip_ref, get_or_create_tag(loader, tag_name))
 
-        db.session.add(ip)
         stats['added'] += 1
-        print(f"➕ Added integration point: {ip.name}")
+        print(f"➕ Added integration point: {ip_data['name']}")
 
     try:
-        db.session.commit()
+        loader.finish()
         print("\n✅ Integration points loaded successfully!")
         print("📊 Summary:")
         print(f"   Added: {stats['added']}")
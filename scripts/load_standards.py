@@ -19,10 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
 from app.models.tran import Standard
-
-def normalize_name(name):
-    """Normalize names for case-insensitive comparison."""
-    return name.strip().lower()
+from app.utils.bulk import BulkLoader
 
 def clear_standard_data():
     """Clear all standards from the database."""
@@ -53,29 +50,25 @@ def load_standards_from_file(filename, replace_mode=False):
         'standards_skipped': 0
     }
 
-    existing_names = {
-        normalize_name(s.name): s for s in Standard.query.all()
-    }
+    loader = BulkLoader()
 
     for item in data.get('standards', []):
-        norm = normalize_name(item['name'])
-        if norm in existing_names:
+        standard = {
+            'name': item['name'],
+            'version': item.get('version'),
+            'description': item.get('description'),
+            'standard_url': item.get('standard_url'),
+        }
+        if not loader.add(Standard, standard):
             print(f"⚠️  Skipping existing standard: {item['name']}")
             stats['standards_skipped'] += 1
             continue
 
-        standard = Standard(
-            name=item['name'],
-            version=item.get('version'),
-            description=item.get('description'),
-            standard_url=item.get('standard_url')
-        )
-        db.session.add(standard)
         stats['standards_added'] += 1
-        print(f"➕ Added standard: {standard.name}")
+        print(f"➕ Added standard: {item['name']}")
 
     try:
-        db.session.commit()
+        loader.finish()
         print("\n✅ Standards loaded successfully!")
         print("📊 Summary:")
         print(f"   Standards Added: {stats['standards_added']}")
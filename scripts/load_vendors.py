@@ -14,6 +14,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import create_app, db
 from app.models.tran import Vendor
+from app.utils.bulk import BulkLoader, model_values
 
 def load_vendors_from_file(filename):
     """Load vendors from JSON file"""
@@ -27,34 +28,21 @@ def load_vendors_from_file(filename):
         with open(filename, 'r') as f:
             data = json.load(f)
         
+        loader = BulkLoader()
         stats = {'added': 0, 'skipped': 0}
         
         for vendor_data in data.get('vendors', []):
-            # Check if vendor already exists
-            existing = Vendor.query.filter_by(name=vendor_data['name']).first()
-            if existing:
+            # Existing names come from one preloaded index, new rows are inserted in bulk
+            if not loader.add(Vendor, model_values(Vendor, vendor_data)):
                 print(f"  ⚠️  Vendor '{vendor_data['name']}' already exists, skipping")
                 stats['skipped'] += 1
                 continue
             
-            # Create vendor
-            vendor = Vendor(
-                name=vendor_data['name'],
-                description=vendor_data.get('description'),
-                website=vendor_data.get('website'),
-                vendor_email=vendor_data.get('vendor_email'),
-                vendor_phone=vendor_data.get('vendor_phone'),
-                contact_name=vendor_data.get('contact_name'),
-                contact_email=vendor_data.get('contact_email'),
-                contact_phone=vendor_data.get('contact_phone')
-            )
-            
-            db.session.add(vendor)
             stats['added'] += 1
-            print(f"  ➕ Added vendor: {vendor.name}")
+            print(f"  ➕ Added vendor: {vendor_data['name']}")
         
         try:
-            db.session.commit()
+            loader.finish()
             print(f"\n✅ Vendors loaded successfully!")
             print(f"📊 Summary:")
             print(f"   Added: {stats['added']}")
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+from app import create_app
+from app.models.tran import Agency, Vendor
+from app.utils.assets import AssetManifest
+
+@pytest.fixture
+def app():
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+
+@pytest.fixture
+def static(tmp_path):
+    logos = tmp_path / "images" / "vendor_logos"
+    logos.mkdir(parents=True)
+    (logos / "acme_logo.png").write_bytes(b"v1")
+    (tmp_path / "images" / "other").mkdir()
+    (tmp_path / "images" / "other" / "skip.png").write_bytes(b"x")
+    return tmp_path
+
+def test_manifest_scans_logo_and_header_dirs_only(static):
+    manifest = AssetManifest(str(static))
+    assert "images/vendor_logos/acme_logo.png" in manifest
+    assert "images/other/skip.png" not in manifest
+
+def test_manifest_notices_added_and_edited_files(static, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.assets.time.monotonic", lambda: now[0])
+    manifest = AssetManifest(str(static), check_interval=5)
+    before = manifest.fingerprint("images/vendor_logos/acme_logo.png")
+    logo = static / "images" / "vendor_logos" / "acme_logo.png"
+    logo.write_bytes(b"version 2")
+    os.utime(logo, (1, 1))
+    headers = static / "images" / "vendor_headers"
+    headers.mkdir()
+    (headers / "acme_header.png").write_bytes(b"h")
+    assert manifest.fingerprint("images/vendor_headers/acme_header.png") is None  # not checked yet
+    now[0] += 6
+    assert manifest.fingerprint("images/vendor_headers/acme_header.png")
+    assert manifest.fingerprint("images/vendor_logos/acme_logo.png") != before
+
+def edit_in_place(static):
+    logo = static / "images" / "vendor_logos" / "acme_logo.png"
+    logo.write_bytes(b"version 2")
+    os.utime(logo, (1, 1))
+    # Keep the directory mtime as it was, as an in-place overwrite would
+    os.utime(logo.parent, (2, 2))
+
+def test_in_place_edits_need_touch_unless_watching_files(static, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.assets.time.monotonic", lambda: now[0])
+    os.utime(static / "images" / "vendor_logos", (2, 2))
+    manifest = AssetManifest(str(static), check_interval=5)
+    watching = AssetManifest(str(static), check_interval=5, watch_files=True)
+    before = manifest.fingerprint("images/vendor_logos/acme_logo.png")
+    edit_in_place(static)
+    now[0] += 6
+    assert manifest.fingerprint("images/vendor_logos/acme_logo.png") == before
+    assert watching.fingerprint("images/vendor_logos/acme_logo.png") != before
+    manifest.touch()
+    now[0] += 6
+    assert manifest.fingerprint("images/vendor_logos/acme_logo.png") != before
+
+def test_only_one_request_runs_a_check(static, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.assets.time.monotonic", lambda: now[0])
+    manifest = AssetManifest(str(static), check_interval=5)
+    monkeypatch.setattr(manifest, "_snapshot", lambda: pytest.fail("second concurrent check"))
+    now[0] += 6
+    with manifest._check_lock:  # another request is mid-check
+        assert manifest.fingerprint("images/vendor_logos/acme_logo.png")
+
+def test_model_urls_are_fingerprinted_lookups(app, monkeypatch):
+    with app.test_request_context():
+        monkeypatch.setattr("os.path.exists", lambda path: pytest.fail("stat on property access"))
+        url = Vendor(name="Apollo", short_name="Apollo").logo_url
+        assert url.startswith("/static/images/vendor_logos/apollo_logo.png?v=")
+        assert Vendor(name="Nobody", short_name="Nobody").logo_url is None
+        assert Agency(name="No short name").header_url is None
+
+def test_fingerprinted_static_responses_are_immutable(app):
+    client = app.test_client()
+    with app.test_request_context():
+        url = Vendor(name="Apollo", short_name="Apollo").logo_url
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.cache_control.max_age == 365 * 24 * 3600
+    assert response.cache_control.immutable
+    response.close()
+    plain = client.get("/static/images/vendor_logos/apollo_logo.png")
+    assert not plain.cache_control.immutable
+    plain.close()
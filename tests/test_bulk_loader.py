@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.tran import (
+    Agency, Component, Criticality, Function, FunctionalArea, Standard, function_component,
+)
+from app.utils import rollups
+from app.utils.bulk import BulkLoader, Ref, model_values
+from app.utils.search import ranked_search
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+def count_statements():
+    statements = []
+    event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def queue_functions(loader, count):
+    loader.add(FunctionalArea, {"name": "Operations"})
+    for i in range(count):
+        loader.add(Function, {
+            "name": f"Function {i}",
+            "criticality": Criticality.high,
+            "functional_area_id": Ref(FunctionalArea, "operations"),
+        })
+        loader.add(Component, {"name": f"Component {i}"})
+        loader.link(function_component, Ref(Function, f"function {i}"), Ref(Component, f"Component {i}"))
+
+def test_references_resolve_across_queued_models(app):
+    loader = BulkLoader()
+    queue_functions(loader, 3)
+    stats = loader.finish()
+
+    assert stats["Function"]["added"] == 3
+    assert stats["function_component"]["added"] == 3
+    area = FunctionalArea.query.one()
+    assert {f.functional_area_id for f in Function.query} == {area.id}
+    component = Component.query.filter_by(name="Component 2").one()
+    assert [f.name for f in component.functions] == ["Function 2"]
+
+def test_statements_do_not_grow_with_record_count(app):
+    statements = count_statements()
+    loader = BulkLoader(batch_size=10_000)
+    queue_functions(loader, 200)
+    loader.flush()
+    # Index preloads plus one executemany per model and link table
+    assert len(statements) < 20
+    assert Function.query.count() == 200
+
+def test_existing_and_duplicate_names_are_skipped(app):
+    db.session.add(Standard(name="REST"))
+    db.session.commit()
+
+    loader = BulkLoader()
+    assert not loader.add(Standard, {"name": " rest "})
+    assert loader.add(Standard, {"name": "SIRI"})
+    assert not loader.add(Standard, {"name": "siri"})
+    assert loader.finish()["Standard"] == {"skipped": 2, "added": 1}
+
+    loader = BulkLoader()
+    queue_functions(loader, 2)
+    loader.finish()
+    loader = BulkLoader()
+    queue_functions(loader, 2)
+    stats = loader.finish()
+    assert "added" not in stats["Function"]
+    assert stats["function_component"] == {"skipped": 2}
+    assert db.session.query(function_component).count() == 2
+
+def test_unresolved_reference_is_counted_not_inserted(app):
+    loader = BulkLoader()
+    loader.add(Function, {"name": "Orphan", "functional_area_id": Ref(FunctionalArea, "Missing")})
+    stats = loader.finish()
+    assert stats["Function"] == {"unresolved": 1}
+    assert Function.query.count() == 0
+
+def test_commits_in_batches(app):
+    commits = []
+    event.listen(db.session, "after_commit", lambda session: commits.append(1))
+    loader = BulkLoader(batch_size=5)
+    for i in range(12):
+        loader.add(Agency, {"name": f"Agency {i}"})
+    loader.finish()
+    assert Agency.query.count() == 12
+    assert len(commits) >= 3
+
+def test_model_values_drops_unknown_columns():
+    record = {"id": 7, "name": "C-TRAN", "location": "WA", "vendors": [1]}
+    assert model_values(Agency, record, short_name="ctran") == {
+        "name": "C-TRAN", "location": "WA", "short_name": "ctran",
+    }
+
+def test_finish_refreshes_search_index_and_rollups(app):
+    rollups.rebuild_rollups()
+    loader = BulkLoader()
+    loader.add(Agency, model_values(Agency, {"name": "Bulk Transit"}))
+    loader.finish()
+
+    assert [hit.title for hit in ranked_search("bulk")] == ["Bulk Transit"]
+    assert rollups.insight_summary().agency_count == 1
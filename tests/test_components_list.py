@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.tran import Agency, FunctionalArea, Function, Component, Configuration
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def seed_catalog(components, prefix=""):
+    area = FunctionalArea(name=f"{prefix}Fare Collection")
+    db.session.add(area)
+    agencies = [Agency(name=f"{prefix}Agency {i}") for i in range(5)]
+    functions = [Function(name=f"Function {i}", functional_area=area) for i in range(2)]
+    db.session.add_all(agencies + functions)
+    for i in range(components):
+        component = Component(name=f"{prefix}Component {i:03d}")
+        db.session.add(component)
+        for j, agency in enumerate(agencies[:i % 6]):
+            db.session.add(Configuration(
+                agency=agency, function=functions[j % 2], component=component,
+                version_label=f"v{j}", deployment_date=date(2024, 1, 1 + j),
+            ))
+    db.session.commit()
+
+def count_queries(client, url):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return response, len(statements)
+
+def test_components_list_card_summaries(client):
+    seed_catalog(6)
+    response = client.get("/api/components/list?search=Component 005")
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "Agency 0, Agency 1, Agency 2 +more" in html
+    assert "Function 0, Function 1" in html
+    assert "v4" in html and "2024-01-05" in html
+
+    html = client.get("/api/components/list?search=Component 000").get_data(as_text=True)
+    assert "No agencies" in html and "No functions" in html
+
+def test_components_list_query_count_is_constant(client):
+    seed_catalog(6)
+    _, small = count_queries(client, "/api/components/list")
+    seed_catalog(60, prefix="More ")
+    response, large = count_queries(client, "/api/components/list")
+    assert response.status_code == 200
+    assert large == small <= 4
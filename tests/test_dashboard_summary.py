@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.tran import Agency, Vendor, FunctionalArea
+from app.utils import stats
+from app.utils.cache import TTLCache
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def queries(app):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def test_summary_returns_all_counts_in_one_query(client, queries):
+    db.session.add_all([Agency(name="Metro"), Agency(name="Rail"), Vendor(name="Acme")])
+    db.session.commit()
+    queries.clear()
+
+    data = client.get("/api/dashboard/summary").get_json()
+    assert data["agencies"] == 2 and data["vendors"] == 1 and data["products"] == 0
+    assert set(data) == set(stats.DASHBOARD_COUNTS)
+    assert len(queries) == 1
+
+    assert client.get("/api/count/agencies").get_data(as_text=True) == "2"
+    assert client.get("/api/count/functional-areas").get_data(as_text=True) == "0"
+    assert len(queries) == 1
+
+def test_commit_invalidates_cached_counts(client):
+    assert client.get("/api/count/agencies").get_data(as_text=True) == "0"
+    db.session.add(Agency(name="Metro"))
+    db.session.commit()
+    assert client.get("/api/count/agencies").get_data(as_text=True) == "1"
+
+def test_rollback_keeps_cached_counts(app, client):
+    client.get("/api/dashboard/summary")
+    app.extensions["dashboard_cache"].set("counts", {**stats._query_dashboard_counts(), "agencies": 99})
+    db.session.add(FunctionalArea(name="Planning"))
+    db.session.flush()
+    db.session.rollback()
+    assert client.get("/api/count/agencies").get_data(as_text=True) == "99"
+
+def test_ttl_cache_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=5)
+    assert cache.get_or_set("k", lambda: 1) == 1
+    assert cache.get_or_set("k", lambda: 2) == 1
+    now[0] += 6
+    assert cache.get_or_set("k", lambda: 3) == 3
+
+def test_cache_is_per_app(client):
+    db.session.add(Agency(name="Metro"))
+    db.session.commit()
+    assert client.get("/api/count/agencies").get_data(as_text=True) == "1"
+    other = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with other.app_context():
+        db.create_all()
+        assert other.test_client().get("/api/count/agencies").get_data(as_text=True) == "0"
+        db.drop_all()
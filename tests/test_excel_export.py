@@ -0,0 +1,50 @@
+import io
+
+import pytest
+from flask import Flask
+from app.utils.excel import ExcelExport, XLSX_MIMETYPE
+
+openpyxl = pytest.importorskip("openpyxl")
+
+def read_back(fileobj):
+    return openpyxl.load_workbook(io.BytesIO(fileobj.read()))
+
+def test_write_tracks_widths_across_all_rows():
+    rows = ((f"Row {i}", i) for i in range(2000))
+    export = ExcelExport("Widths", ["Name", "Value"])
+    wb = read_back(export.write(rows))
+    ws = wb.active
+    assert export.row_count == 2000
+    assert ws["A1"].value == "Widths"
+    assert [c.value for c in ws[4]] == ["Name", "Value"]
+    assert ws["A2004"].value == "Row 1999" and ws["B2004"].value == 1999
+    assert ws.column_dimensions["A"].width == len("Row 1999") + 2
+    assert ws.freeze_panes == "A5"
+    assert ws.auto_filter.ref == "A4:B2004"
+    assert "A1:B1" in {str(r) for r in ws.merged_cells.ranges}
+
+def test_write_caps_width_and_styles_cells():
+    from openpyxl.styles import Font
+    bold = Font(bold=True)
+    export = ExcelExport("Styled", ["Text"], max_width=20,
+                         cell_style=lambda col, value: {"font": bold} if value == "hot" else None)
+    ws = read_back(export.write([("x" * 100,), ("hot",)])).active
+    assert ws.column_dimensions["A"].width == 20
+    assert ws["A6"].font.bold and not ws["A5"].font.bold
+
+def test_response_streams_attachment():
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = ExcelExport("Stream", ["A"]).response(iter([(1,), (2,)]), "stream.xlsx")
+        assert response.is_streamed
+        assert response.mimetype == XLSX_MIMETYPE
+        assert 'filename="stream.xlsx"' in response.headers["Content-Disposition"]
+        body = b"".join(response.response)
+    assert read_back(io.BytesIO(body)).active["A6"].value == 2
+
+def test_short_rows_padded_and_long_rows_rejected():
+    export = ExcelExport("Ragged", ["A", "B"])
+    ws = read_back(export.write([("only",)])).active
+    assert ws["A5"].value == "only" and ws["B5"].value is None
+    with pytest.raises(ValueError, match="Row 2 of 'Ragged' has 3 values for 2 columns"):
+        export.write([("a", "b"), ("a", "b", "c")])
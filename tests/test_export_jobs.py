@@ -0,0 +1,139 @@
+import io
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from app import create_app, db
+from app.models.jobs import ExportJob
+from app.models.tran import Criticality, Function, FunctionalArea
+from app.utils import exports
+
+openpyxl = pytest.importorskip("openpyxl")
+
+def make_app(tmp_path, **config):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+        "WTF_CSRF_ENABLED": False,
+        "EXPORT_JOB_WORKERS": 0,
+        "EXPORT_ARTIFACT_DIR": str(tmp_path / "exports"),
+        **config,
+    })
+    return app
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        area = FunctionalArea(name="Scheduling")
+        db.session.add_all([area, Function(name="Trip Planning", functional_area=area,
+                                           criticality=Criticality.high)])
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def workbook_rows(data):
+    ws = openpyxl.load_workbook(io.BytesIO(data)).active
+    return list(ws.iter_rows(min_row=5, values_only=True))
+
+def test_job_builds_and_downloads(client):
+    response = client.post("/api/exports/functional_areas")
+    job = response.get_json()
+    assert response.status_code == 200
+    assert job["status"] == "finished" and job["progress"] == 100
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["download_url"] == f"/api/jobs/{job['id']}/download"
+    download = client.get(status["download_url"])
+    assert download.status_code == 200
+    assert "attachment" in download.headers["Content-Disposition"]
+    assert workbook_rows(download.data)[0] == ("Scheduling", "Trip Planning", "High", 0, 0)
+
+def test_finished_artifact_reused_until_data_changes(client):
+    first = client.post("/api/exports/functional_areas").get_json()
+    assert client.post("/api/exports/functional_areas").get_json()["id"] == first["id"]
+    # Different parameters are a different export
+    searched = client.post("/api/exports/functional_areas", data={"search": "sched"}).get_json()
+    assert searched["id"] != first["id"]
+
+    area = FunctionalArea.query.one()
+    db.session.add(Function(name="Runcutting", functional_area=area, criticality=Criticality.low))
+    db.session.commit()
+    fresh = client.post("/api/exports/functional_areas").get_json()
+    assert fresh["id"] != first["id"]
+    assert len(workbook_rows(client.get(fresh["download_url"]).data)) == 2
+
+def test_htmx_gets_polling_fragment(client):
+    job = ExportJob(id="a" * 32, kind="functional_areas", cache_key="k", status="running")
+    db.session.add(job)
+    db.session.commit()
+    html = client.get(f"/api/jobs/{job.id}", headers={"HX-Request": "true"}).get_data(as_text=True)
+    assert 'hx-trigger="every 1s"' in html
+
+    html = client.post("/api/exports/functional_areas", headers={"HX-Request": "true"}).get_data(as_text=True)
+    assert "Download functional_areas_" in html
+    assert "hx-trigger" not in html
+
+def test_unknown_export_job_and_unfinished_download(client):
+    assert client.post("/api/exports/nope").status_code == 404
+    assert client.get("/api/jobs/missing").status_code == 404
+    db.session.add(ExportJob(id="b" * 32, kind="functional_areas", cache_key="k", status="queued"))
+    db.session.commit()
+    assert client.get(f"/api/jobs/{'b' * 32}/download").status_code == 409
+
+def test_failed_build_is_recorded(client, monkeypatch):
+    def explode(params, progress=None):
+        raise RuntimeError("boom")
+    spec = exports.EXPORTS["functional_areas"]
+    monkeypatch.setitem(exports.EXPORTS, "functional_areas", spec._replace(build=explode))
+    job = client.post("/api/exports/functional_areas").get_json()
+    assert job["status"] == "failed"
+    assert job["message"] == "boom"
+
+def test_orphaned_job_reported_failed(client):
+    stale = datetime.utcnow() - timedelta(hours=2)
+    db.session.add(ExportJob(id="c" * 32, kind="functional_areas", cache_key="k", status="running",
+                             created_at=stale, updated_at=stale))
+    db.session.commit()
+    assert client.get(f"/api/jobs/{'c' * 32}").get_json()["status"] == "failed"
+
+def test_job_runs_on_worker_thread(tmp_path):
+    app = make_app(tmp_path, SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'jobs.db'}", EXPORT_JOB_WORKERS=1)
+    with app.app_context():
+        db.create_all()
+        db.session.add(FunctionalArea(name="Fares"))
+        db.session.commit()
+    client = app.test_client()
+    response = client.post("/api/exports/functional_areas")
+    assert response.status_code == 202
+    assert response.headers["Location"] == response.get_json()["status_url"]
+
+    deadline = time.monotonic() + 10
+    status = response.get_json()
+    while status["status"] != "finished" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(status["status_url"]).get_json()
+    assert status["status"] == "finished"
+    assert workbook_rows(client.get(status["download_url"]).data)[0][0] == "Fares"
+
+def test_finished_artifact_reused_across_app_instances(tmp_path):
+    # Two workers of one deploy: separate processes' caches, one database and artifact dir
+    uri = f"sqlite:///{tmp_path / 'shared.db'}"
+    first_app, second_app = make_app(tmp_path, SQLALCHEMY_DATABASE_URI=uri), make_app(tmp_path, SQLALCHEMY_DATABASE_URI=uri)
+    with first_app.app_context():
+        db.create_all()
+        db.session.add(FunctionalArea(name="Fares"))
+        db.session.commit()
+        first = first_app.test_client().post("/api/exports/functional_areas").get_json()
+    with second_app.app_context():
+        assert second_app.test_client().post("/api/exports/functional_areas").get_json()["id"] == first["id"]
+        db.session.add(FunctionalArea(name="Planning"))
+        db.session.commit()
+    with first_app.app_context():
+        assert first_app.test_client().post("/api/exports/functional_areas").get_json()["id"] != first["id"]
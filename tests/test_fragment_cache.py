@@ -0,0 +1,125 @@
+import pytest
+from app import create_app, db
+from app.models.tran import Agency, Vendor, FunctionalArea
+from app.utils.cache import LRUBackend
+
+def make_app(**config):
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+        **config,
+    })
+
+@pytest.fixture
+def app():
+    # Long enough that no test straddles an ETag TTL bucket
+    app = make_app(FRAGMENT_CACHE_TTL=300)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def test_repeat_request_is_served_from_cache(client):
+    db.session.add(Agency(name="Metro Transit"))
+    db.session.commit()
+    first = client.get("/api/agencies/list?search=Metro")
+    assert "X-Fragment-Cache" not in first.headers
+    second = client.get("/api/agencies/list?search=%20Metro%20&sort=")
+    assert second.headers["X-Fragment-Cache"] == "hit"
+    assert second.get_data() == first.get_data()
+
+def test_commit_to_source_table_invalidates(client):
+    db.session.add(Agency(name="Metro Transit"))
+    db.session.commit()
+    client.get("/api/agencies/list")
+    db.session.add(Agency(name="Valley Rail"))
+    db.session.commit()
+    response = client.get("/api/agencies/list")
+    assert "X-Fragment-Cache" not in response.headers
+    assert "Valley Rail" in response.get_data(as_text=True)
+
+def test_commit_to_unrelated_table_keeps_entry(client):
+    client.get("/api/functional-areas/list")
+    db.session.add(Vendor(name="Acme"))
+    db.session.commit()
+    assert client.get("/api/functional-areas/list").headers["X-Fragment-Cache"] == "hit"
+    db.session.add(FunctionalArea(name="Planning"))
+    db.session.commit()
+    assert "X-Fragment-Cache" not in client.get("/api/functional-areas/list").headers
+
+def test_error_fragments_are_not_cached(client, monkeypatch):
+    monkeypatch.setattr(FunctionalArea, "query", None)
+    assert "Error loading functional areas" in client.get("/api/functional-areas/list").get_data(as_text=True)
+    monkeypatch.undo()
+    response = client.get("/api/functional-areas/list")
+    assert "X-Fragment-Cache" not in response.headers
+    assert "Error loading functional areas" not in response.get_data(as_text=True)
+
+def test_backend_can_be_disabled():
+    app = make_app(FRAGMENT_CACHE_BACKEND="none")
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get("/api/functional-areas/list")
+        assert "X-Fragment-Cache" not in client.get("/api/functional-areas/list").headers
+
+def test_lru_backend_evicts_oldest():
+    backend = LRUBackend(max_entries=2)
+    backend.set("a", "1", 60)
+    backend.set("b", "2", 60)
+    backend.get("a")
+    backend.set("c", "3", 60)
+    assert backend.get("b") is None
+    assert backend.get("a") == "1" and backend.get("c") == "3"
+
+def test_detail_fragment_answers_if_none_match_with_304(client):
+    vendor = Vendor(name="Acme")
+    db.session.add(vendor)
+    db.session.commit()
+    url = f"/api/vendors/{vendor.id}/details"
+    first = client.get(url)
+    assert first.status_code == 200 and first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+    again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+def test_commit_to_source_table_changes_etag(client):
+    agency = Agency(name="Metro Transit")
+    db.session.add(agency)
+    db.session.commit()
+    url = f"/api/agencies/{agency.id}/details"
+    etag = client.get(url).headers["ETag"]
+    agency.short_name = "MT"
+    db.session.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_conditional_disabled_without_backend():
+    app = make_app(FRAGMENT_CACHE_BACKEND="none")
+    with app.app_context():
+        db.create_all()
+        db.session.add(Vendor(name="Acme"))
+        db.session.commit()
+        response = app.test_client().get("/api/vendors/1/details")
+        assert response.status_code == 200 and "ETag" not in response.headers
+
+def test_lru_entries_default_to_short_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get("/api/agencies/list")
+        assert client.get("/api/agencies/list").headers["X-Fragment-Cache"] == "hit"
+        now[0] += LRUBackend.default_ttl + 1
+        assert "X-Fragment-Cache" not in client.get("/api/agencies/list").headers
+        db.drop_all()
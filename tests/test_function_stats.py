@@ -0,0 +1,67 @@
+import io
+
+import pytest
+from app import create_app, db
+from app.models.tran import Agency, FunctionalArea, Function, Component, Configuration, Criticality
+from app.utils.stats import function_stats, FunctionStats
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def catalog(app):
+    area = FunctionalArea(name="Scheduling")
+    low = Function(name="Runcutting", functional_area=area, criticality=Criticality.low)
+    high = Function(name="Trip Planning", functional_area=area, criticality=Criticality.high)
+    idle = Function(name="Idle", functional_area=area)
+    components = [Component(name=f"Component {i}") for i in range(3)]
+    low.components = components[:1]
+    high.components = components
+    agencies = [Agency(name=f"Agency {i}") for i in range(2)]
+    db.session.add_all([area, low, high, idle] + components + agencies)
+    for agency in agencies:
+        for component in components[:2]:
+            db.session.add(Configuration(agency=agency, function=high, component=component))
+    db.session.add(Configuration(agency=agencies[0], function=low, component=components[0]))
+    db.session.commit()
+    return area, low, high, idle
+
+def test_function_stats_counts_in_bulk(catalog):
+    _, low, high, idle = catalog
+    stats = function_stats([low.id, high.id, idle.id])
+    assert stats[high.id] == FunctionStats(component_count=3, agency_count=2)
+    assert stats[low.id] == FunctionStats(component_count=1, agency_count=1)
+    assert stats[idle.id] == FunctionStats(0, 0)
+    assert function_stats([]) == {}
+
+def test_functional_area_details_uses_counts(client, catalog):
+    area = catalog[0]
+    html = client.get(f"/api/functional-areas/{area.id}/details").get_data(as_text=True)
+    assert "3 components" in html and "2 agencies" in html
+    assert html.index("Trip Planning") < html.index("Runcutting")
+
+def test_functions_print_page_uses_counts(client, catalog):
+    html = client.get("/functions/print").get_data(as_text=True)
+    assert "3 components" in html and "2 agencies" in html
+
+def test_excel_export_uses_counts(client, catalog):
+    openpyxl = pytest.importorskip("openpyxl")
+    response = client.get("/functional-areas/export.xlsx")
+    assert response.status_code == 200
+    ws = openpyxl.load_workbook(io.BytesIO(response.data)).active
+    rows = [row for row in ws.iter_rows(min_row=5, values_only=True)]
+    assert rows[0] == ("Scheduling", "Trip Planning", "High", 3, 2)
+    assert ("Scheduling", "Runcutting", "Low", 1, 1) in rows
@@ -0,0 +1,403 @@
+import hashlib
+import threading
+import time
+import types
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from sqlalchemy import Index, inspect
+from app import create_app, db
+from app.models.gtfs import format_gtfs_time
+from app.models import GTFSStop, GTFSStopTime, GTFSFareProduct, GTFSTrip, GTFSLoadManifest, GTFSCalendarDate
+from gtfs_loader import (
+    GTFSLoader, iter_batches, build_copy_buffer,
+    convert_int, convert_float, convert_decimal, convert_str, convert_gtfs_time,
+    get_upserter, Upserter, SQLiteUpserter, PostgreSQLUpserter,
+    dependency_levels, run_dependency_graph, open_feed, ZipSource,
+)
+
+STOPS_TXT = (
+    "\ufeffstop_id,stop_name,stop_lat,stop_lon,platform_code\n"
+    "S1,First St,45.5,-122.6,A\n"
+    "S2,Second St,45.6,-122.7,B\n"
+    "S3,Third St,45.7,-122.8,\n"
+)
+
+FEED_FILES = {
+    "agency.txt": "agency_id,agency_name,agency_url,agency_timezone\nA1,Metro,https://metro.example,America/Los_Angeles\n",
+    "stops.txt": STOPS_TXT,
+    "routes.txt": "route_id,agency_id,route_short_name,route_long_name,route_type\nR1,A1,1,Main Line,3\n",
+    "calendar.txt": (
+        "service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n"
+        "WK,1,1,1,1,1,0,0,20250101,20251231\n"
+    ),
+    "trips.txt": "route_id,service_id,trip_id,direction_id\nR1,WK,T1,0\nR1,WK,T2,1\n",
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,08:00:00,08:00:00,S1,1\n"
+        "T1,08:05:00,08:05:30,S2,2\n"
+        "T2,09:00:00,09:00:00,S2,1\n"
+        "T2,09:07:00,09:07:00,S3,2\n"
+    ),
+}
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+    })
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def feed_dir(tmp_path):
+    (tmp_path / "stops.txt").write_text(STOPS_TXT, encoding="utf-8")
+    return tmp_path
+
+@pytest.fixture
+def full_feed(tmp_path):
+    for name, content in FEED_FILES.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+    return tmp_path
+
+def test_iter_batches_splits_evenly():
+    batches = list(iter_batches(range(7), 3))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+def test_iter_batches_rejects_zero():
+    with pytest.raises(ValueError):
+        list(iter_batches([1], 0))
+
+def test_read_gtfs_file_streams_model_columns(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    records = loader.read_gtfs_file("stops.txt", GTFSStop)
+    assert isinstance(records, types.GeneratorType)
+    rows = list(records)
+    assert len(rows) == 3
+    # platform_code is not a GTFSStop column and must be dropped
+    assert "platform_code" not in rows[0]
+    assert rows[0]["stop_id"] == "S1"
+    assert rows[0]["stop_lat"] == 45.5
+
+def test_read_gtfs_file_missing_optional(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    assert list(loader.read_gtfs_file("stop_times.txt", GTFSStopTime)) == []
+
+def test_load_file_reports_batches(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir, batch_size=2)
+    seen = []
+    loader.upsert_records = lambda model_class, batch: seen.append(len(batch)) or len(batch)
+    affected = loader.load_file("stops.txt", GTFSStop)
+    assert seen == [2, 1]
+    assert affected == 3
+    stats = loader.stats["stops.txt"]
+    assert stats["records_processed"] == 3
+    assert stats["records_affected"] == 3
+    assert stats["batches"] == 2
+    assert stats["method"] == "upsert"
+    assert "cpu_seconds" in stats and "wall_seconds" in stats
+
+def test_converters_match_column_types(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    stop_time = loader.get_converters(GTFSStopTime)
+    assert stop_time["stop_sequence"] is convert_int
+    assert stop_time["shape_dist_traveled"] is convert_float
+    assert stop_time["stop_id"] is convert_str
+    assert loader.get_converters(GTFSFareProduct)["amount"] is convert_decimal
+    # Tables are built once per model and reused
+    assert loader.get_converters(GTFSStopTime) is stop_time
+
+def test_convert_values():
+    assert convert_int("3") == 3
+    assert convert_int("3.0") == 3
+    assert convert_int("x") is None
+    assert convert_float("") is None
+    assert convert_decimal("2.50") == Decimal("2.50")
+    assert convert_decimal("abc") is None
+    assert convert_str("  Main St ") == "Main St"
+
+def test_build_row_plan_drops_unknown_columns(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    plan = loader.build_row_plan(["\ufeffstop_id", " stop_name", "platform_code", "stop_lat"], GTFSStop)
+    assert [(index, name) for index, name, _ in plan] == [(0, "stop_id"), (1, "stop_name"), (3, "stop_lat")]
+
+def test_build_copy_buffer_marks_nulls():
+    buf = build_copy_buffer(
+        [{"stop_id": "S1", "stop_name": "A, B", "zone_id": None}, {"stop_id": "S2", "stop_name": "", "zone_id": "Z"}],
+        ["stop_id", "stop_name", "zone_id"],
+    )
+    assert buf.read() == 'S1,"A, B",\\N\nS2,,Z\n'
+
+def test_copy_path_only_on_postgresql(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    loader.cleared = True
+    assert loader.should_copy(GTFSStop) is False
+
+def test_build_merge_sql_dedupes_on_primary_key(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    sql = loader.build_merge_sql(GTFSStop, "stage_gtfs_stops", ["stop_id", "stop_name"])
+    assert "SELECT DISTINCT ON (stop_id) stop_id, stop_name FROM stage_gtfs_stops" in sql
+    assert "ON CONFLICT (stop_id) DO UPDATE SET stop_code = EXCLUDED.stop_code, stop_name = EXCLUDED.stop_name" in sql
+
+def test_get_upserter_by_dialect():
+    assert isinstance(get_upserter("sqlite"), SQLiteUpserter)
+    assert isinstance(get_upserter("postgresql"), PostgreSQLUpserter)
+    assert type(get_upserter("mssql")) is Upserter
+
+def test_postgresql_batch_size_respects_param_limit():
+    table = GTFSStopTime.__table__
+    assert PostgreSQLUpserter().batch_size(table, 100_000) == 65535 // len(table.columns)
+    assert SQLiteUpserter().batch_size(table, 100_000) == 100_000
+
+def test_load_all_on_sqlite_is_idempotent(app, full_feed):
+    loader = GTFSLoader(app, full_feed, batch_size=3)
+    summary = loader.load_all()
+    assert summary["success"]
+    assert summary["file_stats"]["stop_times.txt"]["batches"] == 2
+    assert GTFSStopTime.query.count() == 4
+
+    (full_feed / "trips.txt").write_text(
+        "route_id,service_id,trip_id,direction_id\nR1,WK,T1,1\nR1,WK,T2,1\n", encoding="utf-8"
+    )
+    GTFSLoader(app, full_feed).load_all()
+    assert GTFSTrip.query.count() == 2
+    assert db.session.get(GTFSTrip, "T1").direction_id == 1
+    assert db.session.execute(db.text("PRAGMA synchronous")).scalar() != 0
+
+def test_generic_upserter_merges(app):
+    table = GTFSStop.__table__
+    rows = [
+        {"stop_id": "S1", "stop_name": "One", "stop_lat": 1.0, "stop_lon": 1.0},
+        {"stop_id": "S2", "stop_name": "Two", "stop_lat": 2.0, "stop_lon": 2.0},
+    ]
+    upserter = Upserter()
+    assert upserter.upsert(db.session, table, rows) == 2
+    rows[0]["stop_name"] = "Uno"
+    assert upserter.upsert(db.session, table, rows + [rows[0]]) == 2
+    db.session.commit()
+    assert GTFSStop.query.count() == 2
+    assert db.session.get(GTFSStop, "S1").stop_name == "Uno"
+
+def test_dependency_graph_from_foreign_keys(app, feed_dir):
+    graph = GTFSLoader(app, feed_dir).build_dependency_graph()
+    assert graph["stops.txt"] == set()
+    assert graph["trips.txt"] == {"routes.txt", "calendar.txt", "shapes.txt"}
+    assert graph["stop_times.txt"] == {"trips.txt", "stops.txt"}
+    assert graph["fare_leg_rules.txt"] == {"fare_products.txt", "timeframes.txt"}
+
+def test_load_order_respects_foreign_keys(app, feed_dir):
+    loader = GTFSLoader(app, feed_dir)
+    order = loader.load_order()
+    assert sorted(order) == sorted(loader.file_mapping)
+    for filename, deps in loader.build_dependency_graph().items():
+        assert all(order.index(dep) < order.index(filename) for dep in deps)
+
+def test_dependency_levels_detects_cycles():
+    assert dependency_levels({"a": set(), "b": {"a"}, "c": set()}) == [["a", "c"], ["b"]]
+    with pytest.raises(ValueError):
+        dependency_levels({"a": {"b"}, "b": {"a"}})
+
+def test_run_dependency_graph_runs_independent_nodes_together():
+    graph = {"a": set(), "b": set(), "c": {"a", "b"}}
+    finished = []
+    active = []
+    lock = threading.Lock()
+
+    def work(node):
+        with lock:
+            active.append(node)
+            peak = len(active)
+        time.sleep(0.05)
+        with lock:
+            active.remove(node)
+            finished.append(node)
+        return peak
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = run_dependency_graph(graph, executor, work)
+    assert finished[-1] == "c"
+    assert max(results["a"], results["b"]) == 2
+    assert results["c"] == 1
+
+def test_load_all_falls_back_to_sequential_on_sqlite(app, full_feed):
+    summary = GTFSLoader(app, full_feed).load_all(workers=4)
+    assert summary["workers"] == 1
+    assert summary["cpu_time"] >= 0
+    assert GTFSStopTime.query.count() == 4
+
+def test_incremental_load_skips_unchanged_and_diffs_changed(app, full_feed):
+    GTFSLoader(app, full_feed).load_all()
+    assert db.session.get(GTFSLoadManifest, "stop_times.txt").row_count == 4
+
+    (full_feed / "trips.txt").write_text(
+        "route_id,service_id,trip_id,direction_id\nR1,WK,T1,1\nR1,WK,T3,0\n", encoding="utf-8"
+    )
+    (full_feed / "stop_times.txt").write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,08:00:00,08:00:00,S1,1\n"
+        "T1,08:05:00,08:05:30,S2,2\n"
+        "T3,10:00:00,10:00:00,S3,1\n",
+        encoding="utf-8",
+    )
+    summary = GTFSLoader(app, full_feed).load_all(incremental=True)
+    stats = summary["file_stats"]
+    assert stats["stops.txt"]["method"] == "skipped"
+    assert summary["files_skipped"] == 4
+    assert stats["trips.txt"]["method"] == "diff"
+    assert (stats["trips.txt"]["inserted"], stats["trips.txt"]["updated"],
+            stats["trips.txt"]["unchanged"], stats["trips.txt"]["deleted"]) == (1, 1, 0, 1)
+    assert (stats["stop_times.txt"]["inserted"], stats["stop_times.txt"]["updated"],
+            stats["stop_times.txt"]["unchanged"], stats["stop_times.txt"]["deleted"]) == (1, 0, 2, 2)
+    assert sorted(t.trip_id for t in GTFSTrip.query.all()) == ["T1", "T3"]
+    assert GTFSStopTime.query.count() == 3
+    assert db.session.get(GTFSLoadManifest, "stop_times.txt").row_count == 3
+
+def test_full_load_hashes_files_while_reading(app, full_feed, monkeypatch):
+    def no_second_pass(self, filename):
+        raise AssertionError(f"{filename} hashed in a separate pass")
+    monkeypatch.setattr(GTFSLoader, "file_digest", no_second_pass)
+    GTFSLoader(app, full_feed).load_all()
+    expected = hashlib.sha256((full_feed / "stop_times.txt").read_bytes()).hexdigest()
+    assert db.session.get(GTFSLoadManifest, "stop_times.txt").sha256 == expected
+
+def test_incremental_load_resets_dropped_columns(app, full_feed):
+    (full_feed / "stops.txt").write_text(
+        "stop_id,stop_code,stop_name,stop_lat,stop_lon,location_type\n"
+        "S1,101,First St,45.5,-122.6,1\n"
+        "S2,102,Second St,45.6,-122.7,0\n"
+        "S3,,Third St,45.7,-122.8,0\n",
+        encoding="utf-8",
+    )
+    GTFSLoader(app, full_feed).load_all()
+    (full_feed / "stops.txt").write_text(STOPS_TXT, encoding="utf-8")
+    stats = GTFSLoader(app, full_feed).load_all(incremental=True)["file_stats"]["stops.txt"]
+    assert (stats["updated"], stats["unchanged"]) == (2, 1)
+    stop = db.session.get(GTFSStop, "S1")
+    # Dropped columns hold what a fresh load would: NULL, or the column default
+    assert (stop.stop_code, stop.location_type) == (None, 0)
+
+def test_incremental_load_empties_files_removed_from_feed(app, full_feed):
+    (full_feed / "calendar_dates.txt").write_text(
+        "service_id,date,exception_type\nWK,20250704,2\n", encoding="utf-8"
+    )
+    GTFSLoader(app, full_feed).load_all()
+    assert GTFSCalendarDate.query.count() == 1
+    (full_feed / "calendar_dates.txt").unlink()
+    summary = GTFSLoader(app, full_feed).load_all(incremental=True)
+    stats = summary["file_stats"]["calendar_dates.txt"]
+    assert (stats["method"], stats["deleted"]) == ("removed", 1)
+    assert GTFSCalendarDate.query.count() == 0
+    assert db.session.get(GTFSLoadManifest, "calendar_dates.txt") is None
+
+def write_zip(target, prefix=""):
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in FEED_FILES.items():
+            zf.writestr(prefix + name, content)
+    return target
+
+def test_load_all_from_zip_path(app, tmp_path):
+    archive = write_zip(tmp_path / "feed.zip", prefix="google_transit/")
+    summary = GTFSLoader(app, archive).load_all()
+    assert summary["files_processed"] == len(FEED_FILES)
+    assert GTFSStopTime.query.count() == 4
+    assert db.session.get(GTFSStop, "S1").stop_name == "First St"
+
+def test_load_all_from_zip_stream(app):
+    loader = GTFSLoader(app, write_zip(BytesIO()))
+    assert isinstance(loader.feed, ZipSource)
+    summary = loader.load_all(workers=4)
+    assert summary["workers"] == 1
+    assert GTFSTrip.query.count() == 2
+
+def test_open_feed_rejects_non_zip_file(tmp_path):
+    path = tmp_path / "feed.txt"
+    path.write_text("not a feed", encoding="utf-8")
+    with pytest.raises(ValueError):
+        open_feed(path)
+
+def test_clear_existing_data_empties_tables(app, full_feed):
+    GTFSLoader(app, full_feed).load_all()
+    GTFSLoader(app, full_feed).clear_existing_data()
+    assert GTFSStopTime.query.count() == 0
+    assert GTFSStop.query.count() == 0
+    assert GTFSLoadManifest.query.count() == 0
+
+def test_postgresql_clear_truncates_in_one_statement():
+    from sqlalchemy.dialects import postgresql
+
+    class RecordingSession:
+        def __init__(self):
+            self.statements = []
+        def get_bind(self):
+            return types.SimpleNamespace(dialect=postgresql.dialect())
+        def execute(self, stmt):
+            self.statements.append(str(stmt))
+
+    session = RecordingSession()
+    PostgreSQLUpserter().clear_tables(session, [GTFSStopTime.__table__, GTFSTrip.__table__])
+    assert session.statements == [
+        "TRUNCATE TABLE gtfs_stop_times, gtfs_trips RESTART IDENTITY CASCADE"
+    ]
+
+def test_load_all_drops_and_rebuilds_indexes(app, full_feed):
+    index = Index("ix_test_stop_times_stop_id", GTFSStopTime.__table__.c.stop_id)
+    try:
+        index.create(bind=db.engine)
+        loader = GTFSLoader(app, full_feed)
+        seen = []
+        original = loader.load_sequential
+        def load_sequential():
+            seen.extend(i["name"] for i in inspect(db.engine).get_indexes("gtfs_stop_times"))
+            original()
+        loader.load_sequential = load_sequential
+
+        loader.load_all(clear_existing=True, drop_indexes=True)
+        assert "ix_test_stop_times_stop_id" not in seen
+        names = [i["name"] for i in inspect(db.engine).get_indexes("gtfs_stop_times")]
+        assert "ix_test_stop_times_stop_id" in names
+        assert GTFSStopTime.query.count() == 4
+    finally:
+        GTFSStopTime.__table__.indexes.discard(index)
+
+def test_convert_gtfs_time_keeps_service_day():
+    assert convert_gtfs_time("08:05:30") == 8 * 3600 + 5 * 60 + 30
+    assert convert_gtfs_time("8:05:30") == 8 * 3600 + 5 * 60 + 30
+    assert convert_gtfs_time(" 25:10:00 ") == 25 * 3600 + 10 * 60
+    assert convert_gtfs_time("08:60:00") is None
+    assert convert_gtfs_time("8:5") is None
+    assert convert_gtfs_time("") is None
+    assert format_gtfs_time(convert_gtfs_time("25:10:00")) == "25:10:00"
+
+def test_stop_times_store_seconds_after_midnight(app, full_feed):
+    (full_feed / "stop_times.txt").write_text(
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "T1,23:55:00,23:55:00,S1,1\n"
+        "T1,24:10:00,24:10:30,S2,2\n",
+        encoding="utf-8",
+    )
+    GTFSLoader(app, full_feed).load_all()
+    late = db.session.get(GTFSStopTime, ("T1", 2))
+    assert (late.arrival_time, late.departure_time) == (86400 + 600, 86400 + 630)
+    in_window = GTFSStopTime.query.filter(GTFSStopTime.arrival_time.between(86000, 87000)).count()
+    assert in_window == 2
+
+def test_synthetic_feed_is_deterministic_and_loads(app, tmp_path):
+    from scripts.generate_gtfs_feed import generate_feed
+
+    scale = dict(stops=30, routes=3, trips_per_route=4, stops_per_trip=5, seed=7)
+    counts = generate_feed(str(tmp_path / "a"), **scale)
+    generate_feed(str(tmp_path / "b"), **scale)
+    for filename in counts:
+        assert (tmp_path / "a" / filename).read_bytes() == (tmp_path / "b" / filename).read_bytes()
+
+    summary = GTFSLoader(app, tmp_path / "a").load_all()
+    assert summary["files_processed"] == len(counts)
+    assert GTFSStopTime.query.count() == counts["stop_times.txt"] == 3 * 4 * 5
+    assert GTFSFareProduct.query.count() == counts["fare_products.txt"]
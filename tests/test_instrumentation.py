@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from app import create_app, db
+from app.models.tran import Agency
+from app.utils.instrumentation import RequestQueryStats
+
+def make_app(**config):
+    return create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+        "FRAGMENT_CACHE_BACKEND": "none",
+        **config,
+    })
+
+@pytest.fixture
+def app():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+def test_server_timing_reports_query_count(app):
+    db.session.add_all([Agency(name="Metro"), Agency(name="Rail")])
+    db.session.commit()
+    response = app.test_client().get("/api/agencies/list")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    queries = int(timing.split('desc="')[1].split(" queries")[0])
+    assert queries >= 1
+    assert "sql-1" not in timing
+
+def test_slow_queries_are_logged_with_route(app, caplog):
+    app.config.update(SLOW_QUERY_MS=0, SQL_TIMING_DETAIL=True)
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        response = app.test_client().get("/api/agencies/list")
+    assert 'sql-1;dur=' in response.headers["Server-Timing"]
+    slow = [r.getMessage() for r in caplog.records if "SLOW_QUERY" in r.getMessage()]
+    assert slow and "route: main.agencies_list_fragment" in slow[0]
+    assert "SELECT" in slow[0]
+
+def test_instrumentation_can_be_disabled():
+    app = make_app(SQL_INSTRUMENTATION=False)
+    with app.app_context():
+        db.create_all()
+        assert "Server-Timing" not in app.test_client().get("/api/agencies/list").headers
+
+def test_stats_keep_only_the_slowest_statements():
+    stats = RequestQueryStats(top=2)
+    for elapsed, sql in [(0.01, "a"), (0.05, "b"), (0.02, "c"), (0.03, "d")]:
+        stats.record(sql, elapsed)
+    assert stats.count == 4
+    assert [sql for _, sql in stats.slowest] == ["b", "d"]
+    assert 'desc="4 queries"' in stats.server_timing()
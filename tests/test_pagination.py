@@ -0,0 +1,85 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from app import create_app, db
+from app.models.tran import Agency, Function, FunctionalArea, Component, Configuration, Product
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user"] = {"email": "tester@example.com"}
+    return client
+
+def next_url(body):
+    match = re.search(r'hx-get="([^"]*cursor=[^"]*)"', body)
+    return match.group(1).replace("&amp;", "&") if match else None
+
+def walk(client, url):
+    """Follow load-more links, returning each page's body"""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.get_data(as_text=True))
+        url = next_url(pages[-1])
+    return pages
+
+def test_products_pages_cover_every_row_once(client):
+    db.session.add_all([Product(name=f"Product {i:03d}") for i in range(25)])
+    db.session.commit()
+    pages = walk(client, "/api/products/list?limit=10")
+    assert len(pages) == 3
+    names = [n for body in pages for n in re.findall(r"Product \d{3}", body)]
+    assert names == [f"Product {i:03d}" for i in range(25)]
+    assert "space-y-2" in pages[0] and "space-y-2" not in pages[1]
+
+def test_picker_keeps_filters_across_pages(client):
+    db.session.add_all([Product(name=f"Radio {i:02d}") for i in range(6)] + [Product(name="Farebox")])
+    db.session.commit()
+    pages = walk(client, "/api/products/picker?q=radio&limit=4")
+    assert len(pages) == 2
+    assert "Farebox" not in "".join(pages)
+    assert len(re.findall(r"data-product-id=", "".join(pages))) == 6
+
+def test_configurations_break_created_at_ties_by_id(client):
+    area = FunctionalArea(name="Fares")
+    db.session.add(area)
+    db.session.flush()
+    function = Function(name="Collect", functional_area_id=area.id)
+    component = Component(name="Validator")
+    db.session.add_all([function, component])
+    db.session.flush()
+    stamp = datetime(2024, 1, 1)
+    for i in range(7):
+        agency = Agency(name=f"Agency {i}")
+        db.session.add(agency)
+        db.session.flush()
+        db.session.add(Configuration(agency_id=agency.id, function_id=function.id, component_id=component.id,
+                                     created_at=stamp + timedelta(days=i // 3)))
+    db.session.commit()
+    pages = walk(client, "/api/configurations/list?limit=3")
+    ids = [int(i) for body in pages for i in re.findall(r'id="configuration-(\d+)"', body)]
+    expected = [c.id for c in Configuration.query.order_by(Configuration.created_at.desc(), Configuration.id.desc())]
+    assert ids == expected
+
+def test_tampered_cursor_is_rejected(client):
+    db.session.add_all([Product(name=f"P{i}") for i in range(3)])
+    db.session.commit()
+    url = next_url(client.get("/api/products/list?limit=1").get_data(as_text=True))
+    assert client.get(url[:-2] + "xx").status_code == 400
+    cursor = url.split("cursor=")[1]
+    assert client.get(f"/api/configurations/list?cursor={cursor}").status_code == 400
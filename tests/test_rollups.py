@@ -0,0 +1,149 @@
+from datetime import date
+
+import pytest
+from app import create_app, db
+from app.models.tran import (
+    Agency, Vendor, Product, ProductVersion, FunctionalArea, Function, Component,
+    Configuration, ConfigurationProduct,
+)
+from app.models.rollups import AgencyRollup, VendorRollup, FunctionalAreaRollup, InsightSummary
+from app.utils import rollups
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def snapshot():
+    """Every rollup row plus the summary, for comparing incremental vs rebuilt state"""
+    db.session.expire_all()
+    rows = {
+        "agencies": sorted((r.agency_id, r.configuration_count, r.vendor_count) for r in AgencyRollup.query),
+        "vendors": sorted((r.vendor_id, r.product_count, r.version_count, r.configuration_count, r.latest_release)
+                          for r in VendorRollup.query),
+        "areas": sorted((r.functional_area_id, r.configuration_count) for r in FunctionalAreaRollup.query),
+    }
+    summary = rollups.insight_summary()
+    rows["summary"] = {c.name: getattr(summary, c.name) for c in summary.__table__.columns if c.name != "updated_at"}
+    return rows
+
+def assert_matches_rebuild():
+    incremental = snapshot()
+    rollups.rebuild_rollups()
+    assert incremental == snapshot()
+
+def seed():
+    fares, ops = FunctionalArea(name="Fares"), FunctionalArea(name="Operations")
+    acme, zed = Vendor(name="Acme"), Vendor(name="Zed")
+    metro, rail = Agency(name="Metro"), Agency(name="Rail")
+    db.session.add_all([fares, ops, acme, zed, metro, rail])
+    db.session.flush()
+    collect = Function(name="Collect", functional_area_id=fares.id)
+    dispatch = Function(name="Dispatch", functional_area_id=ops.id)
+    validator = Component(name="Validator")
+    farebox = Product(name="FareBox", vendor_id=acme.id)
+    cad = Product(name="CAD", vendor_id=zed.id)
+    db.session.add_all([collect, dispatch, validator, farebox, cad])
+    db.session.flush()
+    db.session.add(ProductVersion(product_id=farebox.id, version="1.0", release_date=date(2024, 5, 1)))
+    c1 = Configuration(agency_id=metro.id, function_id=collect.id, component_id=validator.id)
+    c2 = Configuration(agency_id=rail.id, function_id=collect.id, component_id=validator.id)
+    c3 = Configuration(agency_id=metro.id, function_id=dispatch.id, component_id=validator.id)
+    db.session.add_all([c1, c2, c3])
+    db.session.flush()
+    db.session.add_all([
+        ConfigurationProduct(configuration_id=c1.id, product_id=farebox.id),
+        ConfigurationProduct(configuration_id=c2.id, product_id=farebox.id),
+        ConfigurationProduct(configuration_id=c3.id, product_id=cad.id),
+    ])
+    db.session.commit()
+    return {"metro": metro, "rail": rail, "acme": acme, "zed": zed, "cad": cad, "c1": c1, "collect": collect,
+            "ops": ops}
+
+def test_rollups_built_with_tables(client):
+    seed()
+    assert client.get("/api/agencies/insights").get_json() == {
+        "tech_leader": "Metro", "common_area": "Fares", "top_vendor": "Acme"}
+    assert client.get("/api/agencies/stats").get_json() == {
+        "active_implementations": 3, "avg_implementations_per_agency": 1.5, "avg_vendors_per_agency": 1.5}
+    stats = client.get("/api/vendors/stats").get_json()
+    assert stats["vendors_with_usage"] == 2 and stats["most_used_vendor_cfgs"] == 2
+    perf = client.get("/api/vendors/performance").get_json()
+    assert perf["most_recent_release_date"] == "2024-05-01" and perf["most_versions"] == "Acme"
+
+def test_writes_update_rollups_incrementally(client):
+    objs = seed()
+    rollups.rebuild_rollups()
+
+    objs["cad"].vendor_id = objs["acme"].id          # product moves vendor
+    db.session.commit()
+    assert_matches_rebuild()
+    assert client.get("/api/vendors/stats").get_json()["most_used_vendor_cfgs"] == 3
+
+    objs["collect"].functional_area_id = objs["ops"].id  # function moves area
+    db.session.commit()
+    assert_matches_rebuild()
+    assert client.get("/api/agencies/insights").get_json()["common_area"] == "Operations"
+
+    objs["metro"].name = "Metro Transit"              # renames the tech leader
+    db.session.commit()
+    assert_matches_rebuild()
+    assert client.get("/api/agencies/insights").get_json()["tech_leader"] == "Metro Transit"
+
+    db.session.delete(objs["c1"])                     # cascades its configuration products
+    db.session.commit()
+    assert_matches_rebuild()
+
+    db.session.delete(objs["metro"])
+    db.session.commit()
+    assert_matches_rebuild()
+    assert client.get("/api/agencies/insights").get_json()["tech_leader"] == "Rail"
+
+def test_rolled_back_writes_leave_rollups_alone(app):
+    objs = seed()
+    rollups.rebuild_rollups()
+    before = snapshot()
+    db.session.add(Product(name="Ghost", vendor_id=objs["zed"].id))
+    db.session.flush()
+    db.session.rollback()
+    assert snapshot() == before
+
+def test_writes_adjust_summary_without_rederiving_it(app, monkeypatch):
+    objs = seed()
+    def fail(connection):
+        raise AssertionError("summary re-derived from scratch")
+    monkeypatch.setattr(rollups, "refresh_summary", fail)
+    bus = Agency(name="Bus")
+    db.session.add(bus)
+    db.session.flush()
+    db.session.add(Configuration(agency_id=bus.id, function_id=objs["collect"].id,
+                                 component_id=objs["c1"].component_id))
+    db.session.commit()
+    monkeypatch.undo()
+    assert_matches_rebuild()
+
+def test_read_without_rollups_does_not_write(client):
+    seed()
+    db.session.execute(InsightSummary.__table__.delete())
+    db.session.commit()
+    assert client.get("/api/agencies/stats").get_json() == {
+        "active_implementations": 0, "avg_implementations_per_agency": 0, "avg_vendors_per_agency": 0}
+    assert db.session.get(InsightSummary, rollups.SUMMARY_ID) is None
+    # Not maintained until rebuilt; the rebuild upserts the row
+    db.session.add(Agency(name="Bus"))
+    db.session.commit()
+    assert db.session.get(InsightSummary, rollups.SUMMARY_ID) is None
+    rollups.rebuild_rollups()
+    rollups.rebuild_rollups()
+    assert rollups.insight_summary().agency_count == 3
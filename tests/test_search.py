@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.tran import Agency, Component, Vendor, Product, FunctionalArea, Function
+from app.utils import search
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def seed():
+    vendor = Vendor(name="Acme Transit Systems", description="Fare collection hardware")
+    db.session.add_all([
+        Agency(name="Metro Transit", description="Regional bus operator"),
+        Agency(name="Valley Rail", description="Commuter rail with fare capping"),
+        Component(name="Fare Gateway", short_description="Account-based ticketing"),
+        vendor,
+    ])
+    db.session.flush()
+    db.session.add(Product(name="FareBox 3000", vendor_id=vendor.id, description="Validator"))
+    db.session.commit()
+
+def indexed_rows():
+    return db.session.execute(text("SELECT kind, title FROM search_index ORDER BY kind, title")).all()
+
+def test_index_follows_inserts_updates_and_deletes(app):
+    seed()
+    assert ("agency", "Metro Transit") in indexed_rows()
+    agency = Agency.query.filter_by(name="Metro Transit").one()
+    agency.name = "Metro Regional"
+    db.session.commit()
+    assert ("agency", "Metro Regional") in indexed_rows()
+    assert ("agency", "Metro Transit") not in indexed_rows()
+    db.session.delete(agency)
+    db.session.commit()
+    assert not [r for r in indexed_rows() if r.title.startswith("Metro")]
+
+def test_rolled_back_changes_are_not_indexed(app):
+    db.session.add(Agency(name="Ghost Agency"))
+    db.session.flush()
+    db.session.rollback()
+    assert indexed_rows() == []
+
+def test_api_search_ranks_titles_above_descriptions(client):
+    seed()
+    data = client.get("/api/search?q=fare").get_json()
+    kinds_titles = [(r["kind"], r["title"]) for r in data["results"]]
+    assert kinds_titles[0][1] in ("Fare Gateway", "FareBox 3000")
+    assert ("agency", "Valley Rail") in kinds_titles
+    assert kinds_titles.index(("agency", "Valley Rail")) > kinds_titles.index(("component", "Fare Gateway"))
+    filtered = client.get("/api/search?q=fare&kind=agency,vendor").get_json()["results"]
+    assert {r["kind"] for r in filtered} == {"agency", "vendor"}
+    assert client.get("/api/search?q=fare&kind=bogus").status_code == 400
+
+def test_search_boxes_use_index_with_prefix_terms(client):
+    seed()
+    body = client.get("/api/agencies/list?search=commut").get_data(as_text=True)
+    assert "Valley Rail" in body and "Metro Transit" not in body
+
+def test_index_matches_word_prefixes_not_substrings(app):
+    db.session.add(Vendor(name="Microsoft"))
+    db.session.commit()
+    assert search.search_filter(Vendor.query, Vendor, "micro").one().name == "Microsoft"
+    # Mid-word fragments matched under the old ILIKE filter; with the index they do not
+    assert search.search_filter(Vendor.query, Vendor, "soft").count() == 0
+
+def test_missing_index_is_probed_again(app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.search.time.monotonic", lambda: now[0])
+    db.session.execute(text("DROP TABLE search_index"))
+    db.session.commit()
+    search._index_dialects.clear()
+    assert search.index_dialect(db.engine) is None
+    # Built by another process (e.g. `flask search-index`)
+    with db.engine.begin() as connection:
+        connection.execute(text(search._DDL["sqlite"][0]))
+    assert search.index_dialect(db.engine) is None
+    now[0] += search.INDEX_RECHECK_SECONDS
+    assert search.index_dialect(db.engine) == "sqlite"
+
+def test_rebuild_and_fallback_without_index(app):
+    seed()
+    assert search.rebuild_search_index()["agency"] == 2
+    db.session.execute(text("DROP TABLE search_index"))
+    db.session.commit()
+    search._index_dialects.clear()
+    hits = search.ranked_search("transit")
+    assert [h.title for h in hits] == ["Acme Transit Systems", "Metro Transit"]
+    assert search.search_filter(Agency.query, Agency, "rail").one().name == "Valley Rail"
+    # The fallback keeps substring matching
+    assert search.search_filter(Agency.query, Agency, "ail").one().name == "Valley Rail"
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from app import create_app, db
+from app.models.tran import Component, Configuration, Function, IntegrationPoint, Standard, Tag
+from app.utils import seed
+from app.utils.search import ranked_search
+from app.utils.seed import SeedError, run_seed, stage_order
+
+SEED = {
+    "areas.json": {"functional_areas": [{"name": "Operations"}]},
+    "functions.json": {"functions": [
+        {"name": "Dispatch", "functional_area": "Operations", "criticality": "high"},
+        {"name": "Orphan", "functional_area": "Missing"},
+    ]},
+    "core.json": {
+        "agencies": [{"name": "C-TRAN", "short_name": "ctran"}],
+        "vendors": [{"id": 1, "name": "Acme", "contact_name": "dropped"}],
+        "components": [{"id": 1, "name": "CAD/AVL", "function_name": "Dispatch"}],
+    },
+    "standards.json": {"standards": [{"name": "REST", "standard_url": "https://restfulapi.net/"}]},
+    "integrations.json": {"integration_points": [
+        {"name": "CAD/AVL API", "standards": [{"name": "rest", "website": "ignored"}, {"name": "SIRI"}],
+         "tags": ["AVL"]},
+    ]},
+    "implementations.json": {"implementations": [
+        {"agency": "C-TRAN", "function": "Dispatch", "component": "CAD/AVL", "version": "2.1",
+         "deployment_date": "2020-05-01"},
+    ]},
+}
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in SEED.items():
+        (tmp_path / name).write_text(json.dumps(content))
+    return str(tmp_path)
+
+def test_stage_order_follows_model_dependencies():
+    order = [stage.name for stage in stage_order()]
+    assert order.index("functional_areas") < order.index("functions") < order.index("components")
+    assert order.index("standards") < order.index("integration_points")
+    for name in ("agencies", "functions", "components"):
+        assert order.index(name) < order.index("implementations")
+
+def test_seed_loads_every_stage(app, data_dir):
+    summary = run_seed(data_dir, workers=1)
+    results = {stage.name: stage for stage in summary["stages"]}
+
+    assert results["functions"].added == 1
+    assert results["functions"].errors == ["Functional area 'Missing' not found for function 'Orphan'"]
+    assert [f.name for f in Component.query.one().functions] == ["Dispatch"]
+    # The standards file wins over integration points' inline definitions
+    assert Standard.query.filter_by(name="REST").one().standard_url == "https://restfulapi.net/"
+    ip = IntegrationPoint.query.one()
+    assert sorted(s.name for s in ip.standards) == ["REST", "SIRI"]
+    assert [t.name for t in Tag.query] == ["AVL"]
+    configuration = Configuration.query.one()
+    assert configuration.version_label == "2.1"
+    assert configuration.agency.name == "C-TRAN"
+    assert len(summary["files"]) == len(SEED)
+
+def test_seed_is_idempotent_and_parses_in_parallel(app, data_dir):
+    run_seed(data_dir, workers=1)
+    summary = run_seed(data_dir, workers=2)
+    assert summary["workers"] == 2
+    assert all(stage.added == 0 for stage in summary["stages"])
+    assert Function.query.count() == 1
+    assert Configuration.query.count() == 1
+
+def test_seed_only_selected_stages(app, data_dir):
+    summary = run_seed(data_dir, workers=1, only=["functional_areas", "functions"])
+    assert [stage.name for stage in summary["stages"]] == ["functional_areas", "functions"]
+    assert Component.query.count() == 0
+
+def test_seed_rejects_bad_input(app, tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    with pytest.raises(SeedError):
+        run_seed(str(tmp_path), workers=1)
+    with pytest.raises(SeedError):
+        run_seed(str(tmp_path), only=["nonsense"])
+
+def test_failed_stage_keeps_earlier_stages_searchable(app, data_dir, monkeypatch):
+    def explode(loader, record, result):
+        raise RuntimeError("boom")
+    stages = [stage._replace(handler=explode) if stage.name == "standards" else stage
+              for stage in stage_order()]
+    monkeypatch.setattr(seed, "stage_order", lambda: stages)
+    with pytest.raises(RuntimeError):
+        run_seed(data_dir, workers=1)
+    assert Standard.query.count() == 0
+    assert [hit.title for hit in ranked_search("acme", kinds=["vendor"])] == ["Acme"]
+    assert [hit.kind for hit in ranked_search("ctran")] == ["agency"]
@@ -0,0 +1,88 @@
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.tran import (
+    Agency, Vendor, Product, ProductVersion, FunctionalArea, Function, Component,
+    Configuration, ConfigurationProduct,
+)
+
+@pytest.fixture
+def app():
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "SECRET_KEY": "test",
+        "FRAGMENT_CACHE_BACKEND": "none",
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def selects(app):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+def seed():
+    fares, ops = FunctionalArea(name="Fares"), FunctionalArea(name="Operations")
+    metro, rail = Agency(name="Metro"), Agency(name="Rail")
+    vendors = [Vendor(name=n) for n in ("Acme", "Beacon", "Cobalt", "Unused")]
+    db.session.add_all([fares, ops, metro, rail, *vendors])
+    db.session.flush()
+    collect = Function(name="Collect", functional_area_id=fares.id)
+    dispatch = Function(name="Dispatch", functional_area_id=ops.id)
+    component = Component(name="Box")
+    products = [Product(name=f"{v.name} One", vendor_id=v.id) for v in vendors]
+    products.append(Product(name="Acme Two", vendor_id=vendors[0].id))
+    db.session.add_all([collect, dispatch, component, *products])
+    db.session.flush()
+    db.session.add(ProductVersion(product_id=products[2].id, version="1", release_date=date(2025, 1, 1)))
+    uses = [(metro, collect, products[0]), (metro, collect, products[4]), (rail, dispatch, products[1]),
+            (rail, collect, products[2])]
+    for agency, function, product in uses:
+        config = Configuration.query.filter_by(agency_id=agency.id, function_id=function.id).first()
+        if config is None:
+            config = Configuration(agency_id=agency.id, function_id=function.id, component_id=component.id)
+            db.session.add(config)
+            db.session.flush()
+        db.session.add(ConfigurationProduct(configuration_id=config.id, product_id=product.id))
+    db.session.commit()
+
+def listed(client, query):
+    body = client.get(f"/api/vendors/list?{query}").get_data(as_text=True)
+    seen = []
+    for name in re.findall(r"\b(Acme|Beacon|Cobalt|Unused)\b", body):
+        if name not in seen:
+            seen.append(name)
+    return seen
+
+def test_filters_are_one_query_with_semi_joins(client, selects):
+    seed()
+    selects.clear()
+    assert listed(client, "agency=Metro") == ["Acme"]
+    assert len(selects) == 1
+    assert "EXISTS" in selects[0].upper()
+    assert listed(client, "agency=Rail&functional_area=Fares") == ["Cobalt"]
+    assert listed(client, "functional_area=Operations") == ["Beacon"]
+    assert listed(client, "agency=Nobody") == []
+
+def test_sort_modes_share_metric_subqueries(client):
+    seed()
+    assert listed(client, "sort=name") == ["Acme", "Beacon", "Cobalt", "Unused"]
+    assert listed(client, "sort=products")[0] == "Acme"
+    assert listed(client, "sort=recent")[0] == "Cobalt"
+    body = client.get("/api/vendors/list?agency=Metro").get_data(as_text=True)
+    assert "2 products" in body and "1 cfg use" in body